@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of the hot paths of the addon."""
+import os
+import types
+import importlib.util
+
+import synthetic
+from harness import benchmark
+
+
+ADDON_REQUIREMENTS = ("ayon_core", "qtpy")
+PUBLISH_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "client", "ayon_substancedesigner", "plugins", "publish"
+)
+
+
+def _get_lib():
+    from ayon_substancedesigner.api import lib
+
+    return lib
+
+
+def _reset_caches():
+    lib = _get_lib()
+    lib.clear_sd_metadata_cache()
+    lib.invalidate_resource_index()
+
+
+def _build_package(env):
+    package = synthetic.build_package(
+        os.path.join(env.tmp_dir, "benchmark.sbs"), env.sizes)
+    _reset_caches()
+    return package
+
+
+@benchmark("get_sd_graph_by_name.cold", requires=ADDON_REQUIREMENTS)
+def bench_graph_by_name_cold(env):
+    lib = _get_lib()
+    _build_package(env)
+    last_graph = synthetic.get_graph_name(env.sizes["graphs"] - 1)
+
+    def setup():
+        lib.invalidate_resource_index()
+
+    def run(_):
+        assert lib.get_sd_graph_by_name(last_graph) is not None
+
+    return setup, run
+
+
+@benchmark("get_sd_graph_by_name.all_graphs", requires=ADDON_REQUIREMENTS)
+def bench_graph_by_name_all(env):
+    lib = _get_lib()
+    _build_package(env)
+    graph_names = [
+        synthetic.get_graph_name(index)
+        for index in range(env.sizes["graphs"])
+    ]
+
+    def setup():
+        lib.invalidate_resource_index()
+
+    def run(_):
+        for graph_name in graph_names:
+            lib.get_sd_graph_by_name(graph_name)
+
+    return setup, run
+
+
+@benchmark("get_output_maps_from_graphs.cold", requires=ADDON_REQUIREMENTS)
+def bench_output_maps_cold(env):
+    lib = _get_lib()
+    _build_package(env)
+
+    def setup():
+        lib.invalidate_resource_index()
+
+    def run(_):
+        assert lib.get_output_maps_from_graphs()
+
+    return setup, run
+
+
+@benchmark("get_output_maps_from_graphs.warm", requires=ADDON_REQUIREMENTS)
+def bench_output_maps_warm(env):
+    lib = _get_lib()
+    _build_package(env)
+    lib.get_output_maps_from_graphs()
+
+    def setup():
+        pass
+
+    def run(_):
+        for _ in range(100):
+            lib.get_output_maps_from_graphs()
+
+    return setup, run
+
+
+@benchmark("parsing_sd_data.containers", requires=ADDON_REQUIREMENTS)
+def bench_parsing_sd_data(env):
+    lib = _get_lib()
+    package = _build_package(env)
+
+    def setup():
+        lib.clear_sd_metadata_cache()
+
+    def run(_):
+        containers = lib.parsing_sd_data(
+            package, "ayon_containers", is_dictionary=False)
+        assert len(containers) == env.sizes["containers"]
+
+    return setup, run
+
+
+@benchmark("parsing_sd_data.containers_cached", requires=ADDON_REQUIREMENTS)
+def bench_parsing_sd_data_cached(env):
+    lib = _get_lib()
+    package = _build_package(env)
+
+    def setup():
+        lib.clear_sd_metadata_cache()
+        lib.get_cached_sd_metadata(
+            package, "ayon_containers", is_dictionary=False)
+
+    def run(_):
+        containers = lib.parsing_sd_data(
+            package, "ayon_containers", is_dictionary=False)
+        assert len(containers) == env.sizes["containers"]
+
+    return setup, run
+
+
+@benchmark("set_sd_metadata.containers", requires=ADDON_REQUIREMENTS)
+def bench_set_sd_metadata(env):
+    lib = _get_lib()
+    package = _build_package(env)
+    containers = [
+        synthetic.get_container(index)
+        for index in range(env.sizes["containers"])
+    ]
+
+    def setup():
+        lib.clear_sd_metadata_cache()
+
+    def run(_):
+        lib.set_sd_metadata("ayon_containers", containers, package)
+        lib.flush_sd_metadata()
+
+    return setup, run
+
+
+@benchmark("imprint.100_containers", requires=ADDON_REQUIREMENTS)
+def bench_imprint(env):
+    lib = _get_lib()
+    from ayon_substancedesigner.api import pipeline
+
+    package = _build_package(env)
+    loader = types.SimpleNamespace()
+    contexts = [
+        {
+            "representation": {"id": f"representation_{index}"},
+            "project": {"name": "benchmark"},
+        }
+        for index in range(100)
+    ]
+
+    def setup():
+        _build_package(env)
+
+    def run(_):
+        with lib.sd_metadata_batch():
+            for index, context in enumerate(contexts):
+                pipeline.imprint(
+                    package, f"texture_new_{index}", None, context,
+                    loader=loader, identifier=f"texture_new_{index}",
+                    options={"resource_loading_options": 1}
+                )
+
+    return setup, run
+
+
+@benchmark("set_instances.update", requires=ADDON_REQUIREMENTS)
+def bench_set_instances(env):
+    from ayon_substancedesigner.api import pipeline
+
+    _build_package(env)
+    instances = {
+        f"instance_{index}": synthetic.get_instance(index)
+        for index in range(env.sizes["instances"])
+    }
+
+    def setup():
+        _build_package(env)
+        pipeline.set_instances(instances)
+        _get_lib().flush_sd_metadata()
+
+    def run(_):
+        for instance_id, instance_data in instances.items():
+            pipeline.set_instances(
+                {instance_id: {"active": False}}, update=True)
+        _get_lib().flush_sd_metadata()
+
+    return setup, run
+
+
+def _load_publish_plugin(filename):
+    filepath = os.path.join(PUBLISH_DIR, filename)
+    module_name = f"benchmark_{os.path.splitext(filename)[0]}"
+    spec = importlib.util.spec_from_file_location(module_name, filepath)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@benchmark(
+    "CollectTextureSet.all_graphs",
+    requires=ADDON_REQUIREMENTS + ("pyblish",)
+)
+def bench_collect_texture_set(env):
+    import pyblish.api
+
+    module = _load_publish_plugin("collect_textureset_images.py")
+    # Avoid resolving the staging dir from the project anatomy
+    module.tempdir = types.SimpleNamespace(
+        get_temp_dir=lambda *args, **kwargs: env.tmp_dir)
+    _build_package(env)
+
+    def setup():
+        _get_lib().invalidate_resource_index()
+        context = pyblish.api.Context()
+        context.data["projectName"] = "benchmark"
+        instance = context.create_instance("textureSetMain")
+        instance.data["creator_attributes"] = {
+            "exportFileFormat": "png",
+            "review": False,
+        }
+        return instance
+
+    def run(instance):
+        module.CollectTextureSet().process(instance)
+        assert len(instance) == (
+            env.sizes["graphs"] * len(synthetic.GRAPH_OUTPUTS))
+
+    return setup, run
+
+
+@benchmark(
+    "project_templates.merge_template_entries",
+    requires=("ayon_core", "ayon_api")
+)
+def bench_merge_template_entries(env):
+    from ayon_substancedesigner import project_templates
+
+    template_path = synthetic.get_template_path(env.tmp_dir, env.sizes)
+    package_path = os.path.join(env.tmp_dir, "merged_template.sbs")
+    template_entries = [
+        (
+            f"new_{synthetic.get_graph_name(index)}",
+            synthetic.get_graph_name(index),
+            template_path
+        )
+        for index in range(0, env.sizes["template_graphs"], 2)
+    ]
+
+    def setup():
+        # Read the template again like in a new session
+        project_templates._template_cache.clear()
+        with open(package_path, "w") as stream:
+            stream.write(project_templates.EMPTY_PACKAGE_CONTENT.format(
+                file_uid="0"))
+
+    def run(_):
+        assert project_templates.merge_template_entries(
+            template_entries, package_path)
+
+    return setup, run
@@ -0,0 +1,644 @@
+# -*- coding: utf-8 -*-
+"""Configurable in-memory stand-in of the Substance Designer `sd` module.
+
+Only the parts of the API used by the addon are implemented. The classes
+live in modules with the same names as in Designer so the API tracing of
+`ayon_substancedesigner.api.tracing` works with them too.
+
+Each API call can be slowed down by `configure(call_latency=...)` to
+simulate the cost of calls into Designer, which makes the benchmarks
+sensitive to the number of API calls and not only to the Python work.
+"""
+import sys
+import time
+import types
+import functools
+import itertools
+
+
+CONFIG = {
+    # Seconds spent in every API call
+    "call_latency": 0.0,
+}
+STATS = {
+    "calls": 0,
+}
+
+_uids = itertools.count(1)
+
+
+def configure(call_latency=None):
+    """Configure the fake API.
+
+    Args:
+        call_latency (float, optional): seconds spent in every API call
+    """
+    if call_latency is not None:
+        CONFIG["call_latency"] = call_latency
+
+
+def reset_stats():
+    STATS["calls"] = 0
+
+
+def _api(method):
+    """Mark method as API call counted and slowed down by the latency."""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        STATS["calls"] += 1
+        latency = CONFIG["call_latency"]
+        if latency:
+            end = time.perf_counter() + latency
+            while time.perf_counter() < end:
+                pass
+        return method(*args, **kwargs)
+    return wrapper
+
+
+class APIException(Exception):
+    pass
+
+
+class SDPropertyCategory:
+    Annotation = 0
+    Input = 1
+    Output = 2
+
+
+class SDPropertyInheritanceMethod:
+    RelativeToInput = 0
+    RelativeToParent = 1
+    Absolute = 2
+
+
+class SDApplicationPath:
+    DefaultResourcesDir = 0
+
+
+class EmbedMethod(int):
+    pass
+
+
+class int2:
+    def __init__(self, x=0, y=0):
+        self.x = x
+        self.y = y
+
+
+class SDAPIObject:
+    @_api
+    def getClassName(self):
+        return type(self).__name__
+
+
+class SDValue(SDAPIObject):
+    def __init__(self, value):
+        self._value = value
+
+    @classmethod
+    def sNew(cls, value):
+        return cls(value)
+
+    @_api
+    def get(self):
+        return self._value
+
+
+class SDValueString(SDValue):
+    pass
+
+
+class SDValueInt2(SDValue):
+    pass
+
+
+class SDValueFloat(SDValue):
+    pass
+
+
+class SDValueTexture(SDValue):
+    pass
+
+
+class SDTexture(SDAPIObject):
+    def __init__(self, width=16, height=16, bytes_per_pixel=4):
+        self._size = int2(width, height)
+        self._bytes_per_pixel = bytes_per_pixel
+
+    @_api
+    def getSize(self):
+        return self._size
+
+    @_api
+    def getBytesPerPixel(self):
+        return self._bytes_per_pixel
+
+    @_api
+    def save(self, filepath):
+        with open(filepath, "wb") as stream:
+            stream.write(bytes(
+                self._size.x * self._size.y * self._bytes_per_pixel))
+
+
+class SDType(SDAPIObject):
+    def __init__(self, type_id):
+        self._type_id = type_id
+
+    @_api
+    def getId(self):
+        return self._type_id
+
+
+class SDProperty(SDAPIObject):
+    def __init__(self, property_id, category, type_id="float"):
+        self._id = property_id
+        self._category = category
+        self._type = SDType(type_id)
+
+    @_api
+    def getId(self):
+        return self._id
+
+    @_api
+    def getCategory(self):
+        return self._category
+
+    @_api
+    def getType(self):
+        return self._type
+
+    @_api
+    def isFunctionOnly(self):
+        return False
+
+
+class SDDefinition(SDAPIObject):
+    def __init__(self, definition_id, properties):
+        self._id = definition_id
+        self._properties = properties
+
+    @_api
+    def getId(self):
+        return self._id
+
+    @_api
+    def getProperties(self, category):
+        return [
+            prop for prop in self._properties
+            if prop.getCategory() == category
+        ]
+
+
+class SDConnection(SDAPIObject):
+    def __init__(self, node, output_property):
+        self._node = node
+        self._output_property = output_property
+
+    @_api
+    def getOutputPropertyNode(self):
+        return self._node
+
+    @_api
+    def getOutputProperty(self):
+        return self._output_property
+
+
+class SDNode(SDAPIObject):
+    def __init__(self, identifier, definition_id, outputs=(), inputs=()):
+        self._identifier = identifier
+        properties = [
+            SDProperty(output, SDPropertyCategory.Output, "SDTexture")
+            for output in outputs
+        ]
+        properties.extend(
+            SDProperty(input_id, SDPropertyCategory.Input)
+            for input_id in inputs
+        )
+        self._definition = SDDefinition(definition_id, properties)
+        self._values = {
+            prop.getId(): SDValueTexture(SDTexture())
+            for prop in properties
+            if prop.getCategory() == SDPropertyCategory.Output
+        }
+        self._values.update(
+            (input_id, SDValueFloat(0.5)) for input_id in inputs)
+        self._connections = {}
+
+    def connect(self, input_id, node, output_id):
+        output_property = node.getDefinition().getProperties(
+            SDPropertyCategory.Output)[0]
+        if output_property.getId() != output_id:
+            output_property = SDProperty(
+                output_id, SDPropertyCategory.Output, "SDTexture")
+        self._connections.setdefault(input_id, []).append(
+            SDConnection(node, output_property))
+
+    @_api
+    def getIdentifier(self):
+        return self._identifier
+
+    @_api
+    def getDefinition(self):
+        return self._definition
+
+    @_api
+    def getProperties(self, category):
+        return self._definition.getProperties(category)
+
+    @_api
+    def getPropertyValue(self, prop):
+        return self._values.get(prop.getId())
+
+    @_api
+    def getPropertyConnections(self, prop):
+        return list(self._connections.get(prop.getId(), []))
+
+    @_api
+    def getPropertyGraph(self, prop):
+        return None
+
+    @_api
+    def getReferencedResource(self):
+        return None
+
+
+class SDResource(SDAPIObject):
+    def __init__(self, identifier, package):
+        self._identifier = identifier
+        self._package = package
+        self._deleted = False
+
+    @_api
+    def getIdentifier(self):
+        if self._deleted:
+            raise APIException("Resource has been deleted")
+        return self._identifier
+
+    @_api
+    def setIdentifier(self, identifier):
+        self._identifier = identifier
+
+    @_api
+    def getPackage(self):
+        return self._package
+
+    @_api
+    def getUrl(self):
+        return f"pkg:///{self._identifier}?dependency={id(self._package)}"
+
+    @_api
+    def delete(self):
+        self._package._remove_resource(self)
+        self._deleted = True
+
+
+class SDResourceFolder(SDResource):
+    @classmethod
+    def sNew(cls, parent):
+        package = parent if isinstance(parent, SDPackage) else (
+            parent.getPackage())
+        folder = cls("Resources", package)
+        package._add_resource(folder)
+        return folder
+
+
+class SDResourceBitmap(SDResource):
+    def __init__(self, identifier, package, filepath=None):
+        super().__init__(identifier, package)
+        self._filepath = filepath
+
+    @classmethod
+    def sNewFromFile(cls, parent, filepath, embed_method):
+        package = parent if isinstance(parent, SDPackage) else (
+            parent.getPackage())
+        bitmap = cls("bitmap", package, filepath)
+        package._add_resource(bitmap)
+        return bitmap
+
+    @_api
+    def getFilePath(self):
+        return self._filepath
+
+
+class SDGraph(SDResource):
+    def __init__(self, identifier, package):
+        super().__init__(identifier, package)
+        self._nodes = []
+        self._properties = {
+            "$outputsize": SDValueInt2(int2(11, 11)),
+            "$randomseed": SDValueFloat(0),
+        }
+
+    @_api
+    def getNodes(self):
+        return list(self._nodes)
+
+    @_api
+    def getOutputNodes(self):
+        return [
+            node for node in self._nodes
+            if node._definition._id == "sbs::compositing::output"
+        ]
+
+    @_api
+    def getProperties(self, category):
+        if category != SDPropertyCategory.Input:
+            return []
+        return [
+            SDProperty(property_id, category)
+            for property_id in self._properties
+        ]
+
+    @_api
+    def getPropertyFromId(self, property_id, category):
+        return SDProperty(property_id, category)
+
+    @_api
+    def getPropertyValue(self, prop):
+        return self._properties.get(prop.getId())
+
+    @_api
+    def setPropertyValue(self, prop, value):
+        self._properties[prop.getId()] = value
+
+    @_api
+    def getPropertyInheritanceMethod(self, prop):
+        return SDPropertyInheritanceMethod.Absolute
+
+    @_api
+    def setPropertyInheritanceMethod(self, prop, method):
+        pass
+
+
+class SDSBSCompGraph(SDGraph):
+    def __init__(self, identifier, package,
+                 outputs=("basecolor", "normal"), nodes=4):
+        super().__init__(identifier, package)
+        previous = None
+        for index in range(nodes):
+            node = SDNode(
+                f"{identifier}_node{index}", "sbs::compositing::blend",
+                outputs=["output"], inputs=["opacity", "blendingmode"]
+            )
+            if previous is not None:
+                node.connect("opacity", previous, "output")
+            self._nodes.append(node)
+            previous = node
+        for output in outputs:
+            node = SDNode(
+                f"{identifier}_{output}", "sbs::compositing::output",
+                outputs=[output], inputs=["inputNodeOutput"]
+            )
+            if previous is not None:
+                node.connect("inputNodeOutput", previous, "output")
+            self._nodes.append(node)
+
+    @_api
+    def compute(self):
+        pass
+
+
+class SDMetadataDict(SDAPIObject):
+    def __init__(self, package):
+        self._package = package
+        self._values = {}
+
+    @_api
+    def getPropertyValueFromId(self, property_id):
+        if property_id not in self._values:
+            raise APIException(f"Metadata not found: {property_id}")
+        return self._values[property_id]
+
+    @_api
+    def setPropertyValueFromId(self, property_id, value):
+        self._values[property_id] = value
+        self._package._modified = True
+
+
+class SDPackage(SDAPIObject):
+    def __init__(self, filepath):
+        self._filepath = filepath
+        self._resources = []
+        self._metadata = SDMetadataDict(self)
+        self._modified = False
+
+    def _add_resource(self, resource):
+        self._resources.append(resource)
+
+    def _remove_resource(self, resource):
+        self._resources.remove(resource)
+
+    def add_graph(self, identifier, outputs=("basecolor", "normal"),
+                  nodes=4):
+        graph = SDSBSCompGraph(identifier, self, outputs, nodes)
+        self._add_resource(graph)
+        return graph
+
+    def add_bitmap(self, identifier, filepath=None):
+        bitmap = SDResourceBitmap(identifier, self, filepath)
+        self._add_resource(bitmap)
+        return bitmap
+
+    @_api
+    def getFilePath(self):
+        return self._filepath
+
+    @_api
+    def isModified(self):
+        return self._modified
+
+    @_api
+    def getMetadataDict(self):
+        return self._metadata
+
+    @_api
+    def getChildrenResources(self, recursive):
+        return list(self._resources)
+
+
+class SDPackageMgr(SDAPIObject):
+    def __init__(self):
+        self._packages = []
+
+    def add_package(self, package):
+        self._packages.append(package)
+        return package
+
+    def clear(self):
+        self._packages = []
+
+    @_api
+    def getUserPackages(self):
+        return list(self._packages)
+
+    @_api
+    def newUserPackage(self):
+        return self.add_package(SDPackage(""))
+
+    @_api
+    def loadUserPackage(self, filepath, updatePackages=False,
+                        reloadIfModified=False):
+        return self.add_package(SDPackage(filepath))
+
+    @_api
+    def unloadUserPackage(self, package):
+        self._packages.remove(package)
+
+    @_api
+    def savePackageAs(self, package, fileAbsPath=None):
+        package._filepath = fileAbsPath
+        package._modified = False
+
+
+class QtForPythonUIMgrWrapper(SDAPIObject):
+    def __init__(self):
+        self.current_graph = None
+
+    @_api
+    def getCurrentGraph(self):
+        return self.current_graph
+
+    @_api
+    def getMainWindow(self):
+        return None
+
+
+class SDColorManagementEngine(SDAPIObject):
+    @_api
+    def getRawColorSpaceName(self):
+        return "Raw"
+
+    @_api
+    def getWorkingColorSpaceName(self):
+        return "sRGB"
+
+
+class SDApplication(SDAPIObject):
+    def __init__(self):
+        self._package_mgr = SDPackageMgr()
+        self._ui_mgr = QtForPythonUIMgrWrapper()
+        self._callbacks = {}
+
+    @_api
+    def getPackageMgr(self):
+        return self._package_mgr
+
+    @_api
+    def getQtForPythonUIMgr(self):
+        return self._ui_mgr
+
+    @_api
+    def getColorManagementEngine(self):
+        return SDColorManagementEngine()
+
+    @_api
+    def getPath(self, path_type):
+        return "/fake/resources"
+
+    def _register_callback(self, callback):
+        callback_id = next(_uids)
+        self._callbacks[callback_id] = callback
+        return callback_id
+
+    @_api
+    def registerAfterFileLoadedCallback(self, callback):
+        return self._register_callback(callback)
+
+    @_api
+    def registerAfterFileSavedCallback(self, callback):
+        return self._register_callback(callback)
+
+    @_api
+    def registerBeforeFileClosedCallback(self, callback):
+        return self._register_callback(callback)
+
+    @_api
+    def unregisterCallback(self, callback_id):
+        self._callbacks.pop(callback_id, None)
+
+
+class SDContext(SDAPIObject):
+    def __init__(self):
+        self._application = SDApplication()
+
+    @_api
+    def getSDApplication(self):
+        return self._application
+
+
+class SDSBSARExporter(SDAPIObject):
+    def __init__(self, context, handle):
+        pass
+
+    @classmethod
+    def sNew(cls):
+        return cls(None, None)
+
+    @_api
+    def exportPackageToSBSAR(self, package, filepath):
+        with open(filepath, "wb") as stream:
+            stream.write(b"sbsar")
+
+
+_context = SDContext()
+
+# Classes by module name relative to `sd.api`
+_MODULES = {
+    "sdapiobject": [APIException, SDAPIObject],
+    "sdproperty": [SDProperty, SDPropertyCategory,
+                   SDPropertyInheritanceMethod],
+    "sdvalue": [SDValue],
+    "sdvaluestring": [SDValueString],
+    "sdvalueint2": [SDValueInt2],
+    "sdvaluefloat": [SDValueFloat],
+    "sdvaluetexture": [SDValueTexture],
+    "sdbasetypes": [int2],
+    "sdtexture": [SDTexture],
+    "sdtype": [SDType],
+    "sddefinition": [SDDefinition],
+    "sdconnection": [SDConnection],
+    "sdnode": [SDNode],
+    "sdresource": [SDResource, EmbedMethod],
+    "sdresourcefolder": [SDResourceFolder],
+    "sdresourcebitmap": [SDResourceBitmap],
+    "sdgraph": [SDGraph],
+    "sdmetadatadict": [SDMetadataDict],
+    "sdpackage": [SDPackage],
+    "sdpackagemgr": [SDPackageMgr],
+    "qtforpythonuimgrwrapper": [QtForPythonUIMgrWrapper],
+    "sdapplication": [SDApplication, SDApplicationPath],
+    "sbs.sdsbscompgraph": [SDSBSCompGraph],
+    "sbs.sdsbsarexporter": [SDSBSARExporter],
+}
+
+
+def install():
+    """Install the fake `sd` module into `sys.modules`.
+
+    Returns:
+        SDContext: context returned by `sd.getContext()`
+    """
+    sd_module = types.ModuleType("sd")
+    sd_module.getContext = lambda: _context
+    api_module = types.ModuleType("sd.api")
+    sbs_module = types.ModuleType("sd.api.sbs")
+    sd_module.api = api_module
+    api_module.sbs = sbs_module
+    sys.modules["sd"] = sd_module
+    sys.modules["sd.api"] = api_module
+    sys.modules["sd.api.sbs"] = sbs_module
+    for module_name, members in _MODULES.items():
+        module = types.ModuleType(f"sd.api.{module_name}")
+        for member in members:
+            setattr(module, member.__name__, member)
+        sys.modules[module.__name__] = module
+        parent = api_module
+        *parent_names, name = module_name.split(".")
+        for parent_name in parent_names:
+            parent = getattr(parent, parent_name)
+        setattr(parent, name, module)
+    return _context
+
+
+def get_application():
+    return _context._application
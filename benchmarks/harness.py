@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Registry and timing of the benchmarks."""
+import time
+import statistics
+import importlib.util
+import dataclasses
+
+import fake_sd
+
+
+@dataclasses.dataclass
+class Benchmark:
+    """Registered benchmark.
+
+    Attributes:
+        name (str): benchmark name
+        func (Callable): called with `BenchmarkEnv`, returns `setup`
+            and `run` callables. `setup` is called before every timed
+            `run` and its result is passed to `run`.
+        requires (tuple): modules which must be importable
+    """
+    name: str
+    func: object
+    requires: tuple = ()
+
+    def get_missing_requirements(self):
+        return [
+            module_name for module_name in self.requires
+            if importlib.util.find_spec(module_name) is None
+        ]
+
+
+@dataclasses.dataclass
+class BenchmarkEnv:
+    """Environment passed to the benchmarks.
+
+    Attributes:
+        sizes (dict): sizes of the synthetic data
+        tmp_dir (str): directory for temporary files
+    """
+    sizes: dict
+    tmp_dir: str
+
+
+BENCHMARKS = []
+
+
+def benchmark(name, requires=()):
+    """Register a benchmark.
+
+    Args:
+        name (str): benchmark name
+        requires (tuple): modules which must be importable, the benchmark
+            is skipped otherwise
+    """
+    def decorator(func):
+        BENCHMARKS.append(Benchmark(name, func, tuple(requires)))
+        return func
+    return decorator
+
+
+def run_benchmark(bench, env, repeat):
+    """Time a benchmark.
+
+    Args:
+        bench (Benchmark): benchmark
+        env (BenchmarkEnv): environment
+        repeat (int): number of timed runs
+
+    Returns:
+        dict: timings in seconds and the number of fake API calls
+            of a single run
+    """
+    setup, run = bench.func(env)
+    timings = []
+    api_calls = 0
+    for _ in range(repeat):
+        state = setup()
+        fake_sd.reset_stats()
+        start = time.perf_counter()
+        run(state)
+        timings.append(time.perf_counter() - start)
+        api_calls = fake_sd.STATS["calls"]
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "repeat": repeat,
+        "api_calls": api_calls,
+    }
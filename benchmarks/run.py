@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""Run the benchmarks of the addon against the fake `sd` module.
+
+Usage:
+    python benchmarks/run.py [--quick] [--repeat N] [--filter TEXT]
+        [--call-latency SECONDS] [--output DIR] [--compare RESULTS]
+
+The addon modules need the AYON launcher environment (`ayon_core`,
+`ayon_api`, `pyblish`, `qtpy`), benchmarks whose requirements can't be
+imported are skipped. Results are saved as JSON to `benchmarks/results`
+named by the addon version so they can be compared across releases with
+`--compare`.
+"""
+import os
+import sys
+import json
+import runpy
+import argparse
+import platform
+import tempfile
+import datetime
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+sys.path.insert(0, os.path.join(REPO_ROOT, "client"))
+
+import fake_sd  # noqa: E402
+import synthetic  # noqa: E402
+import bench_addon  # noqa: E402, F401
+from harness import BENCHMARKS, BenchmarkEnv, run_benchmark  # noqa: E402
+
+
+def get_addon_version():
+    package_data = runpy.run_path(os.path.join(REPO_ROOT, "package.py"))
+    return package_data["version"]
+
+
+def print_comparison(results, previous_results):
+    previous = previous_results["results"]
+    print("\nComparison with {} ({}):".format(
+        previous_results["version"], previous_results["timestamp"]))
+    for name, result in results.items():
+        if name not in previous:
+            continue
+        ratio = result["median"] / previous[name]["median"]
+        print(
+            f"    {name:<45} {previous[name]['median'] * 1000:>10.2f}ms"
+            f" -> {result['median'] * 1000:>10.2f}ms ({ratio:.2f}x)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--quick", action="store_true",
+        help="Use smaller synthetic packages.")
+    parser.add_argument(
+        "--repeat", type=int, default=5,
+        help="Number of timed runs of each benchmark.")
+    parser.add_argument(
+        "--filter", default="",
+        help="Run only benchmarks containing the text.")
+    parser.add_argument(
+        "--call-latency", type=float, default=0.0,
+        help="Seconds spent in each fake API call.")
+    parser.add_argument(
+        "--output", default=os.path.join(BENCHMARKS_DIR, "results"),
+        help="Directory of the results.")
+    parser.add_argument(
+        "--compare",
+        help="Results file to compare with.")
+    args = parser.parse_args()
+
+    fake_sd.install()
+    fake_sd.configure(call_latency=args.call_latency)
+    sizes = synthetic.QUICK_SIZES if args.quick else synthetic.FULL_SIZES
+
+    results = {}
+    skipped = {}
+    with tempfile.TemporaryDirectory(prefix="ayon_sd_bench_") as tmp_dir:
+        env = BenchmarkEnv(sizes=sizes, tmp_dir=tmp_dir)
+        for bench in BENCHMARKS:
+            if args.filter not in bench.name:
+                continue
+            missing = bench.get_missing_requirements()
+            if missing:
+                skipped[bench.name] = f"missing {', '.join(missing)}"
+                print(f"{bench.name:<45} skipped ({skipped[bench.name]})")
+                continue
+            result = run_benchmark(bench, env, args.repeat)
+            results[bench.name] = result
+            print(
+                f"{bench.name:<45} median {result['median'] * 1000:>10.2f}ms"
+                f"  min {result['min'] * 1000:>10.2f}ms"
+                f"  api calls {result['api_calls']:>8}"
+            )
+
+    version = get_addon_version()
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    output = {
+        "version": version,
+        "timestamp": timestamp,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": sizes,
+        "call_latency": args.call_latency,
+        "results": results,
+        "skipped": skipped,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    output_path = os.path.join(args.output, f"{version}_{timestamp}.json")
+    with open(output_path, "w") as stream:
+        json.dump(output, stream, indent=4)
+    print(f"\nResults saved to: {output_path}")
+
+    if args.compare:
+        with open(args.compare, "r") as stream:
+            print_comparison(results, json.load(stream))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""Builders of synthetic large packages and project templates."""
+import os
+import json
+import uuid
+
+import fake_sd
+
+
+# Sizes of the synthetic data
+FULL_SIZES = {
+    "graphs": 1000,
+    "resources": 10000,
+    "containers": 5000,
+    "instances": 200,
+    "template_graphs": 200,
+    "template_nodes": 50,
+}
+QUICK_SIZES = {
+    "graphs": 100,
+    "resources": 1000,
+    "containers": 500,
+    "instances": 20,
+    "template_graphs": 20,
+    "template_nodes": 10,
+}
+
+GRAPH_OUTPUTS = ("basecolor", "normal", "roughness", "metallic", "height")
+
+
+def get_graph_name(index):
+    return f"graph_{index:05d}"
+
+
+def get_container(index, representation_id=None):
+    return {
+        "schema": "ayon:container-2.0",
+        "id": "ayon.load.container",
+        "name": f"texture_{index:05d}",
+        "namespace": None,
+        "loader": "SubstanceLoadProjectImage",
+        "representation": representation_id or uuid.uuid4().hex,
+        "project_name": "benchmark",
+        "objectName": f"texture_{index:05d}",
+        "resource_loading_options": 1,
+    }
+
+
+def get_instance(index):
+    return {
+        "id": "ayon.create.instance",
+        "productType": "textureSet",
+        "productName": f"textureSetMain{index:03d}",
+        "creator_identifier": "io.ayon.creators.substancedesigner.textures",
+        "variant": f"Main{index:03d}",
+        "active": True,
+        "creator_attributes": {
+            "exportedGraphs": [],
+            "exportedGraphsOutputs": [],
+            "exportFileFormat": "png",
+            "review": False,
+        },
+        "publish_attributes": {},
+    }
+
+
+def build_package(filepath, sizes):
+    """Load a synthetic package into the fake package manager.
+
+    The package has `graphs` compositing graphs with `GRAPH_OUTPUTS`,
+    `resources` bitmaps and `containers` loaded containers stored in its
+    metadata. The first graph is set as the current graph.
+
+    Args:
+        filepath (str): file path of the package
+        sizes (dict): sizes of the synthetic data, see `FULL_SIZES`
+
+    Returns:
+        fake_sd.SDPackage: built package
+    """
+    application = fake_sd.get_application()
+    package_mgr = application.getPackageMgr()
+    package_mgr.clear()
+    package = package_mgr.add_package(fake_sd.SDPackage(filepath))
+    for index in range(sizes["graphs"]):
+        package.add_graph(get_graph_name(index), GRAPH_OUTPUTS)
+    package._add_resource(fake_sd.SDResourceFolder("Resources", package))
+    for index in range(sizes["resources"]):
+        package.add_bitmap(f"texture_{index:05d}", f"/textures/{index}.png")
+
+    containers = [
+        get_container(index) for index in range(sizes["containers"])
+    ]
+    package.getMetadataDict().setPropertyValueFromId(
+        "ayon_containers",
+        fake_sd.SDValueString.sNew(json.dumps(containers))
+    )
+    package._modified = False
+
+    ui_mgr = application.getQtForPythonUIMgr()
+    ui_mgr.current_graph = package.getChildrenResources(True)[0]
+    return package
+
+
+def write_template(filepath, graph_count, node_count):
+    """Write a synthetic `.sbs` project template.
+
+    Args:
+        filepath (str): template file path
+        graph_count (int): number of graphs
+        node_count (int): number of nodes of each graph
+    """
+    with open(filepath, "w") as stream:
+        stream.write('<?xml version="1.0" encoding="UTF-8"?>\n<package>')
+        stream.write('<identifier v="Unsaved Package"/>')
+        stream.write('<formatVersion v="1.1.0.202201"/>')
+        stream.write('<dependencies>')
+        for index in range(10):
+            stream.write(
+                f'<dependency><filename v="sbs://dependency_{index}.sbs"/>'
+                f'<uid v="{index + 1000}"/><type v="package"/></dependency>'
+            )
+        stream.write('</dependencies><content>')
+        for graph_index in range(graph_count):
+            stream.write(
+                f'<graph><identifier v="{get_graph_name(graph_index)}"/>'
+                f'<uid v="{graph_index}"/><graphOutputs>'
+            )
+            for output_index, output in enumerate(GRAPH_OUTPUTS):
+                stream.write(
+                    f'<graphoutput><identifier v="{output}"/>'
+                    f'<uid v="{output_index}"/></graphoutput>'
+                )
+            stream.write('</graphOutputs><compNodes>')
+            for node_index in range(node_count):
+                stream.write(
+                    f'<compNode><uid v="{node_index}"/>'
+                    '<compImplementation><compFilter>'
+                    '<filter v="blend"/><parameters><parameter>'
+                    '<name v="opacitymult"/><paramValue>'
+                    '<constantValueFloat1 v="0.5"/></paramValue>'
+                    '</parameter></parameters></compFilter>'
+                    '</compImplementation></compNode>'
+                )
+            stream.write('</compNodes></graph>')
+        stream.write('</content></package>\n')
+
+
+def get_template_path(directory, sizes):
+    filepath = os.path.join(
+        directory,
+        "template_{}x{}.sbs".format(
+            sizes["template_graphs"], sizes["template_nodes"])
+    )
+    if not os.path.exists(filepath):
+        write_template(
+            filepath, sizes["template_graphs"], sizes["template_nodes"])
+    return filepath
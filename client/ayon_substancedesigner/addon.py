@@ -1,5 +1,5 @@
 import os
-from ayon_core.addon import AYONAddon, IHostAddon
+from ayon_core.addon import AYONAddon, IHostAddon, click_wrap
 
 from .version import __version__
 
@@ -32,3 +32,44 @@ class SubstanceDesignerAddon(AYONAddon, IHostAddon):
 
     def get_workfile_extensions(self):
         return [".sbs", ".sbsar", ".sbsasm"]
+
+    def cli(self, click_group):
+        click_group.add_command(cli_main.to_click_obj())
+
+
+@click_wrap.group(
+    SubstanceDesignerAddon.name,
+    help="Substance Designer addon commands."
+)
+def cli_main():
+    pass
+
+
+@cli_main.command()
+@click_wrap.option(
+    "--project",
+    required=True,
+    help="Project name to prepare the template packages for."
+)
+@click_wrap.option(
+    "--resources-dir",
+    default=None,
+    help=(
+        "Default resources directory of Substance Designer. Defaults to "
+        "the one of the last Designer session using the template cache."
+    )
+)
+def prewarm_templates(project, resources_dir):
+    """Prepare template packages for all tasks of a project.
+
+    Point 'AYON_SD_TEMPLATE_CACHE_DIR' to a shared directory to make
+    the prepared packages available to other machines.
+    """
+    from .project_templates import prewarm_template_cache
+
+    try:
+        prepared_count = prewarm_template_cache(project, resources_dir)
+    except ValueError as exc:
+        print(f"Failed to prepare template packages: {exc}")
+        raise SystemExit(1)
+    print(f"Prepared template packages for {prepared_count} task(s).")
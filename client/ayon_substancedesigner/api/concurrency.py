@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""Run work on worker threads and `sd` API calls on the main thread.
+
+Objects of the `sd` API must only be used from the main thread of
+Substance Designer. Code which may run on other threads hands its `sd`
+API calls to the `MainThreadExecutor`, which runs them from the Qt event
+loop of Designer and returns futures. Many calls can share one hop to
+the main thread with `submit_batch`. Pure Python work like encoding or
+hashing runs on a `WorkerPool`.
+"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from qtpy import QtCore
+
+
+def _run_call(future, func):
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        result = func()
+    except BaseException as exc:
+        future.set_exception(exc)
+    else:
+        future.set_result(result)
+
+
+class _MainThreadInvoker(QtCore.QObject):
+    invoke = QtCore.Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.invoke.connect(self._on_invoke, QtCore.Qt.QueuedConnection)
+
+    def _on_invoke(self, calls):
+        for future, func in calls:
+            _run_call(future, func)
+
+
+class MainThreadExecutor:
+    """Run callables on the main thread from the Qt event loop.
+
+    The executor is bound to the Designer main window by `install`, which
+    has to be called from the main thread. Calls submitted from the main
+    thread run right away, waiting for a queued call there would never
+    finish. Until installed, or without a Qt application, all calls run
+    right away on the calling thread.
+    """
+
+    def __init__(self):
+        self._invoker = None
+
+    def install(self, main_window):
+        """Bind the executor to the event loop of Designer.
+
+        Args:
+            main_window (QtWidgets.QWidget): Designer main window, e.g.
+                from `qt_ui_manager().getMainWindow()`
+        """
+        self.uninstall()
+        self._invoker = _MainThreadInvoker(main_window)
+
+    def uninstall(self):
+        """Run the calls on the calling thread again."""
+        invoker, self._invoker = self._invoker, None
+        if invoker is not None:
+            invoker.deleteLater()
+
+    def is_main_thread(self):
+        """Whether the caller runs on the main thread of Designer.
+
+        Returns:
+            bool: Caller runs on the main thread, or the executor is not
+                installed.
+        """
+        invoker = self._invoker
+        if invoker is None:
+            return True
+        return QtCore.QThread.currentThread() == invoker.thread()
+
+    def submit(self, func, *args, **kwargs):
+        """Run the callable on the main thread.
+
+        Args:
+            func (Callable): callable using the `sd` API
+
+        Returns:
+            concurrent.futures.Future: future of the result
+        """
+        return self.submit_batch([lambda: func(*args, **kwargs)])[0]
+
+    def submit_batch(self, funcs):
+        """Run the callables one after another in a single main thread hop.
+
+        Args:
+            funcs (Iterable[Callable]): callables without arguments, e.g.
+                `functools.partial` objects
+
+        Returns:
+            list[concurrent.futures.Future]: futures of the results in
+                the order of the callables
+        """
+        calls = [(Future(), func) for func in funcs]
+        if self.is_main_thread():
+            for future, func in calls:
+                _run_call(future, func)
+        elif calls:
+            self._invoker.invoke.emit(calls)
+        return [future for future, _ in calls]
+
+    def schedule(self, func, *args, **kwargs):
+        """Run the callable once the control gets back to the event loop.
+
+        Unlike `submit` the call is queued even from the main thread, e.g.
+        to split long work to slices with events processed in between.
+
+        Args:
+            func (Callable): callable using the `sd` API
+
+        Returns:
+            concurrent.futures.Future: future of the result
+        """
+        future = Future()
+        call = (future, lambda: func(*args, **kwargs))
+        if self._invoker is not None:
+            self._invoker.invoke.emit([call])
+        elif QtCore.QCoreApplication.instance() is not None:
+            QtCore.QTimer.singleShot(0, lambda: _run_call(*call))
+        else:
+            _run_call(*call)
+        return future
+
+    def run(self, func, *args, **kwargs):
+        """Run the callable on the main thread and wait for its result.
+
+        Args:
+            func (Callable): callable using the `sd` API
+
+        Returns:
+            Any: result of the callable
+        """
+        return self.submit(func, *args, **kwargs).result()
+
+
+class WorkerPool:
+    """Pool of worker threads for pure Python work.
+
+    The workers must not use the `sd` API, they can hand the calls to the
+    `MainThreadExecutor` instead.
+
+    Args:
+        max_workers (int): number of worker threads, number of CPUs
+            with 0
+        name (str): name used as prefix of the thread names
+    """
+
+    def __init__(self, max_workers=0, name="worker"):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=f"ayon_sd_{name}"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def submit(self, func, *args, **kwargs):
+        """Run the callable on a worker thread.
+
+        Returns:
+            concurrent.futures.Future: future of the result
+        """
+        return self._executor.submit(func, *args, **kwargs)
+
+    def map(self, func, *iterables):
+        """Run the callable for each item on the worker threads.
+
+        Returns:
+            Iterator: results in the order of the items
+        """
+        return self._executor.map(func, *iterables)
+
+    def shutdown(self, wait=True):
+        """Stop the workers once the submitted work finished."""
+        self._executor.shutdown(wait=wait)
+
+
+_main_thread_executor = MainThreadExecutor()
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
+
+
+def get_main_thread_executor():
+    """Get the shared main thread executor.
+
+    Returns:
+        MainThreadExecutor: main thread executor
+    """
+    return _main_thread_executor
+
+
+def get_worker_pool():
+    """Get the shared worker pool with one worker per CPU.
+
+    Returns:
+        WorkerPool: worker pool
+    """
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = WorkerPool(name="worker")
+        return _worker_pool
+
+
+def shutdown_worker_pool():
+    """Stop the shared worker pool, e.g. when the host is uninstalled."""
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is not None:
+            _worker_pool.shutdown()
+            _worker_pool = None
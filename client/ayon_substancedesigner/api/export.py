@@ -0,0 +1,619 @@
+# -*- coding: utf-8 -*-
+"""Texture export pipeline for Substance Designer graph outputs."""
+import os
+import time
+import ctypes
+import logging
+import collections
+import dataclasses
+
+from qtpy import QtCore, QtWidgets
+
+from sd.api.sdapiobject import APIException
+
+from .lib import save_export_plan_item, set_graph_output_size
+from .concurrency import WorkerPool, get_main_thread_executor
+from .texture_processing import (
+    QT_FORMAT_BY_BYTES_PER_PIXEL,
+    TextureBuffer,
+    downsample_texture_buffer,
+    get_downsampled_size,
+    pack_channels,
+    read_texture_buffer,
+    texture_buffer_to_qimage
+)
+
+
+log = logging.getLogger("ayon_substancedesigner")
+
+# Image formats which can be encoded by Qt outside of Substance Designer
+QT_IMAGE_FORMATS = {
+    "bmp": "BMP",
+    "jpg": "JPG",
+    "jpeg": "JPG",
+    "png": "PNG",
+}
+# Quality of the jpg files written by Qt, Qt uses 75 by default
+QT_JPG_QUALITY = 100
+
+
+def get_texture_buffer(texture):
+    """Copy pixel data of a SDTexture.
+
+    This has to be called from the main thread of Substance Designer.
+
+    Args:
+        texture (sd.api.sdtexture.SDTexture): texture
+
+    Returns:
+        TextureBuffer: copied pixel data with dimensions
+    """
+    size = texture.getSize()
+    bytes_per_pixel = texture.getBytesPerPixel()
+    data = ctypes.string_at(
+        texture.getPixelBufferAddress(),
+        size.x * size.y * bytes_per_pixel
+    )
+    return TextureBuffer(size.x, size.y, bytes_per_pixel, data)
+
+
+def can_encode_texture(texture, filepath):
+    """Whether the texture can be encoded by Qt outside of Designer.
+
+    Args:
+        texture (sd.api.sdtexture.SDTexture): texture
+        filepath (str): output filepath
+
+    Returns:
+        bool: Qt can write the texture.
+    """
+    ext = os.path.splitext(filepath)[-1].lstrip(".").lower()
+    if ext not in QT_IMAGE_FORMATS:
+        return False
+    return texture.getBytesPerPixel() in QT_FORMAT_BY_BYTES_PER_PIXEL
+
+
+def write_texture_buffer(texture_buffer, filepath):
+    """Encode and write texture buffer with Qt.
+
+    Args:
+        texture_buffer (TextureBuffer): pixel data
+        filepath (str): output filepath, the extension must be one of
+            `QT_IMAGE_FORMATS`
+
+    Raises:
+        RuntimeError: When Qt fails to write the image.
+    """
+    ext = os.path.splitext(filepath)[-1].lstrip(".").lower()
+    image_format = QT_IMAGE_FORMATS[ext]
+    quality = QT_JPG_QUALITY if image_format == "JPG" else -1
+    image = texture_buffer_to_qimage(texture_buffer)
+    if not image.save(filepath, image_format, quality):
+        raise RuntimeError(f"Failed to write image: {filepath}")
+
+
+@dataclasses.dataclass
+class PackedTexture:
+    """Texture packed from the channels of exported textures.
+
+    Attributes:
+        filepath (str): output filepath, the extension must be one of
+            `QT_IMAGE_FORMATS`
+        source_filepaths (dict): filepaths of the exported textures by
+            channel name
+        variant_filepaths (dict): output filepaths of smaller variants
+            by resolution of their longest side
+        buffers (dict): pixel data of the exported textures kept in memory
+            by filepath
+    """
+    filepath: str
+    source_filepaths: dict
+    variant_filepaths: dict = dataclasses.field(default_factory=dict)
+    buffers: dict = dataclasses.field(default_factory=dict)
+
+    def is_ready(self):
+        """Whether pixel data of all exported textures is in memory."""
+        return all(
+            filepath in self.buffers
+            for filepath in self.source_filepaths.values()
+        )
+
+    def get_channel_buffers(self):
+        """Get pixel data by channel, missing data is read from the files.
+
+        Returns:
+            dict: pixel data by channel name
+        """
+        return {
+            channel: (
+                self.buffers.get(filepath)
+                or read_texture_buffer(filepath)
+            )
+            for channel, filepath in self.source_filepaths.items()
+        }
+
+
+class ChannelPacker:
+    """Pack grayscale textures into the channels of new textures.
+
+    The `TextureExportPipeline` hands over the pixel data of the exported
+    textures it copies anyway, a texture is packed as soon as all of its
+    sources are in memory. Textures with sources saved by Substance
+    Designer, fetched from the export cache or rendered in separate
+    processes are packed by `pack_from_files` once those are written.
+    """
+
+    def __init__(self):
+        self.textures = []
+        self._textures_by_source = {}
+        self.timings = []
+        self.errors = []
+        # Filepaths of the resolution variants which were not written
+        self.skipped_variants = []
+
+    def add_texture(self, filepath, source_filepaths,
+                    variant_filepaths=None):
+        """Queue a texture packed from exported textures.
+
+        Args:
+            filepath (str): output filepath
+            source_filepaths (dict): filepaths of the exported textures
+                by channel name
+            variant_filepaths (dict, optional): output filepaths of smaller
+                variants by resolution of their longest side
+        """
+        packed_texture = PackedTexture(
+            filepath, source_filepaths, variant_filepaths or {})
+        self.textures.append(packed_texture)
+        for source_filepath in set(source_filepaths.values()):
+            self._textures_by_source.setdefault(
+                source_filepath, []).append(packed_texture)
+
+    def is_source(self, filepath):
+        """Whether the exported texture is packed into a queued texture.
+
+        Args:
+            filepath (str): filepath of the exported texture
+
+        Returns:
+            bool: Pixel data of the texture is needed.
+        """
+        return filepath in self._textures_by_source
+
+    def take_ready_textures(self, filepath, texture_buffer):
+        """Keep pixel data of an exported texture until it is packed.
+
+        Args:
+            filepath (str): filepath of the exported texture
+            texture_buffer (TextureBuffer): pixel data of the texture
+
+        Returns:
+            list[PackedTexture]: textures with pixel data of all sources,
+                they are removed from the queue
+        """
+        ready = []
+        for packed_texture in self._textures_by_source.pop(filepath, []):
+            packed_texture.buffers[filepath] = texture_buffer
+            if packed_texture.is_ready():
+                ready.append(packed_texture)
+        for packed_texture in ready:
+            self._remove(packed_texture)
+        return ready
+
+    def pack_from_files(self):
+        """Pack the queued textures reading missing sources from files.
+
+        Returns:
+            list: timings of the packed textures
+        """
+        for packed_texture in list(self.textures):
+            self._remove(packed_texture)
+            try:
+                write_time = _timed_pack(packed_texture)
+            except Exception as exc:
+                self.errors.append((packed_texture.filepath, str(exc)))
+                continue
+            self.timings.append({
+                "filepath": packed_texture.filepath,
+                "mode": "pack",
+                "fetch": 0.0,
+                "write": write_time,
+                "size": _get_file_size(packed_texture.filepath)
+            })
+        return self.timings
+
+    def _remove(self, packed_texture):
+        self.textures.remove(packed_texture)
+        for source_filepath in set(packed_texture.source_filepaths.values()):
+            textures = self._textures_by_source.get(source_filepath)
+            if textures and packed_texture in textures:
+                textures.remove(packed_texture)
+                if not textures:
+                    del self._textures_by_source[source_filepath]
+
+
+class TextureExportPipeline:
+    """Save textures with a bounded pool of encoding workers.
+
+    Pixel data is fetched from Substance Designer on the calling (main)
+    thread and encoded and written to disk by the workers. Textures whose
+    file format or pixel format can't be handled by the workers are saved
+    by Substance Designer directly.
+
+    Smaller resolution variants of a texture are downsampled from the
+    copied pixel data and written together with the texture. Variants of
+    textures which only Substance Designer can write, e.g. 16-bit ones,
+    are skipped and listed in `skipped_variants`.
+
+    Textures packed by the channel packer from the copied pixel data are
+    written by the workers too.
+
+    The number of textures waiting for the workers is limited to twice the
+    worker count to keep the memory usage of the copied buffers bounded.
+
+    Args:
+        max_workers (int): Number of encoding workers. With 0 all textures
+            are saved by Substance Designer on the calling thread.
+        channel_packer (ChannelPacker, optional): packer getting the pixel
+            data of its source textures
+    """
+
+    def __init__(self, max_workers=0, channel_packer=None):
+        self.max_workers = max_workers
+        self.channel_packer = channel_packer
+        self._worker_pool = None
+        if max_workers > 0:
+            self._worker_pool = WorkerPool(max_workers, name="export")
+        self._pending = collections.deque()
+        self.timings = []
+        self.errors = []
+        # Filepaths of the resolution variants which were not written
+        self.skipped_variants = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.finish()
+
+    def can_use_workers(self, texture, filepath):
+        """Whether the texture can be written by the workers.
+
+        Args:
+            texture (sd.api.sdtexture.SDTexture): texture
+            filepath (str): output filepath
+
+        Returns:
+            bool: Workers can write the texture.
+        """
+        if self._worker_pool is None:
+            return False
+        return can_encode_texture(texture, filepath)
+
+    def save(self, texture, filepath, variant_filepaths=None):
+        """Save texture to filepath.
+
+        Args:
+            texture (sd.api.sdtexture.SDTexture): texture
+            filepath (str): output filepath
+            variant_filepaths (dict, optional): output filepaths of smaller
+                variants of the texture by resolution of their longest side
+        """
+        start = time.perf_counter()
+        if variant_filepaths and not can_encode_texture(texture, filepath):
+            # Save the full texture by Designer without the variants
+            self.skipped_variants.extend(variant_filepaths.values())
+            variant_filepaths = None
+
+        is_packing_source = (
+            self.channel_packer is not None
+            and self.channel_packer.is_source(filepath)
+            and can_encode_texture(texture, filepath)
+        )
+        if not (
+            variant_filepaths
+            or is_packing_source
+            or self.can_use_workers(texture, filepath)
+        ):
+            try:
+                texture.save(filepath)
+            except APIException as exc:
+                self.errors.append((filepath, str(exc)))
+                return
+            self.timings.append({
+                "filepath": filepath,
+                "mode": "main",
+                "fetch": 0.0,
+                "write": time.perf_counter() - start,
+                "size": _get_file_size(filepath)
+            })
+            return
+
+        texture_buffer = get_texture_buffer(texture)
+        fetch_time = time.perf_counter() - start
+        writes = [(
+            filepath, fetch_time,
+            _timed_write, (texture_buffer, filepath, variant_filepaths)
+        )]
+        if is_packing_source:
+            for packed_texture in self.channel_packer.take_ready_textures(
+                filepath, texture_buffer
+            ):
+                writes.append((
+                    packed_texture.filepath, 0.0,
+                    _timed_pack, (packed_texture,)
+                ))
+
+        for output_filepath, output_fetch_time, func, args in writes:
+            if self._worker_pool is None:
+                try:
+                    write_time = func(*args)
+                except Exception as exc:
+                    self.errors.append((output_filepath, str(exc)))
+                    continue
+                self.timings.append({
+                    "filepath": output_filepath,
+                    "mode": "main",
+                    "fetch": output_fetch_time,
+                    "write": write_time,
+                    "size": _get_file_size(output_filepath)
+                })
+                continue
+
+            while len(self._pending) >= self.max_workers * 2:
+                self._collect(self._pending.popleft())
+
+            future = self._worker_pool.submit(func, *args)
+            self._pending.append((future, output_filepath, output_fetch_time))
+
+    def finish(self):
+        """Wait for all pending textures and shut down the workers.
+
+        Returns:
+            list: timings of the saved textures
+        """
+        while self._pending:
+            self._collect(self._pending.popleft())
+        if self._worker_pool is not None:
+            self._worker_pool.shutdown()
+            self._worker_pool = None
+        return self.timings
+
+    def _collect(self, pending_item):
+        future, filepath, fetch_time = pending_item
+        try:
+            write_time = future.result()
+        except Exception as exc:
+            self.errors.append((filepath, str(exc)))
+            return
+        self.timings.append({
+            "filepath": filepath,
+            "mode": "worker",
+            "fetch": fetch_time,
+            "write": write_time,
+            "size": _get_file_size(filepath)
+        })
+
+
+def _timed_write(texture_buffer, filepath, variant_filepaths=None):
+    start = time.perf_counter()
+    write_texture_buffer(texture_buffer, filepath)
+    # Downsample from the next larger variant, not the full texture
+    source_buffer = texture_buffer
+    for resolution, variant_filepath in sorted(
+        (variant_filepaths or {}).items(), reverse=True
+    ):
+        width, height = get_downsampled_size(texture_buffer, resolution)
+        source_buffer = downsample_texture_buffer(
+            source_buffer, width, height)
+        write_texture_buffer(source_buffer, variant_filepath)
+    return time.perf_counter() - start
+
+
+def _timed_pack(packed_texture):
+    start = time.perf_counter()
+    texture_buffer = pack_channels(packed_texture.get_channel_buffers())
+    # Release the source buffers before encoding
+    packed_texture.buffers.clear()
+    _timed_write(
+        texture_buffer, packed_texture.filepath,
+        packed_texture.variant_filepaths
+    )
+    return time.perf_counter() - start
+
+
+def _get_file_size(filepath):
+    try:
+        return os.path.getsize(filepath)
+    except OSError:
+        return 0
+
+
+@dataclasses.dataclass
+class ExportProgress:
+    """Progress of a sliced export.
+
+    Attributes:
+        graphs_total (int): number of graphs to export
+        maps_total (int): number of maps to write
+        graphs_done (int): number of exported graphs
+        maps_done (int): number of written maps
+        start_time (float): `time.perf_counter` of the export start
+    """
+    graphs_total: int = 0
+    maps_total: int = 0
+    graphs_done: int = 0
+    maps_done: int = 0
+    start_time: float = None
+
+    def get_eta(self):
+        """Estimate the remaining time from the maps written so far.
+
+        Returns:
+            float: remaining seconds, None before the first map is written
+        """
+        if not self.maps_done or self.start_time is None:
+            return None
+        elapsed = time.perf_counter() - self.start_time
+        return elapsed / self.maps_done * (self.maps_total - self.maps_done)
+
+    def format(self):
+        text = (
+            f"Graphs done: {self.graphs_done}/{self.graphs_total}\n"
+            f"Maps written: {self.maps_done}/{self.maps_total}"
+        )
+        eta = self.get_eta()
+        if eta is not None:
+            minutes, seconds = divmod(int(eta), 60)
+            text += f"\nRemaining: {minutes}m {seconds:02d}s"
+        return text
+
+
+class SlicedExportRunner:
+    """Export graphs in small slices run from the Qt event loop.
+
+    Each slice either computes one graph or saves one texture. Between the
+    slices the control goes back to the Qt event loop, so Designer stays
+    responsive during the export. A progress dialog shows the graphs done,
+    the maps written and the remaining time. Its cancel button stops the
+    export before the next slice, the textures of the slices already run
+    are still finished by the export pipeline.
+
+    The slices are scheduled on the main thread by the main thread
+    executor. Without a Qt application the slices run one after another
+    right away.
+
+    Args:
+        export_pipeline (TextureExportPipeline): pipeline saving textures
+        parent (QtWidgets.QWidget, optional): parent of the progress dialog
+        executor (MainThreadExecutor, optional): executor running the
+            slices, the shared one by default
+    """
+
+    def __init__(self, export_pipeline, parent=None, executor=None):
+        self.export_pipeline = export_pipeline
+        self.parent = parent
+        self.executor = executor or get_main_thread_executor()
+        self.progress = ExportProgress()
+        # Time spent in the slices of each graph
+        self.graph_timings = {}
+        self.canceled = False
+        self._tasks = collections.deque()
+        self._output_sizes = {}
+        # Callbacks restoring output sizes of graphs being exported
+        self._restore_output_size_callbacks = {}
+        self._error = None
+        self._loop = None
+        self._dialog = None
+
+    def add_graph(self, target_graph, plan, output_size=None):
+        """Queue compute of the graph and saving of its planned textures.
+
+        Args:
+            target_graph (sd.api.sbs.sdsbscompgraph.SDSBSCompGraph): graph
+            plan (list[ExportPlanItem]): export plan of the graph
+            output_size (int, optional): resolution the graph is computed
+                at until its textures are saved
+        """
+        graph_name = target_graph.getIdentifier()
+        if output_size:
+            self._output_sizes[graph_name] = output_size
+        self._tasks.append((graph_name, target_graph, None))
+        for item in plan:
+            self._tasks.append((graph_name, None, item))
+        self.progress.graphs_total += 1
+        self.progress.maps_total += len(plan)
+
+    def run(self):
+        """Run all queued slices.
+
+        Raises:
+            Exception: Error raised by a slice.
+
+        Returns:
+            bool: All slices ran, False when the export was canceled.
+        """
+        self.progress.start_time = time.perf_counter()
+        try:
+            return self._run()
+        finally:
+            for restore in self._restore_output_size_callbacks.values():
+                restore()
+            self._restore_output_size_callbacks.clear()
+
+    def _run(self):
+        if QtCore.QCoreApplication.instance() is None:
+            while self._tasks:
+                self._run_task(self._tasks.popleft())
+            return True
+
+        self._dialog = QtWidgets.QProgressDialog(
+            self.progress.format(), "Cancel", 0, len(self._tasks),
+            self.parent
+        )
+        self._dialog.setWindowTitle("Exporting textures")
+        self._dialog.setWindowModality(QtCore.Qt.NonModal)
+        self._dialog.setMinimumDuration(0)
+        self._dialog.setAutoClose(False)
+        self._dialog.setAutoReset(False)
+        self._dialog.canceled.connect(self.cancel)
+        self._dialog.show()
+
+        self._loop = QtCore.QEventLoop()
+        self.executor.schedule(self._run_next)
+        try:
+            self._loop.exec_()
+        finally:
+            self._dialog.canceled.disconnect(self.cancel)
+            self._dialog.close()
+            self._dialog.deleteLater()
+            self._dialog = None
+            self._loop = None
+
+        if self._error is not None:
+            raise self._error
+        return not self.canceled
+
+    def cancel(self):
+        """Stop the export before the next slice."""
+        self.canceled = True
+
+    def _run_next(self):
+        if self._dialog.wasCanceled():
+            self.canceled = True
+        if self.canceled or not self._tasks:
+            self._loop.quit()
+            return
+        try:
+            self._run_task(self._tasks.popleft())
+        except Exception as exc:
+            self._error = exc
+            self._loop.quit()
+            return
+
+        self._dialog.setValue(self._dialog.maximum() - len(self._tasks))
+        self._dialog.setLabelText(self.progress.format())
+        self.executor.schedule(self._run_next)
+
+    def _run_task(self, task):
+        graph_name, target_graph, item = task
+        start = time.perf_counter()
+        if item is None:
+            output_size = self._output_sizes.get(graph_name)
+            if output_size:
+                self._restore_output_size_callbacks[graph_name] = (
+                    set_graph_output_size(target_graph, output_size))
+            target_graph.compute()
+        else:
+            save_export_plan_item(item, export_pipeline=self.export_pipeline)
+            self.progress.maps_done += 1
+        self.graph_timings[graph_name] = (
+            self.graph_timings.get(graph_name, 0.0)
+            + time.perf_counter() - start
+        )
+        if not self._tasks or self._tasks[0][0] != graph_name:
+            self.progress.graphs_done += 1
+            restore = self._restore_output_size_callbacks.pop(
+                graph_name, None)
+            if restore is not None:
+                restore()
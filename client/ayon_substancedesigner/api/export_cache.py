@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""On-disk cache of exported graph outputs."""
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+
+
+log = logging.getLogger("ayon_substancedesigner")
+
+
+def get_export_cache_dir():
+    """Get the directory of the export cache in the local temp dir.
+
+    Returns:
+        str: export cache directory
+    """
+    return os.path.join(
+        tempfile.gettempdir(), "ayon_substancedesigner", "export_cache"
+    )
+
+
+class ExportCache:
+    """Cache of exported textures keyed by the content of their graph.
+
+    Cached files are linked (or copied when linking is not possible) into
+    the staging directory instead of computing and saving the graph
+    outputs again. The least recently used files are evicted when the
+    cache grows over its size limit.
+
+    Args:
+        cache_dir (str): directory of the cached files
+        size_limit (int): size limit of the cache in bytes
+    """
+
+    def __init__(self, cache_dir, size_limit):
+        self.cache_dir = cache_dir
+        self.size_limit = size_limit
+
+    @staticmethod
+    def get_key(graph_fingerprint, map_identifier, extension):
+        """Get cache key of a graph output.
+
+        Args:
+            graph_fingerprint (str): hash of the graph content, see
+                `get_graph_fingerprint`
+            map_identifier (str): output identifier
+            extension (str): file format of the exported texture
+
+        Returns:
+            str: cache key
+        """
+        hasher = hashlib.sha1()
+        for value in (graph_fingerprint, map_identifier, extension):
+            hasher.update(value.encode())
+            hasher.update(b"\0")
+        return hasher.hexdigest()
+
+    def _get_path(self, key, extension):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{extension}")
+
+    def fetch(self, key, extension, dst_path):
+        """Put cached file to the destination path.
+
+        Args:
+            key (str): cache key
+            extension (str): file extension
+            dst_path (str): destination filepath
+
+        Returns:
+            bool: Whether the file was found in the cache.
+        """
+        cached_path = self._get_path(key, extension)
+        if not os.path.isfile(cached_path):
+            return False
+
+        if os.path.exists(dst_path):
+            os.remove(dst_path)
+        try:
+            os.link(cached_path, dst_path)
+        except OSError:
+            shutil.copyfile(cached_path, dst_path)
+        # Mark the file as recently used
+        os.utime(cached_path)
+        return True
+
+    def store(self, key, extension, src_path):
+        """Copy exported file into the cache.
+
+        Args:
+            key (str): cache key
+            extension (str): file extension
+            src_path (str): exported filepath
+        """
+        cached_path = self._get_path(key, extension)
+        os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+        tmp_path = f"{cached_path}.tmp"
+        shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, cached_path)
+
+    def evict(self):
+        """Remove least recently used files over the size limit.
+
+        Returns:
+            int: number of bytes removed
+        """
+        cached_files = []
+        total_size = 0
+        for root, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                cached_files.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        removed_size = 0
+        cached_files.sort()
+        for _, size, path in cached_files:
+            if total_size - removed_size <= self.size_limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                log.debug(f"Failed to evict cached texture: {path}")
+                continue
+            removed_size += size
+
+        return removed_size
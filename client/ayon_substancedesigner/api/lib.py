@@ -3,10 +3,21 @@ import os
 import sd
 import json
 import contextlib
+import hashlib
+import dataclasses
+
+from qtpy import QtCore
 
 from sd.api.sdapiobject import APIException
 from sd.api.sbs import sdsbscompgraph
 from sd.api import sdproperty
+from sd.api.sdvalueint2 import SDValueInt2
+from sd.api.sdbasetypes import int2
+
+from ayon_substancedesigner.metadata_encoding import (
+    encode_metadata,
+    decode_metadata_json
+)
 
 
 def package_manager():
@@ -60,19 +71,304 @@ def get_current_graph_name():
     return current_graph.getIdentifier()
 
 
+class SDResourceIndex:
+    """Index of the resources of all loaded user packages.
+
+    The index is built in a single pass over
+    `SDPackageMgr.getUserPackages()` and stores the resources by class name
+    and by (package path, identifier). It gets rebuilt when the loaded user
+    packages differ from the indexed ones, when a looked up resource no
+    longer matches, or on the first access after `invalidate` is called,
+    e.g. on package load and save and on reset of the publisher.
+
+    Resources created in Designer after the index was built are found
+    after the next invalidation, resources created by the addon are added
+    with `register_resource`. Lookups of resources which don't exist don't
+    rebuild the index.
+    """
+
+    def __init__(self):
+        self._package_paths = None
+        # {class name: {package path: {identifier: resource}}}
+        self._resources_by_class_name = {}
+
+    def invalidate(self):
+        """Mark the index to be rebuilt on next access."""
+        self._package_paths = None
+        self._resources_by_class_name = {}
+
+    def build(self):
+        """Index resources of all user packages."""
+        resources_by_class_name = {}
+        package_paths = []
+        for package in package_manager().getUserPackages():
+            package_path = package.getFilePath()
+            package_paths.append(package_path)
+            for resource in package.getChildrenResources(True):
+                resources_by_package = resources_by_class_name.setdefault(
+                    resource.getClassName(), {})
+                resources = resources_by_package.setdefault(package_path, {})
+                # Keep the first resource found just like the lookups did
+                # before when walking the packages
+                resources.setdefault(resource.getIdentifier(), resource)
+
+        self._package_paths = tuple(package_paths)
+        self._resources_by_class_name = resources_by_class_name
+
+    def _ensure_valid(self):
+        package_paths = tuple(
+            package.getFilePath()
+            for package in package_manager().getUserPackages()
+        )
+        if package_paths != self._package_paths:
+            self.build()
+
+    def _find(self, class_name, identifier, package_path):
+        resources_by_package = self._resources_by_class_name.get(
+            class_name, {})
+        if package_path is not None:
+            package_paths = [package_path]
+        else:
+            package_paths = self._package_paths
+        for path in package_paths:
+            resource = resources_by_package.get(path, {}).get(identifier)
+            if resource is None:
+                continue
+            if _is_same_resource(resource, identifier):
+                return resource
+            return False
+        return None
+
+    def _list(self, class_name, package_path):
+        resources_by_package = self._resources_by_class_name.get(
+            class_name, {})
+        if package_path is not None:
+            package_paths = [package_path]
+        else:
+            package_paths = self._package_paths
+        resources = []
+        for path in package_paths:
+            for identifier, resource in resources_by_package.get(
+                path, {}
+            ).items():
+                if not _is_same_resource(resource, identifier):
+                    return None
+                resources.append(resource)
+        return resources
+
+    def get_resource(self, class_name, identifier, package_path=None):
+        """Get resource by its class name and identifier.
+
+        Args:
+            class_name (str): class name of the resource,
+                e.g. "SDSBSCompGraph"
+            identifier (str): resource identifier
+            package_path (str, optional): limit the lookup to package
+                with this file path. Defaults to all user packages.
+
+        Returns:
+            sd.api.sdresource.SDResource: found resource or None
+        """
+        self._ensure_valid()
+        resource = self._find(class_name, identifier, package_path)
+        if resource is False:
+            # Resource has been deleted or replaced since the index
+            # was built
+            self.build()
+            resource = self._find(class_name, identifier, package_path)
+        return resource or None
+
+    def register_resource(self, resource):
+        """Add a newly created resource to the index.
+
+        Resources created after the index was built are otherwise only
+        found after a rebuild of the whole index.
+
+        Args:
+            resource (sd.api.sdresource.SDResource): created resource
+        """
+        if self._package_paths is None:
+            # Index will be built on next access
+            return
+        package_path = resource.getPackage().getFilePath()
+        resources_by_package = self._resources_by_class_name.setdefault(
+            resource.getClassName(), {})
+        resources = resources_by_package.setdefault(package_path, {})
+        resources.setdefault(resource.getIdentifier(), resource)
+
+    def unregister_resource(self, resource):
+        """Remove a resource from the index.
+
+        Has to be called before the resource is deleted.
+
+        Args:
+            resource (sd.api.sdresource.SDResource): resource to be removed
+        """
+        if self._package_paths is None:
+            return
+        package_path = resource.getPackage().getFilePath()
+        resources = self._resources_by_class_name.get(
+            resource.getClassName(), {}).get(package_path, {})
+        identifier = resource.getIdentifier()
+        indexed_resource = resources.get(identifier)
+        if indexed_resource is None:
+            return
+        # The API returns new wrapper objects, compare resources by url
+        try:
+            is_same = indexed_resource.getUrl() == resource.getUrl()
+        except APIException:
+            is_same = True
+        if is_same:
+            resources.pop(identifier)
+
+    def get_resources(self, class_name, package_path=None):
+        """Get all resources of a class name.
+
+        Args:
+            class_name (str): class name of the resources
+            package_path (str, optional): limit the resources to package
+                with this file path. Defaults to all user packages.
+
+        Returns:
+            list: resources
+        """
+        self._ensure_valid()
+        resources = self._list(class_name, package_path)
+        if resources is None:
+            # Some resources have been deleted or replaced since the index
+            # was built
+            self.build()
+            resources = self._list(class_name, package_path)
+        return resources or []
+
+
+def _is_same_resource(resource, identifier):
+    try:
+        return resource.getIdentifier() == identifier
+    except APIException:
+        # Resource has been deleted
+        return False
+
+
+_resource_index = SDResourceIndex()
+
+
+def get_resource_index():
+    """Get the resource index of the loaded user packages.
+
+    Returns:
+        SDResourceIndex: resource index
+    """
+    return _resource_index
+
+
+def invalidate_resource_index():
+    """Rebuild the resource index on next lookup.
+
+    Should be called whenever a package is loaded, unloaded or saved.
+    """
+    _resource_index.invalidate()
+    invalidate_package_snapshots()
+
+
+@dataclasses.dataclass
+class PackageSnapshot:
+    """Compact description of the content of a Substance package.
+
+    Only plain data is kept, no objects of the `sd` API.
+
+    Attributes:
+        package_path (str): file path of the package
+        graphs (list): identifiers of SDSBSCompGraph resources
+        map_identifiers_by_graph (dict): output identifiers by graph
+            identifier
+    """
+    package_path: str
+    graphs: list = dataclasses.field(default_factory=list)
+    map_identifiers_by_graph: dict = dataclasses.field(default_factory=dict)
+
+    @property
+    def output_maps(self):
+        """Output identifiers of all graphs in the package.
+
+        Returns:
+            set: output identifiers
+        """
+        return {
+            map_identifier
+            for map_identifiers in self.map_identifiers_by_graph.values()
+            for map_identifier in map_identifiers
+        }
+
+
+_package_snapshots = {}
+
+
+def scan_package(target_package):
+    """Collect graphs and their outputs of a package at once.
+
+    Args:
+        target_package (sd.api.sdpackage.SDPackage): target SD Package
+
+    Returns:
+        PackageSnapshot: snapshot of the package content
+    """
+    package_path = target_package.getFilePath()
+    snapshot = PackageSnapshot(package_path)
+    for graph in _resource_index.get_resources(
+            "SDSBSCompGraph", package_path):
+        graph_name = graph.getIdentifier()
+        map_identifiers = set()
+        for output_node in graph.getOutputNodes():
+            for output in output_node.getProperties(
+                    sdproperty.SDPropertyCategory.Output):
+                map_identifiers.add(output.getId())
+
+        snapshot.graphs.append(graph_name)
+        snapshot.map_identifiers_by_graph[graph_name] = map_identifiers
+    return snapshot
+
+
+def get_package_snapshot(target_package=None):
+    """Get the snapshot of a package, scan the package if needed.
+
+    The snapshot is reused until `invalidate_package_snapshots` is called,
+    which happens on each reset of the publisher and whenever the resource
+    index is invalidated.
+
+    Args:
+        target_package (sd.api.sdpackage.SDPackage, optional): target SD
+            Package. Defaults to the package of the current graph.
+
+    Returns:
+        PackageSnapshot: snapshot of the package content, None if there is
+            no package.
+    """
+    if target_package is None:
+        target_package = get_package_from_current_graph()
+        if target_package is None:
+            return None
+
+    package_path = target_package.getFilePath()
+    snapshot = _package_snapshots.get(package_path)
+    if snapshot is None:
+        snapshot = scan_package(target_package)
+        _package_snapshots[package_path] = snapshot
+    return snapshot
+
+
+def invalidate_package_snapshots():
+    """Scan the packages again on next snapshot request."""
+    _package_snapshots.clear()
+
+
 def get_sd_graphs_by_package():
     """Get Substance Designer Graphs by package
 
     Returns:
         list: name of Substance Designer Graphs
     """
-    current_package = get_package_from_current_graph()
-    return [
-        resource.getIdentifier()
-        for resource in
-        current_package.getChildrenResources(True)
-        if resource.getClassName() == "SDSBSCompGraph"
-    ]
+    return list(get_package_snapshot().graphs)
 
 
 def get_sd_graph_by_name(graph_name):
@@ -84,14 +380,7 @@ def get_sd_graph_by_name(graph_name):
     Returns:
         sd.api.sdgraph.SDGraph: SD Graph
     """
-    pkg_mgr = package_manager()
-    for package in pkg_mgr.getUserPackages():
-        for resource in package.getChildrenResources(True):
-            if (
-                resource.getClassName() == "SDSBSCompGraph"
-                and resource.getIdentifier() == graph_name
-            ):
-                return resource
+    return _resource_index.get_resource("SDSBSCompGraph", graph_name)
 
 
 def get_map_identifiers_by_graph(target_graph_name):
@@ -103,6 +392,10 @@ def get_map_identifiers_by_graph(target_graph_name):
     Returns:
         set: all map identifiers
     """
+    snapshot = get_package_snapshot()
+    if snapshot and target_graph_name in snapshot.map_identifiers_by_graph:
+        return set(snapshot.map_identifiers_by_graph[target_graph_name])
+
     all_map_identifiers = set()
     target_graph = get_sd_graph_by_name(target_graph_name)
     if target_graph:
@@ -114,21 +407,215 @@ def get_map_identifiers_by_graph(target_graph_name):
     return all_map_identifiers
 
 
-def set_sd_metadata(metadata_type: str, metadata):
-    """Set AYON-related metadata in Substance Painter
+class SDMetadataCache:
+    """Cache of the parsed AYON metadata stored in Substance packages.
 
-    Args:
-        metadata_type (str): AYON metadata key
-        metadata (dict/list): AYON-related metadata
+    Parsing the AYON metadata means reading the whole JSON string from the
+    package metadata dict, so the parsed values are kept in memory for as
+    long as the package keeps its file path and modified state. The JSON
+    is kept too, so copies are parsed from it instead of deep copied.
+
+    Changes are stored in the cache and marked dirty. They are written back
+    to the package on `flush`, which happens right away unless the change
+    is done inside a `batch`.
     """
+
+    def __init__(self):
+        self._entries = {}
+        self._batch_depth = 0
+        self._deferred_flush = False
+        self._flush_scheduled = False
+
+    def get(self, target_package, metadata_type, is_dictionary=True):
+        """Get the cached metadata, parse it from the package if needed.
+
+        The returned value is shared with the cache, any change to it must
+        be followed by `set`.
+
+        Args:
+            target_package (sd.api.sdpackage.SDPackage): target SD Package
+            metadata_type (str): Ayon metadata type
+            is_dictionary (bool): Whether the metadata is a dictionary.
+
+        Returns:
+            dict/list: metadata
+        """
+        entry = self._get_entry(target_package, metadata_type, is_dictionary)
+        if entry["data"] is None:
+            entry["data"] = json.loads(entry["json"])
+        return entry["data"]
+
+    def get_copy(self, target_package, metadata_type, is_dictionary=True):
+        """Get a copy of the metadata which can be changed freely.
+
+        The copy is parsed from the cached JSON, which is faster than
+        a deep copy of the parsed metadata.
+
+        Args:
+            target_package (sd.api.sdpackage.SDPackage): target SD Package
+            metadata_type (str): Ayon metadata type
+            is_dictionary (bool): Whether the metadata is a dictionary.
+
+        Returns:
+            dict/list: metadata
+        """
+        entry = self._get_entry(target_package, metadata_type, is_dictionary)
+        if entry["json"] is None:
+            entry["json"] = json.dumps(entry["data"])
+        return json.loads(entry["json"])
+
+    def _get_entry(self, target_package, metadata_type, is_dictionary):
+        key = (target_package.getFilePath(), metadata_type)
+        is_modified = target_package.isModified()
+        entry = self._entries.get(key)
+        if entry is not None and (
+            entry["dirty"] or entry["is_modified"] == is_modified
+        ):
+            return entry
+
+        # Parsed on first use, copies are parsed from the JSON directly
+        entry = {
+            "package": target_package,
+            "data": None,
+            "json": _read_sd_metadata_json(
+                target_package, metadata_type, is_dictionary),
+            "is_modified": is_modified,
+            "dirty": False
+        }
+        self._entries[key] = entry
+        return entry
+
+    def set(self, target_package, metadata_type, metadata):
+        """Set the metadata and write it unless a batch is running.
+
+        Args:
+            target_package (sd.api.sdpackage.SDPackage): target SD Package
+            metadata_type (str): Ayon metadata type
+            metadata (dict/list): AYON-related metadata
+        """
+        key = (target_package.getFilePath(), metadata_type)
+        self._entries[key] = {
+            "package": target_package,
+            "data": metadata,
+            "json": None,
+            "is_modified": None,
+            "dirty": True
+        }
+        if not self._batch_depth:
+            self.flush()
+
+    def flush(self):
+        """Write all dirty metadata to their packages."""
+        self._flush_scheduled = False
+        for (_, metadata_type), entry in self._entries.items():
+            if not entry["dirty"]:
+                continue
+            target_package = entry["package"]
+            _write_sd_metadata(target_package, metadata_type, entry["data"])
+            entry["is_modified"] = target_package.isModified()
+            entry["dirty"] = False
+
+    def clear(self):
+        """Drop all cached metadata including unwritten changes."""
+        self._entries.clear()
+
+    def is_dirty(self):
+        """Whether there are metadata changes not written yet.
+
+        Returns:
+            bool: Some metadata were not written to their package.
+        """
+        return any(entry["dirty"] for entry in self._entries.values())
+
+    @contextlib.contextmanager
+    def batch(self, deferred=False):
+        """Postpone writing of the metadata until the batch is finished.
+
+        Batches can be nested, the metadata is written when the outermost
+        batch finishes.
+
+        Args:
+            deferred (bool): Write the metadata once the control gets back
+                to the Qt event loop instead. Batches started before that,
+                e.g. by the next load of a multi-load from the Loader, are
+                written at once.
+        """
+        self._batch_depth += 1
+        self._deferred_flush = self._deferred_flush or deferred
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                deferred = self._deferred_flush
+                self._deferred_flush = False
+                if deferred:
+                    self.schedule_flush()
+                else:
+                    self.flush()
+
+    def schedule_flush(self):
+        """Write the metadata when the control gets back to Qt event loop.
+        """
+        if self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        QtCore.QTimer.singleShot(0, self.flush)
+
+
+_metadata_cache = SDMetadataCache()
+
+
+def _read_sd_metadata_json(target_package, metadata_type, is_dictionary):
+    metadata_json = "{}" if is_dictionary else "[]"
+    package_metadata_dict = target_package.getMetadataDict()
+    with contextlib.suppress(APIException):
+        metadata_value = package_metadata_dict.getPropertyValueFromId(
+            metadata_type).get()
+        metadata_json = decode_metadata_json(metadata_value)
+
+    return metadata_json
+
+
+def _write_sd_metadata(target_package, metadata_type, metadata):
     # Need to convert dict to string first
-    target_package = get_package_from_current_graph()
-    metadata_to_str = f"{json.dumps(metadata)}"
+    metadata_to_str = encode_metadata(metadata)
     metadata_value = sd.api.sdvaluestring.SDValueString.sNew(metadata_to_str)
     package_metadata_dict = target_package.getMetadataDict()
     package_metadata_dict.setPropertyValueFromId(metadata_type, metadata_value)
 
 
+def set_sd_metadata(metadata_type: str, metadata, target_package=None):
+    """Set AYON-related metadata in Substance Painter
+
+    Args:
+        metadata_type (str): AYON metadata key
+        metadata (dict/list): AYON-related metadata
+        target_package (sd.api.sdpackage.SDPackage, optional): target SD
+            Package. Defaults to the package of the current graph.
+    """
+    if target_package is None:
+        target_package = get_package_from_current_graph()
+    _metadata_cache.set(target_package, metadata_type, metadata)
+
+
+def get_cached_sd_metadata(target_package, metadata_type: str,
+                           is_dictionary=True):
+    """Get AYON metadata from the metadata cache without copying it.
+
+    The returned value is shared with the cache, any change to it must be
+    stored back with `set_sd_metadata`.
+
+    Args:
+        target_package (sd.api.sdpackage.SDPackage): target SD Package
+        metadata_type (str): Ayon metadata type
+
+    Returns:
+        dict/list: metadata dict
+    """
+    return _metadata_cache.get(target_package, metadata_type, is_dictionary)
+
+
 def parsing_sd_data(target_package, metadata_type: str, is_dictionary=True):
     """Parse and convert Subsatnce Designer SDValue data to dictionary
 
@@ -139,18 +626,254 @@ def parsing_sd_data(target_package, metadata_type: str, is_dictionary=True):
     Returns:
         dict/list: metadata dict
     """
-    metadata = {} if is_dictionary else []
-    package_metadata_dict = target_package.getMetadataDict()
-    with contextlib.suppress(APIException):
-        metadata_value = package_metadata_dict.getPropertyValueFromId(
-            metadata_type).get()
-        metadata = json.loads(metadata_value)
+    return _metadata_cache.get_copy(
+        target_package, metadata_type, is_dictionary)
+
+
+def sd_metadata_batch(deferred=False):
+    """Context manager writing AYON metadata once when it finishes.
+
+    Args:
+        deferred (bool): Write the metadata once the control gets back
+            to the Qt event loop.
+
+    Returns:
+        contextlib.AbstractContextManager: batch context
+    """
+    return _metadata_cache.batch(deferred)
+
+
+def flush_sd_metadata():
+    """Write pending AYON metadata changes to the packages."""
+    if _metadata_cache.is_dirty():
+        _metadata_cache.flush()
+
+
+def clear_sd_metadata_cache():
+    """Drop the cached AYON metadata, e.g. after a package got reloaded."""
+    _metadata_cache.clear()
+
+
+def get_output_filepath(output_dir, instance_name, graph_name,
+                        map_identifier, extension, resolution=None):
+    """Get filepath of exported graph output.
+
+    Args:
+        output_dir (str): output directory
+        instance_name (str): instance name
+        graph_name (str): SD graph name
+        map_identifier (str): output identifier
+        extension (str): extension
+        resolution (int, optional): resolution of a smaller variant of
+            the output
+
+    Returns:
+        str: absolute filepath
+    """
+    filename = f"{instance_name}_{graph_name}_{map_identifier}"
+    if resolution:
+        filename += f"_{resolution}"
+    filename += f".{extension}"
+    return os.path.abspath(os.path.join(output_dir, filename))
+
+
+@dataclasses.dataclass
+class ExportPlanItem:
+    """Graph output written to a file by an export plan.
+
+    Attributes:
+        graph_name (str): SD graph name
+        map_identifier (str): output identifier
+        sd_node (sd.api.sdnode.SDNode): output node
+        output_property (sd.api.sdproperty.SDProperty): output property
+            of the node definition holding the texture
+        filepath (str): target filepath
+        variant_filepaths (dict): target filepaths of smaller variants by
+            resolution, written only through an export pipeline
+    """
+    graph_name: str
+    map_identifier: str
+    sd_node: object
+    output_property: object
+    filepath: str
+    variant_filepaths: dict = dataclasses.field(default_factory=dict)
 
-    return metadata
+
+def build_export_plan(instance_name, target_graph, output_dir, extension,
+                      selected_map_identifiers, resolutions=None):
+    """Resolve the graph outputs to export and their target files.
+
+    Each selected output is planned once. Outputs resolving to a filepath
+    which is already planned, e.g. from output nodes sharing an output
+    identifier, are skipped. Nothing is computed yet.
+
+    Args:
+        instance_name (str): instance name
+        target_graph (sd.api.sdgraph.SDGraph): target SD Graph
+        output_dir (str): output directory
+        extension (str): extension
+        selected_map_identifiers (set): maps targeted to be exported
+        resolutions (list[int], optional): resolutions to export, the
+            outputs are computed at the highest one and the others are
+            planned as its variants
+
+    Returns:
+        list[ExportPlanItem]: planned outputs, None when the graph can't
+            be exported
+    """
+    if not target_graph:
+        return None
+
+    if not issubclass(type(target_graph), sdsbscompgraph.SDSBSCompGraph):
+        return None
+
+    graph_name = target_graph.getIdentifier()
+    plan = []
+    planned_filepaths = set()
+    for sd_node in target_graph.getOutputNodes():
+        # The output identifier is the node's own output property while
+        # the texture is the value of the output defined by its definition
+        definition_outputs = sd_node.getDefinition().getProperties(
+            sdproperty.SDPropertyCategory.Output
+        )
+        if not definition_outputs:
+            continue
+        for node_output in sd_node.getProperties(
+            sdproperty.SDPropertyCategory.Output
+        ):
+            map_identifier = node_output.getId()
+            if map_identifier not in selected_map_identifiers:
+                continue
+            filepath = get_output_filepath(
+                output_dir, instance_name, graph_name,
+                map_identifier, extension
+            )
+            if filepath in planned_filepaths:
+                continue
+            planned_filepaths.add(filepath)
+            variant_filepaths = {
+                resolution: get_output_filepath(
+                    output_dir, instance_name, graph_name,
+                    map_identifier, extension, resolution
+                )
+                for resolution in sorted(resolutions or [])[:-1]
+            }
+            plan.append(ExportPlanItem(
+                graph_name, map_identifier, sd_node, definition_outputs[0],
+                filepath, variant_filepaths
+            ))
+    return plan
+
+
+def format_export_plan(plan):
+    """Describe the export plan, one output per line.
+
+    Args:
+        plan (list[ExportPlanItem]): export plan
+
+    Returns:
+        str: description of the plan
+    """
+    return "\n".join(
+        f"{item.graph_name}/{item.map_identifier} -> {item.filepath}"
+        for item in plan
+    )
+
+
+def set_graph_output_size(target_graph, resolution):
+    """Set the output size of the graph until the returned callback is run.
+
+    Args:
+        target_graph (sd.api.sbs.sdsbscompgraph.SDSBSCompGraph): graph
+        resolution (int): resolution in pixels, a power of two
+
+    Returns:
+        Callable: restores the previous output size of the graph
+    """
+    output_size = target_graph.getPropertyFromId(
+        "$outputsize", sdproperty.SDPropertyCategory.Input)
+    size_log2 = resolution.bit_length() - 1
+    previous_method = target_graph.getPropertyInheritanceMethod(output_size)
+    previous_value = target_graph.getPropertyValue(output_size)
+    previous_size = previous_value.get() if previous_value else None
+    if (
+        previous_method == sdproperty.SDPropertyInheritanceMethod.Absolute
+        and previous_size is not None
+        and (previous_size.x, previous_size.y) == (size_log2, size_log2)
+    ):
+        return lambda: None
+
+    target_graph.setPropertyInheritanceMethod(
+        output_size, sdproperty.SDPropertyInheritanceMethod.Absolute)
+    target_graph.setPropertyValue(
+        output_size, SDValueInt2.sNew(int2(size_log2, size_log2)))
+
+    def restore():
+        if previous_value is not None:
+            target_graph.setPropertyValue(output_size, previous_value)
+        target_graph.setPropertyInheritanceMethod(
+            output_size, previous_method)
+
+    return restore
+
+
+def run_export_plan(target_graph, plan, export_pipeline=None,
+                    output_size=None):
+    """Compute the graph and save the textures of the export plan.
+
+    Args:
+        target_graph (sd.api.sbs.sdsbscompgraph.SDSBSCompGraph): graph
+            the plan was built for
+        plan (list[ExportPlanItem]): export plan
+        export_pipeline (TextureExportPipeline, optional): pipeline used
+            to save the textures. Textures are saved directly when not set.
+        output_size (int, optional): resolution the graph is computed at,
+            the output size of the graph is used when not set
+    """
+    restore_output_size = None
+    if output_size:
+        restore_output_size = set_graph_output_size(
+            target_graph, output_size)
+    try:
+        # Compute the SDSBSCompGraph so that all node's textures
+        # are computed
+        target_graph.compute()
+
+        for item in plan:
+            save_export_plan_item(item, export_pipeline=export_pipeline)
+    finally:
+        if restore_output_size is not None:
+            restore_output_size()
+
+
+def save_export_plan_item(item, export_pipeline=None):
+    """Save the texture of a planned output of an already computed graph.
+
+    Args:
+        item (ExportPlanItem): planned output
+        export_pipeline (TextureExportPipeline, optional): pipeline used
+            to save the texture. The texture is saved directly when not set.
+    """
+    property_value = item.sd_node.getPropertyValue(item.output_property)
+    property_texture = property_value.get() if property_value else None
+    if not property_texture:
+        return
+
+    if export_pipeline is not None:
+        export_pipeline.save(
+            property_texture, item.filepath,
+            variant_filepaths=item.variant_filepaths
+        )
+        return
+    try:
+        property_texture.save(item.filepath)
+    except APIException:
+        print('Fail to save texture %s' % item.filepath)
 
 
 def export_outputs_by_sd_graph(instance_name, target_graph, output_dir,
-                               extension, selected_map_identifiers):
+                               extension, selected_map_identifiers,
+                               export_pipeline=None):
     """
     Modified and referenced from exportSDGraphOutputs in Substance Designer
     Python API.
@@ -162,72 +885,184 @@ def export_outputs_by_sd_graph(instance_name, target_graph, output_dir,
         output_dir (str): output directory
         extension (str): extension
         selected_map_identifiers (set): list of maps targeted to be exported
+        export_pipeline (TextureExportPipeline, optional): pipeline used
+            to save the textures. Textures are saved directly when not set.
 
     Returns:
         bool: Shows if the maps are successfully exported
     """
-    if not target_graph:
+    plan = build_export_plan(
+        instance_name, target_graph, output_dir, extension,
+        selected_map_identifiers
+    )
+    if plan is None:
         return False
 
-    if not issubclass(type(target_graph), sdsbscompgraph.SDSBSCompGraph):
-        return False
+    run_export_plan(target_graph, plan, export_pipeline=export_pipeline)
+    return True
 
-    # Compute the SDSBSCompGraph so that all node's textures are computed
-    target_graph.compute()
 
-    # Get some information on the graph
-    graph_name = target_graph.getIdentifier()
+def get_output_maps_from_graphs():
+    """Get Output Maps from Substance Designer graphs by package
 
-    for sd_node in target_graph.getOutputNodes():
-        node_definition = sd_node.getDefinition()
-        for output in sd_node.getProperties(
-            sdproperty.SDPropertyCategory.Output):
-                map_identifier = output.getId()
-                if map_identifier not in selected_map_identifiers:
-                    continue
-                output_properties = node_definition.getProperties(
-                    sdproperty.SDPropertyCategory.Output
+    Returns:
+        set: name of the output maps from substance designer graphs
+    """
+    return get_package_snapshot().output_maps
+
+
+# Attributes of the sd.api.sdbasetypes values (int2, float4, ColorRGBA...)
+_SD_BASETYPE_ATTRIBUTES = ("x", "y", "z", "w", "r", "g", "b", "a")
+
+
+def _serialize_sd_value(sd_value):
+    """Convert SDValue to a plain value usable for hashing.
+
+    Args:
+        sd_value (sd.api.sdvalue.SDValue): value
+
+    Returns:
+        Any: plain python value
+    """
+    if sd_value is None:
+        return None
+    try:
+        value = sd_value.get()
+    except (APIException, AttributeError):
+        return type(sd_value).__name__
+
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+
+    attributes = tuple(
+        getattr(value, attr)
+        for attr in _SD_BASETYPE_ATTRIBUTES
+        if hasattr(value, attr)
+    )
+    if attributes:
+        return attributes
+
+    # SDValueArray holds another SDValues
+    with contextlib.suppress(TypeError, APIException):
+        return [_serialize_sd_value(item) for item in value]
+
+    return type(value).__name__
+
+
+def _hash_sd_graph(graph, hasher, user_package_paths, visited):
+    # Graphs embedded in nodes (e.g. function graphs) might not have an url
+    graph_url = ""
+    with contextlib.suppress(APIException, AttributeError):
+        graph_url = graph.getUrl() or ""
+    hasher.update(graph_url.encode())
+    if graph_url:
+        if graph_url in visited:
+            return
+        visited.add(graph_url)
+
+    for graph_property in graph.getProperties(
+            sdproperty.SDPropertyCategory.Input):
+        hasher.update(repr((
+            graph_property.getId(),
+            _serialize_sd_value(graph.getPropertyValue(graph_property))
+        )).encode())
+
+    for sd_node in graph.getNodes():
+        hasher.update(repr((
+            sd_node.getIdentifier(),
+            sd_node.getDefinition().getId()
+        )).encode())
+        for node_property in sd_node.getProperties(
+                sdproperty.SDPropertyCategory.Input):
+            connections = [
+                (
+                    connection.getOutputPropertyNode().getIdentifier(),
+                    connection.getOutputProperty().getId()
                 )
-                for output_property in output_properties:
-                    # Get the property value
-                    property_value = sd_node.getPropertyValue(output_property)
-
-                    # Get the property value as texture
-                    property_texture = property_value.get()
-                    if not property_texture:
-                        continue
-
-                    filename = (
-                        f"{instance_name}_{graph_name}_{map_identifier}.{extension}"
-                    )
-                    texture_filename = os.path.abspath(
-                        os.path.join(output_dir, filename)
-                    )
-
-                    try:
-                        property_texture.save(texture_filename)
-                    except APIException:
-                        print('Fail to save texture %s' % texture_filename)
+                for connection in sd_node.getPropertyConnections(
+                    node_property)
+            ]
+            hasher.update(repr((
+                node_property.getId(),
+                _serialize_sd_value(sd_node.getPropertyValue(node_property)),
+                connections
+            )).encode())
 
-    return True
+            # Function graphs, e.g. of the pixel processor
+            property_graph = None
+            with contextlib.suppress(APIException):
+                property_graph = sd_node.getPropertyGraph(node_property)
+            if property_graph is not None:
+                _hash_sd_graph(
+                    property_graph, hasher, user_package_paths, visited)
 
+        # Graph instances referencing graphs which may change
+        referenced_resource = None
+        with contextlib.suppress(APIException, AttributeError):
+            referenced_resource = sd_node.getReferencedResource()
+        if referenced_resource is None:
+            continue
+        hasher.update(referenced_resource.getUrl().encode())
+        # Files of linked bitmaps, e.g. repainted source textures
+        if hasattr(referenced_resource, "getFilePath"):
+            hasher.update(repr(
+                _get_file_signature(referenced_resource.getFilePath())
+            ).encode())
+        package = referenced_resource.getPackage()
+        if (
+            package is not None
+            and package.getFilePath() in user_package_paths
+            and hasattr(referenced_resource, "getNodes")
+        ):
+            _hash_sd_graph(
+                referenced_resource, hasher, user_package_paths, visited)
 
-def get_output_maps_from_graphs():
-    """Get Output Maps from Substance Designer graphs by package
+
+def _get_file_signature(filepath):
+    try:
+        stat = os.stat(filepath)
+    except (OSError, TypeError, ValueError):
+        return (filepath, None)
+    return (filepath, stat.st_mtime_ns, stat.st_size)
+
+
+def get_graph_key(target_graph):
+    """Get key identifying the SD graph across the loaded packages.
+
+    Args:
+        target_graph (sd.api.sdgraph.SDGraph): target SD Graph
 
     Returns:
-        set: name of the output maps from substance designer graphs
+        tuple: package filepath and graph identifier
     """
-    all_output_maps = set()
-    current_package = get_package_from_current_graph()
-    for resource in current_package.getChildrenResources(True):
-        if resource.getClassName() == "SDSBSCompGraph":
-            for output_node in resource.getOutputNodes():
-                for output in set(output_node.getProperties(
-                    sd.api.sdproperty.SDPropertyCategory.Output)):
-                        all_output_maps.add(output.getId())
+    return (
+        target_graph.getPackage().getFilePath(),
+        target_graph.getIdentifier()
+    )
+
 
-    return all_output_maps
+def get_graph_fingerprint(target_graph):
+    """Hash the content of the SD graph.
+
+    The hash covers the graph input parameters including `$outputsize`, all
+    nodes with their definitions, input values and connections, the
+    function graphs of the nodes and the graphs of the user packages which
+    are instanced in the graph. Files on disk used by linked bitmap
+    resources are covered by their modification time and size.
+
+    Args:
+        target_graph (sd.api.sdgraph.SDGraph): target SD Graph
+
+    Returns:
+        str: hex digest of the graph content
+    """
+    user_package_paths = {
+        package.getFilePath()
+        for package in package_manager().getUserPackages()
+    }
+    hasher = hashlib.sha1()
+    _hash_sd_graph(target_graph, hasher, user_package_paths, set())
+    return hasher.hexdigest()
 
 
 def get_colorspace_data(raw_colorspace=False):
@@ -13,6 +13,7 @@ from ayon_core.host import HostBase, IWorkfileHost, ILoadHost, IPublishHost
 from ayon_core.pipeline import (
     register_creator_plugin_path,
     register_loader_plugin_path,
+    register_inventory_action_path,
     AVALON_CONTAINER_ID
 )
 from ayon_core.settings import get_current_project_settings
@@ -25,9 +26,16 @@ from .lib import (
     qt_ui_manager,
     get_package_from_current_graph,
     set_sd_metadata,
-    parsing_sd_data
+    parsing_sd_data,
+    get_cached_sd_metadata,
+    flush_sd_metadata,
+    clear_sd_metadata_cache,
+    sd_metadata_batch,
+    invalidate_resource_index
 )
 from .project_creation import create_project_with_from_template
+from .tracing import start_session_tracing, stop_session_tracing
+from .concurrency import get_main_thread_executor, shutdown_worker_pool
 
 log = logging.getLogger("ayon_substancedesigner")
 
@@ -40,6 +48,7 @@ INVENTORY_PATH = os.path.join(PLUGINS_DIR, "inventory")
 AYON_METADATA_CONTAINERS_KEY = "ayon_containers"  # child key
 AYON_METADATA_CONTEXT_KEY = "ayon_context"        # child key
 AYON_METADATA_INSTANCES_KEY = "ayon_instances"    # child key
+AYON_METADATA_BITMAPS_KEY = "ayon_bitmaps"        # child key
 
 
 class SubstanceDesignerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
@@ -51,16 +60,24 @@ class SubstanceDesignerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
         self.menu = None
         self.callbacks = []
         self.shelves = []
+        # Graph fingerprints of the last successful export by
+        # (package filepath, graph identifier)
+        self._exported_graph_fingerprints = {}
 
     def install(self):
+        start_session_tracing()
+        # Calls of the `sd` API from other threads are queued to the event
+        # loop of the main window
+        get_main_thread_executor().install(qt_ui_manager().getMainWindow())
         pyblish.api.register_host("substancedesigner")
 
         pyblish.api.register_plugin_path(PUBLISH_PATH)
         register_loader_plugin_path(LOAD_PATH)
         register_creator_plugin_path(CREATE_PATH)
+        register_inventory_action_path(INVENTORY_PATH)
 
-        # log.info("Installing callbacks ... ")
-        # self._register_callbacks()
+        log.info("Installing callbacks ... ")
+        self._register_callbacks()
 
         log.info("Installing menu ... ")
         self._install_menu()
@@ -75,12 +92,17 @@ class SubstanceDesignerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
 
     def uninstall(self):
         self._uninstall_menu()
-        # self._deregister_callbacks()
+        self._deregister_callbacks()
+        shutdown_worker_pool()
+        get_main_thread_executor().uninstall()
+        stop_session_tracing()
 
     def workfile_has_unsaved_changes(self):
         package = get_package_from_current_graph()
         if not package:
             return False
+        # Containers of a load batch may still wait to be written
+        flush_sd_metadata()
         return package.isModified()
 
     def get_workfile_extensions(self):
@@ -91,14 +113,18 @@ class SubstanceDesignerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
         pkg_mgr = package_manager()
         package = get_package_from_current_graph()
         if package:
+            flush_sd_metadata()
             pkg_mgr.savePackageAs(package, fileAbsPath=dst_path)
             return dst_path
 
     def open_workfile(self, filepath):
         pkg_mgr = package_manager()
+        flush_sd_metadata()
         for user_pkg in pkg_mgr.getUserPackages():
             log.warning("Unloading existing workfile...")
             pkg_mgr.unloadUserPackage(user_pkg)
+        clear_sd_metadata_cache()
+        invalidate_resource_index()
         pkg_mgr.loadUserPackage(
             filepath, updatePackages=False, reloadIfModified=False
         )
@@ -137,6 +163,59 @@ class SubstanceDesignerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
             current_package, AYON_METADATA_CONTEXT_KEY) or {}
 
 
+    def get_changed_graphs(self, fingerprints_by_graph):
+        """Get graphs which changed since their last successful export.
+
+        Args:
+            fingerprints_by_graph (dict): current graph fingerprints by
+                (package filepath, graph identifier)
+
+        Returns:
+            list: (package filepath, graph identifier) of changed graphs
+        """
+        return [
+            graph_key
+            for graph_key, fingerprint in fingerprints_by_graph.items()
+            if self._exported_graph_fingerprints.get(graph_key) != fingerprint
+        ]
+
+    def register_exported_graphs(self, fingerprints_by_graph):
+        """Store fingerprints of successfully exported graphs.
+
+        Args:
+            fingerprints_by_graph (dict): graph fingerprints by
+                (package filepath, graph identifier)
+        """
+        self._exported_graph_fingerprints.update(fingerprints_by_graph)
+
+    def _register_callbacks(self):
+        sd_app = sd.getContext().getSDApplication()
+        self.callbacks.extend([
+            sd_app.registerAfterFileLoadedCallback(
+                self._on_package_loaded),
+            sd_app.registerAfterFileSavedCallback(
+                self._on_package_saved),
+            sd_app.registerBeforeFileClosedCallback(
+                self._on_package_closed),
+        ])
+
+    def _deregister_callbacks(self):
+        sd_app = sd.getContext().getSDApplication()
+        for callback_id in self.callbacks:
+            sd_app.unregisterCallback(callback_id)
+        self.callbacks = []
+
+    def _on_package_loaded(self, filepath, succeed, updated):
+        invalidate_resource_index()
+
+    def _on_package_saved(self, filepath, succeed):
+        invalidate_resource_index()
+
+    def _on_package_closed(self, filepath):
+        flush_sd_metadata()
+        clear_sd_metadata_cache()
+        invalidate_resource_index()
+
     def _install_menu(self):
         from ayon_core.tools.utils import host_tools
         qt_ui = qt_ui_manager()
@@ -203,12 +282,27 @@ class SubstanceDesignerHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
         self.menu = None
 
 
+def imprint_batch():
+    """Context manager collecting imprinted containers of many loads.
+
+    The containers metadata is written to the package once, after the
+    control gets back to the Qt event loop. Loading or updating many
+    representations at once from the Loader or Scene Inventory therefore
+    writes the metadata only once instead of once per container.
+
+    Returns:
+        contextlib.AbstractContextManager: batch context
+    """
+    return sd_metadata_batch(deferred=True)
+
+
 def imprint(current_package, name, namespace, context,
             loader, identifier, options=None):
     """Imprint a loaded container with metadata.
 
     Containerisation enables a tracking of version, author and origin
-    for loaded assets.
+    for loaded assets. Inside of `imprint_batch` the container is only
+    collected and written together with the rest of the batch.
 
     Arguments:
         name (str): Name of resulting assembly
@@ -221,6 +315,31 @@ def imprint(current_package, name, namespace, context,
     Returns:
         None
 
+    """
+    data = get_container_data(
+        name, namespace, context, loader, identifier, options)
+    container_data = get_cached_sd_metadata(
+        current_package, AYON_METADATA_CONTAINERS_KEY, is_dictionary=False)
+    container_data.append(data)
+    set_sd_metadata(
+        AYON_METADATA_CONTAINERS_KEY, container_data, current_package)
+
+
+def get_container_data(name, namespace, context,
+                       loader, identifier, options=None):
+    """Get metadata of a loaded container.
+
+    Arguments:
+        name (str): Name of resulting assembly
+        namespace (str): Namespace under which to host container
+        context (dict): Asset information
+        loader (load.LoaderPlugin): loader instance used to produce container.
+        identifier (str): SDResource identifier
+        options (dict): options
+
+    Returns:
+        dict: container data
+
     """
     data = {
         "schema": "ayon:container-2.0",
@@ -235,22 +354,96 @@ def imprint(current_package, name, namespace, context,
     if options:
         for key, value in options.items():
             data[key] = value
-    container_data = parsing_sd_data(
-        current_package, AYON_METADATA_CONTAINERS_KEY, is_dictionary=False)
-    container_data.append(data)
-    set_sd_metadata(AYON_METADATA_CONTAINERS_KEY, container_data)
+    return data
 
 
 def remove_container_metadata(container):
-    """Helper method to remove the data for a specific container"""
+    """Helper method to remove the data for a specific container
+
+    Containers loading the same file content share the bitmap resource
+    and so the `objectName`. Only the first container matching also the
+    name and representation of the container is removed.
+    """
     current_package = get_package_from_current_graph()
-    all_container_metadata = parsing_sd_data(
+    all_container_metadata = get_cached_sd_metadata(
         current_package, AYON_METADATA_CONTAINERS_KEY, is_dictionary=False)
-    metadata_remainder = [
-        container_data for container_data in all_container_metadata
-        if container_data["objectName"] != container["objectName"]
-    ]
-    set_sd_metadata(AYON_METADATA_CONTAINERS_KEY, metadata_remainder)
+    metadata_remainder = list(all_container_metadata)
+    index = _find_container_index(metadata_remainder, container)
+    if index is not None:
+        metadata_remainder.pop(index)
+    set_sd_metadata(
+        AYON_METADATA_CONTAINERS_KEY, metadata_remainder, current_package)
+
+
+def replace_containers_metadata(current_package, replacements):
+    """Replace metadata of many containers with a single write.
+
+    Args:
+        current_package (sd.api.sdpackage.SDPackage): current package
+        replacements (list): pairs of the replaced container and the new
+            container data, see `get_container_data`
+    """
+    all_container_metadata = list(get_cached_sd_metadata(
+        current_package, AYON_METADATA_CONTAINERS_KEY, is_dictionary=False))
+    for container, data in replacements:
+        index = _find_container_index(all_container_metadata, container)
+        if index is None:
+            all_container_metadata.append(data)
+        else:
+            all_container_metadata[index] = data
+    set_sd_metadata(
+        AYON_METADATA_CONTAINERS_KEY, all_container_metadata, current_package)
+
+
+def _find_container_index(all_container_metadata, container):
+    keys = ("objectName", "name", "representation")
+    for index, container_data in enumerate(all_container_metadata):
+        if all(container_data.get(key) == container.get(key)
+               for key in keys):
+            return index
+    return None
+
+
+def get_bitmap_records(current_package):
+    """Get bitmap resources created by the loaders.
+
+    Args:
+        current_package (sd.api.sdpackage.SDPackage): current package
+
+    Returns:
+        dict: bitmap records with `file_hash`, `embed_method` and `size`
+            of the loaded file by bitmap identifier
+    """
+    return get_cached_sd_metadata(
+        current_package, AYON_METADATA_BITMAPS_KEY) or {}
+
+
+def set_bitmap_record(current_package, identifier, record):
+    """Store record of a bitmap resource created by a loader.
+
+    Args:
+        current_package (sd.api.sdpackage.SDPackage): current package
+        identifier (str): bitmap identifier
+        record (dict): bitmap record
+    """
+    bitmap_records = get_bitmap_records(current_package)
+    bitmap_records[identifier] = record
+    set_sd_metadata(
+        AYON_METADATA_BITMAPS_KEY, bitmap_records, current_package)
+
+
+def remove_bitmap_records(current_package, identifiers):
+    """Remove records of bitmap resources.
+
+    Args:
+        current_package (sd.api.sdpackage.SDPackage): current package
+        identifiers (Iterable[str]): bitmap identifiers
+    """
+    bitmap_records = get_bitmap_records(current_package)
+    for identifier in identifiers:
+        bitmap_records.pop(identifier, None)
+    set_sd_metadata(
+        AYON_METADATA_BITMAPS_KEY, bitmap_records, current_package)
 
 
 def set_instance(instance_id, instance_data, update=False):
@@ -273,8 +466,8 @@ def set_instances(instance_data_by_id, update=False):
     """
     current_package = get_package_from_current_graph()
     if current_package:
-        instances = parsing_sd_data(
-            current_package, AYON_METADATA_INSTANCES_KEY) or {}
+        instances = get_cached_sd_metadata(
+            current_package, AYON_METADATA_INSTANCES_KEY)
         for instance_id, instance_data in instance_data_by_id.items():
             if update:
                 existing_data = instances.get(instance_id, {})
@@ -282,17 +475,19 @@ def set_instances(instance_data_by_id, update=False):
             else:
                 instances[instance_id] = instance_data
 
-        set_sd_metadata(AYON_METADATA_INSTANCES_KEY, instances)
+        set_sd_metadata(
+            AYON_METADATA_INSTANCES_KEY, instances, current_package)
 
 
 def remove_instance(instance_id):
     """Helper method to remove the data for a specific container"""
     current_package = get_package_from_current_graph()
     if current_package:
-        instances = parsing_sd_data(
-            current_package, AYON_METADATA_INSTANCES_KEY) or {}
+        instances = get_cached_sd_metadata(
+            current_package, AYON_METADATA_INSTANCES_KEY)
         instances.pop(instance_id, None)
-        set_sd_metadata(AYON_METADATA_INSTANCES_KEY, instances)
+        set_sd_metadata(
+            AYON_METADATA_INSTANCES_KEY, instances, current_package)
 
 
 def get_instances():
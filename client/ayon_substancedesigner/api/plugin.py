@@ -8,7 +8,12 @@ from ayon_substancedesigner.api.pipeline import (
     set_instances,
     remove_instance
 )
-from .lib import get_current_graph_name
+from .lib import (
+    get_current_graph_name,
+    invalidate_resource_index,
+    sd_metadata_batch
+)
+from .profiling import stop_publish_profiling
 
 
 class TextureCreator(Creator):
@@ -31,6 +36,11 @@ class TextureCreator(Creator):
         )
 
     def collect_instances(self):
+        # Publisher got reset, make sure the packages get indexed and
+        # scanned again to find graphs created since the last reset
+        invalidate_resource_index()
+        # Restore the API methods of a publish which did not finish
+        stop_publish_profiling()
         for instance in get_instances():
             if (instance.get("creator_identifier") == self.identifier or
                     instance.get("productType") == self.product_type):
@@ -46,9 +56,10 @@ class TextureCreator(Creator):
         set_instances(instance_data_by_id, update=True)
 
     def remove_instances(self, instances):
-        for instance in instances:
-            remove_instance(instance["instance_id"])
-            self._remove_instance_from_context(instance)
+        with sd_metadata_batch():
+            for instance in instances:
+                remove_instance(instance["instance_id"])
+                self._remove_instance_from_context(instance)
 
     # Helper methods (this might get moved into Creator class)
     def create_instance_in_context(self, product_name, data):
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""Profiling of the publishing in Substance Designer."""
+import os
+import json
+import time
+import inspect
+import logging
+import datetime
+import tempfile
+import functools
+import contextlib
+import collections
+
+from .tracing import get_sd_call_counter
+
+
+log = logging.getLogger("ayon_substancedesigner")
+
+PROFILER_KEY = "substanceDesignerProfiler"
+REPORT_FILENAME = "ayon_substancedesigner_publish_profile_{timestamp}.json"
+
+_active_profiler = {"profiler": None}
+
+
+class PublishProfiler:
+    """Collect timings of a publish.
+
+    The profiler records the wall time of every publish plugin process,
+    the compute time of the exported graphs, the fetch and write time with
+    the size of every exported map and optionally the counts of the
+    Substance Designer API calls made during the publish.
+
+    Counting of the calls replaces the traced `sd` methods until the
+    profiler finishes, see `stop_publish_profiling`.
+
+    Args:
+        count_sd_api_calls (bool): Count the Substance Designer API calls.
+    """
+
+    def __init__(self, count_sd_api_calls=False):
+        self.started = datetime.datetime.now()
+        self._start = time.perf_counter()
+        self.plugins = []
+        self.graphs = []
+        self.maps = []
+        self.sd_api_calls = {}
+        self.report_path = None
+        self._call_counter = None
+        self._calls_at_start = collections.Counter()
+        self._finished = False
+        if count_sd_api_calls:
+            self._call_counter = get_sd_call_counter()
+            # The counter is shared with the tracing of the whole session
+            self._calls_at_start = collections.Counter(
+                self._call_counter.counts)
+            self._call_counter.start()
+
+    @contextlib.contextmanager
+    def plugin(self, plugin, instance=None):
+        """Record wall time of a plugin process.
+
+        Args:
+            plugin (pyblish.api.Plugin): processed plugin
+            instance (pyblish.api.Instance, optional): processed instance
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.plugins.append({
+                "plugin": plugin.__class__.__name__,
+                "instance": instance.name if instance is not None else None,
+                "duration": time.perf_counter() - start
+            })
+
+    def record_graph(self, instance_name, graph_name, duration):
+        """Record compute time of an exported graph.
+
+        Args:
+            instance_name (str): instance name
+            graph_name (str): graph identifier
+            duration (float): seconds spent computing and exporting
+                the graph in the session
+        """
+        self.graphs.append({
+            "instance": instance_name,
+            "graph": graph_name,
+            "duration": duration
+        })
+
+    def record_maps(self, instance_name, timings):
+        """Record timings of exported maps.
+
+        Args:
+            instance_name (str): instance name
+            timings (list): timings of `TextureExportPipeline`
+        """
+        for timing in timings:
+            self.maps.append(dict(timing, instance=instance_name))
+
+    def finish(self):
+        """Stop counting of the API calls."""
+        if self._finished:
+            return
+        self._finished = True
+        if self._call_counter is not None:
+            counts = collections.Counter(self._call_counter.stop())
+            self.sd_api_calls = dict(counts - self._calls_at_start)
+
+    def get_report(self):
+        """Get the profile report.
+
+        Returns:
+            dict: report data
+        """
+        return {
+            "started": self.started.isoformat(),
+            "duration": time.perf_counter() - self._start,
+            "plugins": self.plugins,
+            "graphs": self.graphs,
+            "maps": self.maps,
+            "bytes_written": sum(item["size"] for item in self.maps),
+            "sd_api_calls": self.sd_api_calls
+        }
+
+    def write_report(self, output_dir):
+        """Write the report as JSON file.
+
+        The filename has the start time of the publish so reports of other
+        publishes in the same directory are kept.
+
+        Args:
+            output_dir (str): output directory
+
+        Returns:
+            str: report filepath
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        filename = REPORT_FILENAME.format(
+            timestamp=self.started.strftime("%Y%m%d_%H%M%S_%f"))
+        self.report_path = os.path.join(output_dir, filename)
+        with open(self.report_path, "w") as stream:
+            json.dump(self.get_report(), stream, indent=4)
+        return self.report_path
+
+    def get_summary(self, limit=5):
+        """Get human readable summary of the report.
+
+        Args:
+            limit (int): number of the slowest items listed
+
+        Returns:
+            str: summary
+        """
+        report = self.get_report()
+        lines = [f"Publish took {report['duration']:.2f}s"]
+        lines.append("Slowest plugins:")
+        for item in sorted(
+            report["plugins"], key=lambda i: i["duration"], reverse=True
+        )[:limit]:
+            instance = f" ({item['instance']})" if item["instance"] else ""
+            lines.append(
+                f"    {item['plugin']}{instance}: {item['duration']:.2f}s")
+        if report["graphs"]:
+            lines.append("Slowest graphs:")
+            for item in sorted(
+                report["graphs"], key=lambda i: i["duration"], reverse=True
+            )[:limit]:
+                lines.append(
+                    f"    {item['graph']} ({item['instance']}):"
+                    f" {item['duration']:.2f}s"
+                )
+        if report["maps"]:
+            lines.append(
+                f"Exported {len(report['maps'])} maps,"
+                f" {report['bytes_written'] / (1024 * 1024):.2f} MB written"
+            )
+        if report["sd_api_calls"]:
+            lines.append(
+                "Substance Designer API calls: {}".format(
+                    sum(report["sd_api_calls"].values()))
+            )
+            for call_name, count in sorted(
+                report["sd_api_calls"].items(),
+                key=lambda i: i[1], reverse=True
+            )[:limit]:
+                lines.append(f"    {call_name}: {count}")
+        return "\n".join(lines)
+
+
+def get_profiler(context):
+    """Get profiler of the publish context, create it when missing.
+
+    A new profiler finishes the profiler of the previous publish, which
+    did not finish when that publish failed or was stopped.
+
+    Args:
+        context (pyblish.api.Context): publish context
+
+    Returns:
+        PublishProfiler: profiler
+    """
+    profiler = context.data.get(PROFILER_KEY)
+    if profiler is None:
+        stop_publish_profiling()
+        profiler = PublishProfiler(
+            count_sd_api_calls=is_counting_sd_api_calls(context))
+        context.data[PROFILER_KEY] = profiler
+        _active_profiler["profiler"] = profiler
+    return profiler
+
+
+def stop_publish_profiling():
+    """Finish the profiler of the last publish if it is still running.
+
+    Restores the `sd` methods replaced for counting of the API calls,
+    e.g. when the publisher is reset after a failed publish.
+    """
+    profiler = _active_profiler["profiler"]
+    _active_profiler["profiler"] = None
+    if profiler is not None:
+        profiler.finish()
+
+
+def is_counting_sd_api_calls(context):
+    """Whether the API calls are counted by project settings.
+
+    Args:
+        context (pyblish.api.Context): publish context
+
+    Returns:
+        bool: Count the Substance Designer API calls.
+    """
+    project_settings = context.data.get("project_settings") or {}
+    publish_settings = project_settings.get(
+        "substancedesigner", {}).get("publish", {})
+    return publish_settings.get("ReportPublishProfile", {}).get(
+        "count_sd_api_calls", False)
+
+
+def get_report_dir(context):
+    """Get directory for the profile report next to the staging dirs.
+
+    Args:
+        context (pyblish.api.Context): publish context
+
+    Returns:
+        str: report directory
+    """
+    for instance in context:
+        staging_dir = instance.data.get("stagingDir")
+        if staging_dir:
+            return os.path.dirname(os.path.normpath(staging_dir))
+    return tempfile.gettempdir()
+
+
+def profile_plugin(process):
+    """Decorate `process` of a publish plugin to record its wall time.
+
+    pyblish inspects the argument names of `process`, the wrapper keeps
+    the name of the processed argument.
+
+    Args:
+        process (Callable): `process` method of a pyblish plugin
+
+    Returns:
+        Callable: wrapped method
+    """
+    argument_name = inspect.getfullargspec(process).args[1]
+    if argument_name == "instance":
+        @functools.wraps(process)
+        def wrapper(self, instance):
+            profiler = get_profiler(instance.context)
+            with profiler.plugin(self, instance):
+                return process(self, instance)
+    else:
+        @functools.wraps(process)
+        def wrapper(self, context):
+            profiler = get_profiler(context)
+            with profiler.plugin(self):
+                return process(self, context)
+    return wrapper
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""Processing of texture pixel data copied out of Substance Designer.
+
+The functions work on `TextureBuffer` copies of 8-bit textures, so they
+can run on the export workers. NumPy is used when available, otherwise
+they fall back to smooth scaling by Qt.
+"""
+import collections
+
+from qtpy import QtCore, QtGui
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+TextureBuffer = collections.namedtuple(
+    "TextureBuffer", ["width", "height", "bytes_per_pixel", "data"]
+)
+
+# Names of the channels of packed textures
+PACKED_CHANNELS = ("red", "green", "blue", "alpha")
+# Byte offsets of the channels in BGRA pixels of 8-bit color textures
+BGRA_CHANNEL_OFFSETS = {"blue": 0, "green": 1, "red": 2, "alpha": 3}
+
+# QImage formats by bytes per pixel of 8-bit SDTexture buffers
+QT_FORMAT_BY_BYTES_PER_PIXEL = {
+    1: QtGui.QImage.Format_Grayscale8,
+    # 8-bit color textures are stored as BGRA which matches ARGB32
+    # on little-endian platforms
+    4: QtGui.QImage.Format_ARGB32,
+}
+
+
+def texture_buffer_to_qimage(texture_buffer):
+    """Wrap the pixel data with QImage without copying it.
+
+    The buffer must be kept alive as long as the image is used.
+
+    Args:
+        texture_buffer (TextureBuffer): pixel data
+
+    Returns:
+        QtGui.QImage: image
+    """
+    return QtGui.QImage(
+        texture_buffer.data,
+        texture_buffer.width,
+        texture_buffer.height,
+        texture_buffer.width * texture_buffer.bytes_per_pixel,
+        QT_FORMAT_BY_BYTES_PER_PIXEL[texture_buffer.bytes_per_pixel]
+    )
+
+
+def get_downsampled_size(texture_buffer, resolution):
+    """Get dimensions of the texture with the longest side at resolution.
+
+    Args:
+        texture_buffer (TextureBuffer): pixel data
+        resolution (int): size of the longest side
+
+    Returns:
+        tuple[int, int]: width and height
+    """
+    longest_side = max(texture_buffer.width, texture_buffer.height)
+    return (
+        max(1, texture_buffer.width * resolution // longest_side),
+        max(1, texture_buffer.height * resolution // longest_side)
+    )
+
+
+def downsample_texture_buffer(texture_buffer, width, height):
+    """Downsample pixel data with a box filter.
+
+    Sizes reached by halving, e.g. 4096 to 1024, are reduced by averaging
+    2x2 pixel blocks in each step. Other integer factors average the whole
+    blocks at once. Non-integer factors and missing NumPy fall back to
+    smooth scaling by Qt.
+
+    Args:
+        texture_buffer (TextureBuffer): pixel data
+        width (int): target width
+        height (int): target height
+
+    Returns:
+        TextureBuffer: downsampled pixel data
+    """
+    if (width, height) == (texture_buffer.width, texture_buffer.height):
+        return texture_buffer
+    factor_x, rest_x = divmod(texture_buffer.width, width)
+    factor_y, rest_y = divmod(texture_buffer.height, height)
+    if np is None or rest_x or rest_y:
+        return _scale_texture_buffer_qt(texture_buffer, width, height)
+
+    pixels = np.frombuffer(texture_buffer.data, dtype=np.uint8).reshape(
+        texture_buffer.height, texture_buffer.width,
+        texture_buffer.bytes_per_pixel
+    )
+    while factor_x % 2 == 0 and factor_y % 2 == 0:
+        pixels = _halve_pixels(pixels)
+        factor_x //= 2
+        factor_y //= 2
+    if factor_x > 1 or factor_y > 1:
+        pixels = _box_filter_pixels(pixels, factor_x, factor_y)
+    return TextureBuffer(
+        width, height, texture_buffer.bytes_per_pixel, pixels.tobytes())
+
+
+def _halve_pixels(pixels):
+    # Sum of four 8-bit values fits in 16 bits. Rows are summed first
+    # on contiguous memory, then the pairs of columns.
+    height, width, channels = pixels.shape
+    rows = pixels.reshape(height // 2, 2, width, channels)
+    summed = rows[:, 0].astype(np.uint16)
+    summed += rows[:, 1]
+    summed = summed.reshape(height // 2, width // 2, 2, channels)
+    halved = summed[:, :, 0] + summed[:, :, 1]
+    halved += 2
+    halved >>= 2
+    return halved.astype(np.uint8)
+
+
+def _box_filter_pixels(pixels, factor_x, factor_y):
+    height = pixels.shape[0] // factor_y
+    width = pixels.shape[1] // factor_x
+    blocks = pixels.reshape(
+        height, factor_y, width, factor_x, pixels.shape[2])
+    summed = blocks.sum(axis=(1, 3), dtype=np.uint32)
+    count = factor_x * factor_y
+    return ((summed + count // 2) // count).astype(np.uint8)
+
+
+def _scale_texture_buffer_qt(texture_buffer, width, height):
+    image = texture_buffer_to_qimage(texture_buffer).scaled(
+        width, height,
+        QtCore.Qt.IgnoreAspectRatio,
+        QtCore.Qt.SmoothTransformation
+    )
+    return qimage_to_texture_buffer(image, texture_buffer.bytes_per_pixel)
+
+
+def qimage_to_texture_buffer(image, bytes_per_pixel):
+    """Copy pixel data of QImage without the padding of its rows.
+
+    Args:
+        image (QtGui.QImage): image in one of `QT_FORMAT_BY_BYTES_PER_PIXEL`
+            formats
+        bytes_per_pixel (int): bytes per pixel of the image format
+
+    Returns:
+        TextureBuffer: pixel data
+    """
+    width = image.width()
+    height = image.height()
+    row_size = width * bytes_per_pixel
+    bytes_per_line = image.bytesPerLine()
+    data = bytes(image.constBits())[:bytes_per_line * height]
+    if bytes_per_line != row_size:
+        data = b"".join(
+            data[row * bytes_per_line:row * bytes_per_line + row_size]
+            for row in range(height)
+        )
+    return TextureBuffer(width, height, bytes_per_pixel, data)
+
+
+def read_texture_buffer(filepath):
+    """Read pixel data of an image file with Qt.
+
+    Grayscale images are read with one byte per pixel, other images are
+    converted to BGRA like 8-bit color textures of Substance Designer.
+
+    Args:
+        filepath (str): image filepath
+
+    Raises:
+        RuntimeError: When Qt fails to read the image.
+
+    Returns:
+        TextureBuffer: pixel data
+    """
+    image = QtGui.QImage(filepath)
+    if image.isNull():
+        raise RuntimeError(f"Failed to read image: {filepath}")
+    if image.format() == QtGui.QImage.Format_Grayscale8:
+        return qimage_to_texture_buffer(image, 1)
+    image = image.convertToFormat(QtGui.QImage.Format_ARGB32)
+    return qimage_to_texture_buffer(image, 4)
+
+
+def pack_channels(channel_buffers):
+    """Pack grayscale maps into the channels of a single texture.
+
+    Color maps contribute their red channel. Maps are downsampled to the
+    size of the smallest one. Channels without a map are black, alpha is
+    opaque without a map.
+
+    Args:
+        channel_buffers (dict): pixel data of the maps by channel name,
+            one of `PACKED_CHANNELS`
+
+    Returns:
+        TextureBuffer: packed BGRA pixel data
+    """
+    width = min(buffer.width for buffer in channel_buffers.values())
+    height = min(buffer.height for buffer in channel_buffers.values())
+    pixel_count = width * height
+    if np is not None:
+        packed = np.zeros((pixel_count, 4), dtype=np.uint8)
+        packed[:, BGRA_CHANNEL_OFFSETS["alpha"]] = 255
+    else:
+        packed = bytearray(pixel_count * 4)
+        packed[BGRA_CHANNEL_OFFSETS["alpha"]::4] = b"\xff" * pixel_count
+
+    for channel, texture_buffer in channel_buffers.items():
+        texture_buffer = downsample_texture_buffer(
+            texture_buffer, width, height)
+        offset = BGRA_CHANNEL_OFFSETS[channel]
+        # Single channel maps have one byte per pixel, the red channel
+        # of color maps is used
+        source_offset = 0
+        if texture_buffer.bytes_per_pixel == 4:
+            source_offset = BGRA_CHANNEL_OFFSETS["red"]
+        if np is not None:
+            pixels = np.frombuffer(texture_buffer.data, dtype=np.uint8)
+            packed[:, offset] = pixels.reshape(
+                pixel_count, texture_buffer.bytes_per_pixel)[:, source_offset]
+        else:
+            packed[offset::4] = texture_buffer.data[
+                source_offset::texture_buffer.bytes_per_pixel]
+
+    return TextureBuffer(width, height, 4, bytes(packed))
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""Counting and tracing of Substance Designer API calls.
+
+The calls are counted while a publish is profiled when enabled in the
+project settings. Tracing of the
+whole session is enabled with the `AYON_SD_TRACE_API` environment
+variable. Traced calls are also timed per call site and the profile is
+written when the session ends as:
+
+- `<name>.json` with the call counts and timings per call site
+- `<name>.folded` with the folded stacks of the calls weighted by their
+  time in microseconds, which can be turned into a flame graph e.g. with
+  `flamegraph.pl` or speedscope.
+
+The profile is written to `AYON_SD_TRACE_API_DIR`, the temp dir by
+default.
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import logging
+import tempfile
+import datetime
+import functools
+import importlib
+import threading
+import collections
+
+
+log = logging.getLogger("ayon_substancedesigner")
+
+TRACE_ENV = "AYON_SD_TRACE_API"
+TRACE_DIR_ENV = "AYON_SD_TRACE_API_DIR"
+# Maximum number of frames of a traced stack
+MAX_STACK_DEPTH = 64
+
+# Traced methods by (module, class name)
+TRACED_SD_METHODS = {
+    ("sd.api.sdapplication", "SDApplication"): (
+        "getPackageMgr",
+        "getQtForPythonUIMgr",
+        "getPath",
+        "getColorManagementEngine",
+    ),
+    ("sd.api.qtforpythonuimgrwrapper", "QtForPythonUIMgrWrapper"): (
+        "getCurrentGraph",
+        "getMainWindow",
+    ),
+    ("sd.api.sdpackagemgr", "SDPackageMgr"): (
+        "getUserPackages",
+        "loadUserPackage",
+        "unloadUserPackage",
+        "savePackageAs",
+    ),
+    ("sd.api.sdpackage", "SDPackage"): (
+        "getChildrenResources",
+        "getMetadataDict",
+        "getFilePath",
+        "isModified",
+    ),
+    ("sd.api.sdmetadatadict", "SDMetadataDict"): (
+        "getPropertyValueFromId",
+        "setPropertyValueFromId",
+    ),
+    ("sd.api.sdresource", "SDResource"): (
+        "getIdentifier",
+        "getClassName",
+        "getPackage",
+        "getUrl",
+    ),
+    ("sd.api.sdgraph", "SDGraph"): (
+        "getNodes",
+        "getOutputNodes",
+        "getProperties",
+        "getPropertyFromId",
+        "getPropertyValue",
+        "setPropertyValue",
+    ),
+    ("sd.api.sbs.sdsbscompgraph", "SDSBSCompGraph"): (
+        "compute",
+    ),
+    ("sd.api.sdnode", "SDNode"): (
+        "getDefinition",
+        "getIdentifier",
+        "getProperties",
+        "getPropertyValue",
+        "getPropertyConnections",
+        "getPropertyGraph",
+        "getReferencedResource",
+    ),
+    ("sd.api.sddefinition", "SDDefinition"): (
+        "getId",
+        "getProperties",
+    ),
+    ("sd.api.sdtexture", "SDTexture"): (
+        "save",
+        "getPixelBufferAddress",
+    ),
+}
+
+
+def is_tracing_enabled():
+    """Whether tracing of the session is enabled by environment.
+
+    Returns:
+        bool: Tracing is enabled.
+    """
+    return os.environ.get(TRACE_ENV, "").lower() not in ("", "0", "false")
+
+
+class SDCallCounter:
+    """Count calls of Substance Designer API methods.
+
+    While started, the methods in `TRACED_SD_METHODS` are replaced on
+    their classes by wrappers counting the calls. Counting can be started
+    multiple times, the original methods are restored when the last
+    counting stops.
+
+    With `trace_call_sites` the calls are also timed by their call site
+    and by their python stack.
+    """
+
+    def __init__(self):
+        self.counts = collections.Counter()
+        self.trace_call_sites = False
+        # [count, seconds] by (call name, filename, line, function)
+        self.call_sites = {}
+        # Microseconds by folded stack
+        self.stacks = collections.Counter()
+        self._originals = []
+        self._depth = 0
+        self._lock = threading.Lock()
+        # Guards the depth and the replaced methods
+        self._depth_lock = threading.Lock()
+
+    def start(self, trace_call_sites=False):
+        """Start counting the calls.
+
+        Args:
+            trace_call_sites (bool): Time the calls by call site too.
+        """
+        with self._depth_lock:
+            if trace_call_sites:
+                self.trace_call_sites = True
+            self._depth += 1
+            if self._depth == 1:
+                self._install()
+
+    def stop(self):
+        """Stop counting the calls.
+
+        Returns:
+            collections.Counter: call counts by "Class.method"
+        """
+        with self._depth_lock:
+            if self._depth:
+                self._depth -= 1
+                if not self._depth:
+                    self._uninstall()
+                    self.trace_call_sites = False
+        return self.counts
+
+    def reset(self):
+        self.counts = collections.Counter()
+        self.call_sites = {}
+        self.stacks = collections.Counter()
+
+    def get_call_site_report(self):
+        """Get call counts and timings by call sites.
+
+        Returns:
+            list: call sites sorted by their total time
+        """
+        with self._lock:
+            items = list(self.call_sites.items())
+        report = [
+            {
+                "call": call_name,
+                "filename": filename,
+                "line": line,
+                "function": function,
+                "count": count,
+                "duration": duration
+            }
+            for (call_name, filename, line, function), (count, duration)
+            in items
+        ]
+        report.sort(key=lambda item: item["duration"], reverse=True)
+        return report
+
+    def write_profile(self, output_dir, name):
+        """Write the JSON report and the folded stacks.
+
+        Args:
+            output_dir (str): output directory
+            name (str): name of the files without extension
+
+        Returns:
+            str, str: filepaths of the JSON report and the folded stacks
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        json_path = os.path.join(output_dir, f"{name}.json")
+        folded_path = os.path.join(output_dir, f"{name}.folded")
+        with open(json_path, "w") as stream:
+            json.dump({
+                "counts": dict(self.counts),
+                "call_sites": self.get_call_site_report()
+            }, stream, indent=4)
+        with self._lock:
+            stacks = list(self.stacks.items())
+        with open(folded_path, "w") as stream:
+            for stack, microseconds in stacks:
+                stream.write(f"{stack} {microseconds}\n")
+        return json_path, folded_path
+
+    def _install(self):
+        for (module_name, class_name), method_names in (
+            TRACED_SD_METHODS.items()
+        ):
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                log.debug(f"Can't trace calls of {module_name}")
+                continue
+            cls = getattr(module, class_name, None)
+            if cls is None:
+                continue
+            for method_name in method_names:
+                method = getattr(cls, method_name, None)
+                if method is None:
+                    continue
+                # Inherited methods are only overridden on the class
+                is_own = method_name in cls.__dict__
+                self._originals.append((cls, method_name, method, is_own))
+                setattr(cls, method_name, self._wrap(
+                    method, f"{class_name}.{method_name}"))
+
+    def _uninstall(self):
+        while self._originals:
+            cls, method_name, method, is_own = self._originals.pop()
+            if is_own:
+                setattr(cls, method_name, method)
+            else:
+                delattr(cls, method_name)
+
+    def _wrap(self, method, call_name):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if not self.trace_call_sites:
+                with self._lock:
+                    self.counts[call_name] += 1
+                return method(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._record_call(
+                    call_name, time.perf_counter() - start,
+                    sys._getframe(1)
+                )
+        return wrapper
+
+    def _record_call(self, call_name, duration, frame):
+        code = frame.f_code
+        call_site = (call_name, code.co_filename, frame.f_lineno,
+                     code.co_name)
+        frames = []
+        while frame is not None and len(frames) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            frames.append(
+                f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        frames.reverse()
+        frames.append(call_name)
+        stack = ";".join(frames)
+        with self._lock:
+            self.counts[call_name] += 1
+            site = self.call_sites.setdefault(call_site, [0, 0.0])
+            site[0] += 1
+            site[1] += duration
+            self.stacks[stack] += int(duration * 1000000)
+
+
+_call_counter = SDCallCounter()
+_session_tracing = {"started": None}
+
+
+def get_sd_call_counter():
+    """Get the shared counter of Substance Designer API calls.
+
+    Returns:
+        SDCallCounter: call counter
+    """
+    return _call_counter
+
+
+def start_session_tracing():
+    """Trace Substance Designer API calls until the session ends.
+
+    Does nothing unless enabled by the `AYON_SD_TRACE_API` environment
+    variable. The profile is written by `stop_session_tracing` which is
+    also called at exit.
+    """
+    if not is_tracing_enabled() or _session_tracing["started"]:
+        return
+    _session_tracing["started"] = datetime.datetime.now()
+    _call_counter.start(trace_call_sites=True)
+    atexit.register(stop_session_tracing)
+    log.info("Tracing Substance Designer API calls.")
+
+
+def stop_session_tracing():
+    """Stop tracing of the session and write the profile.
+
+    Returns:
+        str: filepath of the folded stacks or None when tracing was not
+            running
+    """
+    started = _session_tracing["started"]
+    if not started:
+        return None
+    _session_tracing["started"] = None
+    atexit.unregister(stop_session_tracing)
+    _call_counter.stop()
+
+    output_dir = (
+        os.environ.get(TRACE_DIR_ENV)
+        or os.path.join(tempfile.gettempdir(), "ayon_substancedesigner")
+    )
+    name = "sd_api_trace_{}_{}".format(
+        started.strftime("%Y%m%d_%H%M%S"), os.getpid())
+    _, folded_path = _call_counter.write_profile(output_dir, name)
+    log.info(
+        "Substance Designer API calls: {}. Trace written to: {}".format(
+            sum(_call_counter.counts.values()), folded_path)
+    )
+    return folded_path
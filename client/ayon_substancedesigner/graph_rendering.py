@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""Render graph outputs of cooked `.sbsar` archives in worker processes.
+
+Each graph is rendered by a separate renderer process, `sbsrender` of the
+Substance Automation Toolkit by default, so the graphs of a package are
+rendered in parallel and a failure of one graph does not affect the
+others. The command can be replaced in settings or with the
+`AYON_SD_TEXTURE_RENDERER` environment variable, e.g. by a stub renderer
+for local testing. The renders are waited for by the worker threads of
+the addon, they don't need a running Designer.
+"""
+import os
+import time
+import logging
+import subprocess
+import dataclasses
+
+from ayon_substancedesigner.sbsar_cooking import format_command_args
+
+
+log = logging.getLogger("ayon_substancedesigner")
+
+RENDERER_COMMAND_ENV = "AYON_SD_TEXTURE_RENDERER"
+DEFAULT_RENDERER_COMMAND = (
+    "sbsrender render --input {input} --input-graph {graph_url}"
+    " --input-graph-output {graph_outputs}"
+    " --output-path {output_dir} --output-name {output_name}"
+    " --output-format {extension}"
+)
+# Pattern of `sbsrender` replaced by the identifier of the output
+OUTPUT_NAME_PATTERN = "{outputNodeName}"
+
+
+def get_renderer_args(command_template, **data):
+    """Get arguments of the renderer command.
+
+    Args:
+        command_template (str): command with `{input}`, `{graph_url}`,
+            `{graph_outputs}`, `{output_dir}`, `{output_name}` and
+            `{extension}` placeholders. `{graph_outputs}` is a list of the
+            output identifiers to render, see `format_command_args`. The
+            `AYON_SD_TEXTURE_RENDERER` environment variable overrides it.
+        **data: values of the placeholders
+
+    Returns:
+        list: command arguments
+    """
+    command_template = (
+        os.environ.get(RENDERER_COMMAND_ENV) or command_template
+        or DEFAULT_RENDERER_COMMAND
+    )
+    return format_command_args(command_template, **data)
+
+
+@dataclasses.dataclass
+class GraphRenderJob:
+    """Render of outputs of a single graph.
+
+    Attributes:
+        graph_name (str): graph identifier
+        args (list): renderer command arguments
+        filepaths (list): filepaths the renderer is expected to write
+        log_filepath (str): file the renderer output is written to
+        error (str): error message when the render failed
+        duration (float): duration of the render in seconds
+    """
+    graph_name: str
+    args: list
+    filepaths: list
+    log_filepath: str
+    error: str = None
+    duration: float = 0.0
+
+    def run(self, timeout=None):
+        """Run the renderer and wait for it.
+
+        Errors are stored in `error` instead of raised so a failed graph
+        does not stop the other renders.
+
+        Args:
+            timeout (float, optional): seconds to wait for the renderer
+        """
+        start = time.perf_counter()
+        try:
+            with open(self.log_filepath, "wb") as log_stream:
+                process = subprocess.run(
+                    self.args,
+                    stdout=log_stream,
+                    stderr=subprocess.STDOUT,
+                    stdin=subprocess.DEVNULL,
+                    timeout=timeout
+                )
+        except subprocess.TimeoutExpired:
+            self.error = f"Render did not finish in {timeout} seconds."
+        except OSError as exc:
+            self.error = f"Failed to start the renderer: {exc}"
+        else:
+            missing = [
+                filepath for filepath in self.filepaths
+                if not os.path.isfile(filepath)
+            ]
+            if process.returncode != 0:
+                self.error = (
+                    f"Renderer failed with exit code {process.returncode}."
+                )
+            elif missing:
+                self.error = "Renderer did not write: {}".format(
+                    ", ".join(missing))
+        if self.error:
+            self.error += f" See the log: {self.log_filepath}"
+        self.duration = time.perf_counter() - start
+
+
+def render_graphs(jobs, timeout=None, worker_pool=None):
+    """Run graph render jobs in parallel processes.
+
+    Args:
+        jobs (list): render jobs
+        timeout (float, optional): seconds to wait for each render
+        worker_pool (api.concurrency.WorkerPool, optional): pool whose
+            threads wait for the processes, its number of workers limits
+            the processes running at once. Defaults to the shared worker
+            pool of the addon with one worker per CPU.
+
+    Returns:
+        list: failed jobs
+    """
+    if not jobs:
+        return []
+    if worker_pool is None:
+        from ayon_substancedesigner.api.concurrency import get_worker_pool
+
+        worker_pool = get_worker_pool()
+    # The threads only wait for their processes
+    futures = [
+        (worker_pool.submit(job.run, timeout), job)
+        for job in jobs
+    ]
+    for future, job in futures:
+        try:
+            future.result()
+        except Exception as exc:
+            job.error = str(exc)
+
+    for job in jobs:
+        log.debug(f"Rendered graph '{job.graph_name}' in {job.duration:.2f}s")
+    return [job for job in jobs if job.error]
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Encoding of the AYON metadata stored in Substance packages.
+
+The metadata are stored as string values of the package metadata dict and
+saved with every `.sbs` file. Large values, e.g. thousands of loaded
+containers, are stored as zlib compressed JSON encoded with base64 behind
+a versioned prefix. Small values stay plain JSON. Values without a prefix
+are plain JSON as written by older versions of the addon, so both are
+read transparently. This module does not need a running Designer.
+"""
+import json
+import zlib
+import base64
+import binascii
+
+
+# Prefix of compressed values, the number is the version of the encoding
+COMPRESSED_PREFIX = "ayon:zlib1:"
+# Values with shorter JSON are stored uncompressed
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_LEVEL = 6
+
+
+def encode_metadata(metadata):
+    """Encode metadata to a string stored in the package.
+
+    Args:
+        metadata (dict/list): AYON-related metadata
+
+    Returns:
+        str: encoded metadata
+    """
+    value = json.dumps(metadata, separators=(",", ":"))
+    if len(value) < COMPRESS_MIN_SIZE:
+        return value
+    compressed = zlib.compress(value.encode("utf-8"), COMPRESS_LEVEL)
+    return COMPRESSED_PREFIX + base64.b64encode(compressed).decode("ascii")
+
+
+def decode_metadata_json(value):
+    """Get the JSON of metadata stored in the package.
+
+    Args:
+        value (str): encoded or plain JSON metadata
+
+    Raises:
+        ValueError: The value can't be decompressed.
+
+    Returns:
+        str: JSON of the metadata
+    """
+    if not value.startswith(COMPRESSED_PREFIX):
+        return value
+
+    try:
+        data = zlib.decompress(
+            base64.b64decode(value[len(COMPRESSED_PREFIX):], validate=True)
+        )
+    except (zlib.error, binascii.Error) as exc:
+        raise ValueError(f"Invalid compressed metadata: {exc}") from exc
+    return data.decode("utf-8")
+
+
+def decode_metadata(value):
+    """Decode metadata stored in the package.
+
+    Args:
+        value (str): encoded or plain JSON metadata
+
+    Raises:
+        ValueError: The value can't be decoded.
+
+    Returns:
+        dict/list: AYON-related metadata
+    """
+    return json.loads(decode_metadata_json(value))
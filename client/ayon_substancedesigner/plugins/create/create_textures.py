@@ -6,8 +6,7 @@ from ayon_core.lib import BoolDef, EnumDef
 from ayon_substancedesigner.api.pipeline import set_instance
 from ayon_substancedesigner.api.lib import (
     get_current_graph_name,
-    get_sd_graphs_by_package,
-    get_output_maps_from_graphs
+    get_package_snapshot
 )
 from ayon_substancedesigner.api.plugin import TextureCreator
 
@@ -23,6 +22,10 @@ class CreateTextures(TextureCreator):
     settings_category = "substancedesigner"
     review = False
     exportFileFormat = "png"
+    exportWorkers = 0
+    onlyChangedGraphs = False
+    exportResolutions = []
+    channelPackingProfiles = []
 
     def get_dynamic_data(
         self,
@@ -60,7 +63,10 @@ class CreateTextures(TextureCreator):
             "review",
             "exportFileFormat",
             "exportedGraphs",
-            "exportedGraphsOutputs"
+            "exportedGraphsOutputs",
+            "onlyChangedGraphs",
+            "exportResolutions",
+            "channelPacking"
         ]:
             if key in pre_create_data:
                 creator_attributes[key] = pre_create_data[key]
@@ -73,7 +79,13 @@ class CreateTextures(TextureCreator):
         )
 
     def get_instance_attr_defs(self):
-        return [
+        graphs = []
+        output_maps = set()
+        snapshot = get_package_snapshot()
+        if snapshot:
+            graphs = snapshot.graphs
+            output_maps = snapshot.output_maps
+        attr_defs = [
             BoolDef("review",
                     label="Review",
                     tooltip="Mark as reviewable",
@@ -102,13 +114,57 @@ class CreateTextures(TextureCreator):
                     default=self.exportFileFormat,
                     label="File type"),
             EnumDef("exportedGraphs",
-                    items=get_sd_graphs_by_package(),
+                    items=graphs,
                     multiselection=True,
                     default=None,
                     label="Graphs To be Exported"),
             EnumDef("exportedGraphsOutputs",
-                    items=get_output_maps_from_graphs(),
+                    items=output_maps,
                     multiselection=True,
                     default=None,
-                    label="Graph Outputs To be Exported")
+                    label="Graph Outputs To be Exported"),
+            BoolDef("onlyChangedGraphs",
+                    label="Only Changed Graphs",
+                    tooltip=(
+                        "Export only the graphs which changed since they "
+                        "were last published with this option in this "
+                        "session. The published state is kept only in "
+                        "memory, all graphs are exported on the first "
+                        "publish after Designer starts"
+                    ),
+                    default=self.onlyChangedGraphs),
+            EnumDef("exportResolutions",
+                    items=[
+                        str(2 ** power) for power in range(5, 14)
+                    ],
+                    multiselection=True,
+                    default=self.exportResolutions,
+                    label="Export Resolutions",
+                    tooltip=(
+                        "Compute the graphs once at the highest "
+                        "resolution and downsample the others from it. "
+                        "Uses the output size of the graphs when empty. "
+                        "Needs a bmp, jpg or png file type, only the "
+                        "highest resolution of 16-bit outputs is "
+                        "exported."
+                    ))
         ]
+        # Enum without items is not allowed
+        if self.channelPackingProfiles:
+            attr_defs.append(
+                EnumDef("channelPacking",
+                        items=[
+                            profile["name"]
+                            for profile in self.channelPackingProfiles
+                        ],
+                        multiselection=True,
+                        default=None,
+                        label="Channel Packing",
+                        tooltip=(
+                            "Pack grayscale outputs of each graph into the "
+                            "channels of extra textures by the profiles "
+                            "from the project settings. Needs a bmp, jpg "
+                            "or png file type."
+                        ))
+            )
+        return attr_defs
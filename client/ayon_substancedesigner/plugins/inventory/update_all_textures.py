@@ -0,0 +1,152 @@
+import collections
+
+import ayon_api
+
+from ayon_core.pipeline import (
+    InventoryAction,
+    discover_loader_plugins,
+    get_current_project_name
+)
+from ayon_core.pipeline.load import get_representation_contexts
+
+
+class UpdateTexturesToLatest(InventoryAction):
+    """Update selected texture containers to their latest versions at once.
+
+    The containers are updated by `SubstanceLoadProjectImage.update_many`
+    so the containers metadata is written only once for all of them.
+    """
+
+    label = "Update Textures to Latest"
+    icon = "angle-double-up"
+    color = "#bbdd00"
+    order = -1
+
+    loader_name = "SubstanceLoadProjectImage"
+
+    @classmethod
+    def is_compatible(cls, container):
+        return container.get("loader") == cls.loader_name
+
+    def process(self, containers):
+        loader = self.get_loader()
+        if loader is None:
+            self.log.warning(f"Loader '{self.loader_name}' not found.")
+            return False
+
+        containers = [
+            container for container in containers
+            if self.is_compatible(container)
+        ]
+        containers_by_project = collections.defaultdict(list)
+        for container in containers:
+            project_name = (
+                container.get("project_name") or get_current_project_name()
+            )
+            containers_by_project[project_name].append(container)
+
+        containers_with_contexts = []
+        for project_name, project_containers in (
+            containers_by_project.items()
+        ):
+            containers_with_contexts.extend(
+                self.get_latest_contexts(project_name, project_containers)
+            )
+
+        if not containers_with_contexts:
+            self.log.info("All textures are up to date.")
+            return False
+
+        loader().update_many(containers_with_contexts)
+        return True
+
+    def get_loader(self):
+        for loader in discover_loader_plugins():
+            if loader.__name__ == self.loader_name:
+                return loader
+        return None
+
+    def get_latest_contexts(self, project_name, containers):
+        """Get representation contexts of the latest versions.
+
+        Args:
+            project_name (str): project name
+            containers (list): containers to update
+
+        Returns:
+            list: pairs of container and the context of the representation
+                of the latest version, containers which are already up to
+                date are skipped
+        """
+        repre_ids = {container["representation"] for container in containers}
+        repre_entities_by_id = {
+            repre_entity["id"]: repre_entity
+            for repre_entity in ayon_api.get_representations(
+                project_name,
+                representation_ids=repre_ids,
+                fields={"id", "name", "versionId"}
+            )
+        }
+        version_ids = {
+            repre_entity["versionId"]
+            for repre_entity in repre_entities_by_id.values()
+        }
+        product_ids_by_version_id = {
+            version_entity["id"]: version_entity["productId"]
+            for version_entity in ayon_api.get_versions(
+                project_name,
+                version_ids=version_ids,
+                fields={"id", "productId"}
+            )
+        }
+        last_versions_by_product_id = ayon_api.get_last_versions(
+            project_name,
+            set(product_ids_by_version_id.values()),
+            fields={"id", "productId"}
+        )
+        last_version_ids = {
+            version_entity["id"]
+            for version_entity in last_versions_by_product_id.values()
+        }
+        repre_names = {
+            repre_entity["name"]
+            for repre_entity in repre_entities_by_id.values()
+        }
+        last_repre_entities = list(ayon_api.get_representations(
+            project_name,
+            representation_names=repre_names,
+            version_ids=last_version_ids
+        ))
+        last_repres_by_key = {
+            (repre_entity["versionId"], repre_entity["name"]): repre_entity
+            for repre_entity in last_repre_entities
+        }
+        contexts_by_repre_id = get_representation_contexts(
+            project_name, last_repre_entities)
+
+        containers_with_contexts = []
+        for container in containers:
+            repre_entity = repre_entities_by_id.get(
+                container["representation"])
+            if repre_entity is None:
+                self.log.warning(
+                    "Representation of container"
+                    f" '{container['objectName']}' not found."
+                )
+                continue
+            product_id = product_ids_by_version_id.get(
+                repre_entity["versionId"])
+            last_version = last_versions_by_product_id.get(product_id)
+            if last_version is None:
+                continue
+            last_repre_entity = last_repres_by_key.get(
+                (last_version["id"], repre_entity["name"]))
+            if (
+                last_repre_entity is None
+                or last_repre_entity["id"] == repre_entity["id"]
+            ):
+                continue
+            containers_with_contexts.append(
+                (container, contexts_by_repre_id[last_repre_entity["id"]])
+            )
+        return containers_with_contexts
@@ -1,26 +1,107 @@
 import os
 import sd
+import time
+import hashlib
+import functools
+from sd.api.sdapiobject import APIException
 from ayon_core.pipeline import load
 
 from ayon_core.lib import EnumDef
 from ayon_substancedesigner.api.pipeline import (
     imprint,
-    remove_container_metadata
+    imprint_batch,
+    get_container_data,
+    replace_containers_metadata,
+    remove_container_metadata,
+    get_bitmap_records,
+    set_bitmap_record,
+    remove_bitmap_records,
+    AYON_METADATA_CONTAINERS_KEY
 )
-from ayon_substancedesigner.api.lib import get_package_from_current_graph
+from ayon_substancedesigner.api.lib import (
+    get_package_from_current_graph,
+    get_resource_index,
+    get_cached_sd_metadata,
+    invalidate_package_snapshots,
+    sd_metadata_batch
+)
+from ayon_substancedesigner.api.concurrency import (
+    get_main_thread_executor,
+    get_worker_pool
+)
+
+# Embed method referencing the loaded file
+LINKED = 1
+# Embed method storing the file content inside of the package
+BINARY_EMBEDDED = 3
+
+# File hashes by (filepath, modification time, size)
+_file_hash_cache = {}
+# Package and bitmaps to delete when unused by package path, collected
+# from removed containers until the control gets back to Qt event loop
+_pending_bitmap_removals = {}
 
 
 def has_resource_file(current_package):
-    for resource in current_package.getChildrenResources(True):
-        if resource.getClassName() == "SDResourceFolder":
-            return True
-    return False
+    return get_resource_folder(current_package) is not None
 
 
 def get_resource_folder(current_package):
-    for resource in current_package.getChildrenResources(True):
-        if resource.getClassName() == "SDResourceFolder":
-            return resource
+    resource_folders = get_resource_index().get_resources(
+        "SDResourceFolder", current_package.getFilePath())
+    if resource_folders:
+        return resource_folders[0]
+
+
+def get_file_hash(filepath):
+    """Get sha1 hash of the file content.
+
+    Args:
+        filepath (str): filepath
+
+    Returns:
+        str: hex digest of the file content
+    """
+    stat = os.stat(filepath)
+    cache_key = (filepath, stat.st_mtime_ns, stat.st_size)
+    file_hash = _file_hash_cache.get(cache_key)
+    if file_hash is None:
+        hasher = hashlib.sha1()
+        with open(filepath, "rb") as stream:
+            for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+                hasher.update(chunk)
+        file_hash = hasher.hexdigest()
+        _file_hash_cache[cache_key] = file_hash
+    return file_hash
+
+
+def get_referenced_bitmaps(current_package):
+    """Get bitmap resources used by nodes of the package graphs.
+
+    Args:
+        current_package (sd.api.sdpackage.SDPackage): Substance package
+
+    Returns:
+        set: identifiers of the bitmap resources of the package
+    """
+    package_path = current_package.getFilePath()
+    identifiers = set()
+    for graph in get_resource_index().get_resources(
+        "SDSBSCompGraph", package_path
+    ):
+        for sd_node in graph.getNodes():
+            # Not all nodes can reference a resource
+            try:
+                resource = sd_node.getReferencedResource()
+            except (APIException, AttributeError):
+                continue
+            if (
+                resource is not None
+                and resource.getClassName() == "SDResourceBitmap"
+                and resource.getPackage().getFilePath() == package_path
+            ):
+                identifiers.add(resource.getIdentifier())
+    return identifiers
 
 
 class SubstanceLoadProjectImage(load.LoaderPlugin):
@@ -51,57 +132,152 @@ class SubstanceLoadProjectImage(load.LoaderPlugin):
         ]
 
     def load(self, context, name, namespace, options):
+        get_main_thread_executor().run(
+            self._load, context, name, namespace, options)
+
+    def _load(self, context, name, namespace, options):
         current_package = get_package_from_current_graph()
         filepath = self.filepath_from_context(context)
         resource_embed_method = options.get("resource_loading_options", 1)
         import_options = {
             "resource_loading_options": resource_embed_method
         }
-        identifier = self.import_texture(
-            filepath, context, current_package, resource_embed_method)
-        imprint(
-            current_package, name, namespace,
-            context, loader=self, identifier=identifier,
-            options=import_options
-        )
+        with imprint_batch():
+            identifier = self.import_texture(
+                filepath, context, current_package, resource_embed_method)
+            imprint(
+                current_package, name, namespace,
+                context, loader=self, identifier=identifier,
+                options=import_options
+            )
 
     def update(self, container, context):
-        # As the filepath for SD Resource file is read-only data.
-        # the update function cannot directly set the textures
-        # accordingly to the versions in the existing SD Resource
-        # Therefore, new resource version of the bitmap would be
-        # created when updating
-        current_package = get_package_from_current_graph()
-        filepath = self.filepath_from_context(context)
-        resource_embed_method = int(container["resource_loading_options"])
-        options = {
-            "resource_loading_options": resource_embed_method
-        }
-        identifier = self.import_texture(
-            filepath, context, current_package, resource_embed_method)
-        imprint(
-            current_package,
-            container["name"],
-            container.get("namespace", None),
-            context,
-            loader=self,
-            identifier=identifier,
-            options=options
+        self.update_many([(container, context)])
+
+    def update_many(self, containers_with_contexts):
+        """Update many containers at once.
+
+        Files of all the containers are hashed on the worker threads.
+        New bitmaps are then imported in a single hop to the main thread
+        and the containers metadata is rewritten once.
+
+        As the filepath for SD Resource file is read-only data, the update
+        cannot directly set the textures accordingly to the versions in
+        the existing SD Resource. Therefore, new resource version of the
+        bitmap is created unless a bitmap with the same file content
+        exists already. The previous bitmap is kept as graph nodes may
+        still use it.
+
+        Args:
+            containers_with_contexts (list): pairs of container and the
+                representation context to update the container to
+        """
+        start = time.perf_counter()
+        filepaths = [
+            self.filepath_from_context(context)
+            for _, context in containers_with_contexts
+        ]
+        # Hash the files on the workers, the bitmaps are imported
+        # on the main thread with the hashes already cached
+        list(get_worker_pool().map(get_file_hash, set(filepaths)))
+        executor = get_main_thread_executor()
+        # Containers are stored in the metadata of the current package
+        current_package = executor.run(get_package_from_current_graph)
+        import_futures = executor.submit_batch([
+            functools.partial(
+                self.import_texture, filepath, context, current_package,
+                int(container["resource_loading_options"])
+            )
+            for (container, context), filepath in zip(
+                containers_with_contexts, filepaths
+            )
+        ])
+        identifiers = [future.result() for future in import_futures]
+        replacements = executor.run(
+            self._replace_containers, current_package,
+            containers_with_contexts, identifiers
+        )
+        self.log.info(
+            f"Updated {len(replacements)} containers in"
+            f" {time.perf_counter() - start:.2f}s."
         )
 
+    def _replace_containers(self, current_package, containers_with_contexts,
+                            identifiers):
+        """Rewrite the containers metadata with the imported bitmaps.
+
+        Returns:
+            list: pairs of the container and its new data
+        """
+        replacements = []
+        with imprint_batch():
+            for (container, context), identifier in zip(
+                containers_with_contexts, identifiers
+            ):
+                options = {
+                    "resource_loading_options": int(
+                        container["resource_loading_options"])
+                }
+                data = get_container_data(
+                    container["name"],
+                    container.get("namespace", None),
+                    context,
+                    loader=self,
+                    identifier=identifier,
+                    options=options
+                )
+                replacements.append((container, data))
+
+            replace_containers_metadata(current_package, replacements)
+        return replacements
+
     def remove(self, container):
+        get_main_thread_executor().run(self._remove, container)
+
+    def _remove(self, container):
         # TODO: Supports the check across different packages if needed
         current_package = get_package_from_current_graph()
-        for resource in current_package.getChildrenResources(True):
-            if resource.getClassName() == "SDResourceBitmap":
-                if resource.getIdentifier() == container["objectName"]:
-                    resource.delete()
-        remove_container_metadata(container)
+        with imprint_batch():
+            remove_container_metadata(container)
+        self.schedule_unused_bitmaps_removal(
+            current_package, {container["objectName"]})
+
+    def schedule_unused_bitmaps_removal(self, current_package, identifiers):
+        """Delete unused bitmaps once the control gets back to Qt event loop.
+
+        Bitmaps of all containers removed at once, e.g. from the Scene
+        Inventory, are checked together so the package graphs are scanned
+        only once.
+
+        Args:
+            current_package (sd.api.sdpackage.SDPackage): current Substance
+                package
+            identifiers (set): identifiers of bitmaps resources to delete
+                when unused.
+        """
+        is_scheduled = bool(_pending_bitmap_removals)
+        _, pending_identifiers = _pending_bitmap_removals.setdefault(
+            current_package.getFilePath(), (current_package, set()))
+        pending_identifiers.update(identifiers)
+        if not is_scheduled:
+            get_main_thread_executor().schedule(
+                self._remove_pending_bitmaps)
+
+    def _remove_pending_bitmaps(self):
+        pending_removals = list(_pending_bitmap_removals.values())
+        _pending_bitmap_removals.clear()
+        with sd_metadata_batch():
+            for current_package, identifiers in pending_removals:
+                self.remove_unused_bitmaps(current_package, identifiers)
 
     def import_texture(self, filepath, context,
                        current_package, resource_embed_method):
         """Import textures as Substance Designer Package
 
+        Bitmap resource loaded before from a file with the same content
+        and with the same embed method is reused. Linked bitmap resources
+        are reused only when they link the same file.
+
         Args:
             filepath (str): filepath
             context (dict): context
@@ -112,21 +288,141 @@ class SubstanceLoadProjectImage(load.LoaderPlugin):
         Returns:
             str: Map identifier
         """
+        file_hash = get_file_hash(filepath)
+        identifier = self.get_bitmap_by_hash(
+            current_package, file_hash, resource_embed_method, filepath)
+        if identifier:
+            self.log.info(
+                f"Reusing bitmap resource '{identifier}' with the same"
+                f" content as: {filepath}"
+            )
+            return identifier
+
         project_name = context["project"]["name"]
         filename = os.path.splitext(os.path.basename(filepath))[0]
         # identifier would convert "." to "_", this makes sure
         # container data taking correct identifier value
         identifier = filename.replace(".", "_")
-        if not has_resource_file(current_package):
+        resource_index = get_resource_index()
+        resource_folder = get_resource_folder(current_package)
+        if resource_folder is None:
             resource_folder = sd.api.sdresourcefolder.SDResourceFolder.sNew(
                 current_package)
             resource_folder.setIdentifier(f"{project_name}_resources")
-        else:
-            resource_folder = get_resource_folder(current_package)
+            resource_index.register_resource(resource_folder)
+            invalidate_package_snapshots()
         bitmap_resource = sd.api.sdresourcebitmap.SDResourceBitmap.sNewFromFile(                # noqa
             resource_folder, filepath,
             sd.api.sdresource.EmbedMethod(resource_embed_method)
         )
         bitmap_resource.setIdentifier(identifier)
+        resource_index.register_resource(bitmap_resource)
+        # Identifier gets a suffix when it is already used
+        identifier = bitmap_resource.getIdentifier()
+        # Records of bitmaps imported at once are written together
+        with imprint_batch():
+            set_bitmap_record(current_package, identifier, {
+                "file_hash": file_hash,
+                "embed_method": int(resource_embed_method),
+                "size": os.path.getsize(filepath)
+            })
 
         return identifier
+
+    def get_bitmap_by_hash(self, current_package, file_hash,
+                           resource_embed_method, filepath):
+        """Find bitmap resource loaded from a file with the same content.
+
+        Linked bitmap resources keep pointing at the file they were loaded
+        from, e.g. the file of another version, so they are reused only
+        when they link the same file.
+
+        Args:
+            current_package (sd.api.sdpackage.SDPackage): current Substance
+                package
+            file_hash (str): hash of the file content
+            resource_embed_method (int): Resource emebed method
+            filepath (str): filepath of the loaded file
+
+        Returns:
+            str: identifier of the bitmap resource or None
+        """
+        resource_index = get_resource_index()
+        package_path = current_package.getFilePath()
+        for identifier, record in get_bitmap_records(current_package).items():
+            if (
+                record.get("file_hash") != file_hash
+                or record.get("embed_method") != int(resource_embed_method)
+            ):
+                continue
+            resource = resource_index.get_resource(
+                "SDResourceBitmap", identifier, package_path)
+            if resource is None:
+                continue
+            if int(resource_embed_method) == LINKED and (
+                os.path.normpath(resource.getFilePath())
+                != os.path.normpath(filepath)
+            ):
+                continue
+            return identifier
+        return None
+
+    def remove_unused_bitmaps(self, current_package, identifiers=None):
+        """Delete bitmap resources which are not used anymore.
+
+        Bitmap resources created by the loader and the given bitmap
+        resources are deleted when no container and no node of the
+        package graphs references them.
+
+        Args:
+            current_package (sd.api.sdpackage.SDPackage): current Substance
+                package
+            identifiers (set, optional): identifiers of bitmaps resources
+                to delete when unused.
+        """
+        containers = get_cached_sd_metadata(
+            current_package, AYON_METADATA_CONTAINERS_KEY,
+            is_dictionary=False) or []
+        used_identifiers = {
+            container_data["objectName"] for container_data in containers
+        }
+        bitmap_records = get_bitmap_records(current_package)
+        candidates = set(bitmap_records)
+        if identifiers:
+            candidates.update(identifiers)
+        unused_identifiers = candidates - used_identifiers
+        if not unused_identifiers:
+            return
+
+        resource_index = get_resource_index()
+        package_path = current_package.getFilePath()
+        resources_by_identifier = {}
+        for identifier in unused_identifiers:
+            resource = resource_index.get_resource(
+                "SDResourceBitmap", identifier, package_path)
+            if resource is not None:
+                resources_by_identifier[identifier] = resource
+
+        # Scanning the graph nodes is expensive, do it only when there is
+        # something to delete
+        if resources_by_identifier:
+            for identifier in get_referenced_bitmaps(current_package):
+                unused_identifiers.discard(identifier)
+                resources_by_identifier.pop(identifier, None)
+
+        reclaimed_size = 0
+        for identifier, resource in resources_by_identifier.items():
+            resource_index.unregister_resource(resource)
+            resource.delete()
+            record = bitmap_records.get(identifier, {})
+            if record.get("embed_method") == BINARY_EMBEDDED:
+                reclaimed_size += record.get("size", 0)
+
+        remove_bitmap_records(current_package, unused_identifiers)
+        if not resources_by_identifier:
+            return
+        self.log.info(
+            f"Removed {len(resources_by_identifier)} unused bitmap resources,"
+            f" reclaimed {reclaimed_size / (1024 * 1024):.2f} MB of embedded"
+            " data."
+        )
@@ -1,6 +1,7 @@
 import pyblish.api
 
 from ayon_core.pipeline import registered_host
+from ayon_substancedesigner.api.profiling import profile_plugin
 
 
 class CollectCurrentFile(pyblish.api.ContextPlugin):
@@ -10,6 +11,7 @@ class CollectCurrentFile(pyblish.api.ContextPlugin):
     label = "Current Workfile"
     hosts = ["substancedesigner"]
 
+    @profile_plugin
     def process(self, context):
         host = registered_host()
         path = host.get_current_workfile()
@@ -2,14 +2,20 @@ import copy
 
 import pyblish.api
 
-from ayon_core.pipeline import tempdir
+from ayon_core.pipeline import tempdir, registered_host
 from ayon_core.pipeline.publish import KnownPublishError
 
 from ayon_substancedesigner.api.lib import (
     get_map_identifiers_by_graph,
-    get_sd_graphs_by_package,
+    get_package_snapshot,
+    get_sd_graph_by_name,
+    get_graph_key,
+    get_graph_fingerprint,
     get_colorspace_data
 )
+from ayon_substancedesigner.api.export import QT_IMAGE_FORMATS
+from ayon_substancedesigner.api.profiling import profile_plugin
+from ayon_substancedesigner.api.texture_processing import PACKED_CHANNELS
 
 
 class CollectTextureSet(pyblish.api.InstancePlugin):
@@ -20,6 +26,7 @@ class CollectTextureSet(pyblish.api.InstancePlugin):
     families = ["textureSet"]
     order = pyblish.api.CollectorOrder + 0.01
 
+    @profile_plugin
     def process(self, instance):
         staging_dir = tempdir.get_temp_dir(
             instance.context.data["projectName"],
@@ -30,8 +37,24 @@ class CollectTextureSet(pyblish.api.InstancePlugin):
             instance.data["exportedGraphs"] = creator_attrs.get(
                 "exportedGraphs", [])
         else:
-            instance.data["exportedGraphs"] = get_sd_graphs_by_package()
+            instance.data["exportedGraphs"] = list(
+                get_package_snapshot().graphs)
 
+        if creator_attrs.get("onlyChangedGraphs"):
+            instance.data["exportedGraphs"] = self.get_changed_graphs(
+                instance, instance.data["exportedGraphs"])
+
+        # Highest resolution first, it's the one the graphs are computed at
+        instance.data["exportResolutions"] = sorted(
+            {int(resolution)
+             for resolution in creator_attrs.get("exportResolutions") or []},
+            reverse=True
+        )
+
+        packing_profiles = self.get_packing_profiles(instance)
+        # Image instances copy the data of the texture set as it is before
+        # the graphs get added, so each copy doesn't grow with the graphs
+        instance_data = copy.deepcopy(dict(instance.data))
         selected_map_identifiers = creator_attrs.get(
             "exportedGraphsOutputs", {})
         for graph_name in instance.data["exportedGraphs"]:
@@ -54,16 +77,102 @@ class CollectTextureSet(pyblish.api.InstancePlugin):
 
             for map_identifier in map_identifiers:
                 self.create_image_instance(
-                    instance, graph_name,
+                    instance, instance_data, graph_name,
                     map_identifier, staging_dir
                 )
 
-    def create_image_instance(self, instance, graph_name,
-                              map_identifier, staging_dir):
+            for profile in packing_profiles:
+                packed_channels = {
+                    channel: profile[channel]
+                    for channel in PACKED_CHANNELS
+                    if profile.get(channel)
+                }
+                missing = set(packed_channels.values()) - map_identifiers
+                if missing:
+                    self.log.debug(
+                        f"Skipping channel packing '{profile['name']}' of"
+                        f" graph '{graph_name}', outputs not exported:"
+                        f" {', '.join(sorted(missing))}"
+                    )
+                    continue
+                self.create_image_instance(
+                    instance, instance_data, graph_name,
+                    profile["name"], staging_dir,
+                    packed_channels=packed_channels
+                )
+
+    def get_packing_profiles(self, instance):
+        """Get channel packing profiles enabled on the instance.
+
+        Returns:
+            list[dict]: profiles from the project settings
+        """
+        enabled = instance.data["creator_attributes"].get("channelPacking")
+        if not enabled:
+            return []
+        project_settings = instance.context.data["project_settings"]
+        create_settings = project_settings["substancedesigner"]["create"]
+        profiles = create_settings["CreateTextures"].get(
+            "channelPackingProfiles", [])
+        return [
+            profile for profile in profiles
+            if profile["name"] in enabled
+            and any(profile.get(channel) for channel in PACKED_CHANNELS)
+        ]
+
+    def get_changed_graphs(self, instance, graph_names):
+        """Filter graphs which changed since their last successful export.
+
+        The fingerprints of the graphs are stored on the instance so they
+        don't need to be computed again on extraction.
+
+        Returns:
+            list: names of the changed graphs
+        """
+        host = registered_host()
+        fingerprints = instance.data.setdefault("graphFingerprints", {})
+        graph_name_by_key = {}
+        fingerprints_by_key = {}
+        for graph_name in graph_names:
+            sd_graph = get_sd_graph_by_name(graph_name)
+            if sd_graph is None:
+                continue
+            graph_key = get_graph_key(sd_graph)
+            fingerprints[graph_name] = get_graph_fingerprint(sd_graph)
+            graph_name_by_key[graph_key] = graph_name
+            fingerprints_by_key[graph_key] = fingerprints[graph_name]
+
+        changed_graph_names = {
+            graph_name_by_key[graph_key]
+            for graph_key in host.get_changed_graphs(fingerprints_by_key)
+        }
+        unchanged_graph_names = [
+            graph_name for graph_name in graph_names
+            if graph_name not in changed_graph_names
+        ]
+        if unchanged_graph_names:
+            self.log.info(
+                "Skipping graphs unchanged since their last export: "
+                f"{', '.join(unchanged_graph_names)}"
+            )
+        return [
+            graph_name for graph_name in graph_names
+            if graph_name in changed_graph_names
+        ]
+
+    def create_image_instance(self, instance, instance_data, graph_name,
+                              map_identifier, staging_dir,
+                              packed_channels=None):
         """Create a new instance per image.
 
         The new instances will be of product type `image`.
 
+        Args:
+            instance_data (dict): data of the texture set instance copied
+                to the image instance
+            packed_channels (dict, optional): map identifiers packed to the
+                channels of the image by channel name, `map_identifier`
+                is the name of the packing profile then
         """
 
         context = instance.context
@@ -76,6 +185,9 @@ class CollectTextureSet(pyblish.api.InstancePlugin):
         image_product_name = f"{instance.name}_{texture_set_name}"
         image_product_group_name = f"{instance.name}_{graph_name}"
         ext = instance.data["creator_attributes"].get("exportFileFormat")
+        # Packed textures are written by Qt
+        if packed_channels and ext.lower() not in QT_IMAGE_FORMATS:
+            ext = "png"
         # Prepare representation
         representation = {
             "name": ext.lstrip("."),
@@ -89,7 +201,7 @@ class CollectTextureSet(pyblish.api.InstancePlugin):
         product_type = "image"
         image_instance = context.create_instance(image_product_name)
         image_instance[:] = instance[:]
-        image_instance.data.update(copy.deepcopy(dict(instance.data)))
+        image_instance.data.update(copy.deepcopy(instance_data))
         image_instance.data["name"] = image_product_name
         image_instance.data["label"] = image_product_name
         image_instance.data["productName"] = image_product_name
@@ -100,17 +212,30 @@ class CollectTextureSet(pyblish.api.InstancePlugin):
             image_instance.data["families"].append("review")
 
         image_instance.data["representations"] = [representation]
+        # Smaller resolutions are downsampled from the exported texture
+        for resolution in instance.data["exportResolutions"][1:]:
+            image_instance.data["representations"].append({
+                "name": f"{ext.lstrip('.')}_{resolution}",
+                "ext": ext.lstrip("."),
+                "files": f"{image_product_name}_{resolution}.{ext}",
+                "outputName": str(resolution),
+                "stagingDir": staging_dir,
+            })
 
         # Group the textures together in the loader
         image_instance.data["productGroup"] = image_product_group_name
 
         # Store the texture set name and stack name on the instance
         image_instance.data["textureSetName"] = texture_set_name
+        image_instance.data["textureSetGraph"] = graph_name
 
         # The current api does not support to get colorspace data
         # from the output so the colorspace setting is hardcoded for
         # the colorspace data accordingly to the default output setting
-        if map_identifier in ["diffuse", "basecolor"]:
+        if packed_channels:
+            image_instance.data["packedChannels"] = packed_channels
+            colorspace = get_colorspace_data(raw_colorspace=True)
+        elif map_identifier in ["diffuse", "basecolor"]:
             colorspace = get_colorspace_data()
         else:
             colorspace = get_colorspace_data(raw_colorspace=True)
@@ -134,6 +259,7 @@ class CollectTextureSetStagingDir(pyblish.api.InstancePlugin):
     # Run after CollectManagedStagingDir
     order = pyblish.api.CollectorOrder + 0.4991
 
+    @profile_plugin
     def process(self, instance):
 
         staging_dir = instance.data["stagingDir"]
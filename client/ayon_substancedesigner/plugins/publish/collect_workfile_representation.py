@@ -1,6 +1,8 @@
 import os
 import pyblish.api
 
+from ayon_substancedesigner.api.profiling import profile_plugin
+
 
 class CollectWorkfileRepresentation(pyblish.api.InstancePlugin):
     """Create a publish representation for the current workfile instance."""
@@ -10,6 +12,7 @@ class CollectWorkfileRepresentation(pyblish.api.InstancePlugin):
     hosts = ["substancedesigner"]
     families = ["workfile"]
 
+    @profile_plugin
     def process(self, instance):
 
         context = instance.context
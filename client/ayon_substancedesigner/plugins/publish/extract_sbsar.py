@@ -2,37 +2,56 @@ import os
 import sd
 
 from ayon_core.pipeline import publish
+from sd.api.sdapplication import SDApplicationPath
 from sd.api.sbs.sdsbsarexporter import SDSBSARExporter
 from ayon_substancedesigner.api.lib import get_sd_graph_by_name
+from ayon_substancedesigner.sbsar_cooking import (
+    DEFAULT_COOKER_COMMAND,
+    SbsarCookJob,
+    get_cooker_args
+)
+from ayon_substancedesigner.api.profiling import profile_plugin
 
 
 class ExtractSbsar(publish.Extractor):
     """Extract SBSAR
 
+    With `cook_in_process` the saved workfile is cooked by the cooker
+    command in a separate process, so the session is not blocked by the
+    export. The cooking is awaited by `WaitSbsarCooking` before
+    integration.
     """
 
     label = "Extract SBSAR"
     hosts = ["substancedesigner"]
     families = ["sbsar"]
+    settings_category = "substancedesigner"
 
     order = publish.Extractor.order
 
-    def process(self, instance):
-        ctx = sd.getContext()
-        exporterInstance = SDSBSARExporter(ctx, None)
-        exporter = exporterInstance.sNew()
-
-        graph_name = instance.data["graph_name"]
-        sd_graph = get_sd_graph_by_name(graph_name)
+    cook_in_process = False
+    cooker_command = DEFAULT_COOKER_COMMAND
 
+    @profile_plugin
+    def process(self, instance):
         current_file = instance.context.data["currentFile"]
         filename = os.path.basename(current_file)
         filename = filename.replace("sbs", "sbsar")
         staging_dir = self.staging_dir(instance)
         filepath = os.path.normpath(
             os.path.join(staging_dir, filename))
-        # export the graph with filepath
-        exporter.exportPackageToSBSAR(sd_graph.getPackage(), filepath)
+
+        if self.cook_in_process:
+            self.start_cooking(instance, current_file, filepath)
+        else:
+            ctx = sd.getContext()
+            exporterInstance = SDSBSARExporter(ctx, None)
+            exporter = exporterInstance.sNew()
+
+            graph_name = instance.data["graph_name"]
+            sd_graph = get_sd_graph_by_name(graph_name)
+            # export the graph with filepath
+            exporter.exportPackageToSBSAR(sd_graph.getPackage(), filepath)
 
         if "representations" not in instance.data:
             instance.data["representations"] = []
@@ -44,3 +63,30 @@ class ExtractSbsar(publish.Extractor):
         }
 
         instance.data["representations"].append(representation)
+
+    def start_cooking(self, instance, workfile_path, filepath):
+        """Start cooking of the saved workfile in a separate process.
+
+        Args:
+            instance (pyblish.api.Instance): sbsar instance
+            workfile_path (str): saved workfile, see `SaveCurrentWorkfile`
+            filepath (str): output filepath of the `.sbsar`
+        """
+        sd_app = sd.getContext().getSDApplication()
+        resources_dir = sd_app.getPath(SDApplicationPath.DefaultResourcesDir)
+        output_dir, output_filename = os.path.split(filepath)
+        output_name = os.path.splitext(output_filename)[0]
+        args = get_cooker_args(
+            self.cooker_command,
+            input=workfile_path,
+            output_dir=output_dir,
+            output_name=output_name,
+            resources_dir=os.path.join(resources_dir, "packages")
+        )
+        cook_job = SbsarCookJob(
+            args, filepath,
+            os.path.join(output_dir, f"{output_name}_cooker.log")
+        )
+        cook_job.start()
+        self.log.info(f"Cooking {filepath} in a separate process.")
+        instance.data["sbsarCookJob"] = cook_job
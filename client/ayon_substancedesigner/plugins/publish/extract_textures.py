@@ -1,7 +1,43 @@
+import os
+import sd
+import time
+
+from sd.api.sdapplication import SDApplicationPath
 from ayon_core.pipeline import KnownPublishError, publish
 from ayon_substancedesigner.api.lib import (
+    qt_ui_manager,
     get_sd_graph_by_name,
-    export_outputs_by_sd_graph
+    get_graph_fingerprint,
+    get_output_filepath,
+    build_export_plan,
+    format_export_plan,
+    run_export_plan
+)
+from ayon_substancedesigner.api.concurrency import WorkerPool
+from ayon_substancedesigner.api.export import (
+    ChannelPacker,
+    SlicedExportRunner,
+    TextureExportPipeline
+)
+from ayon_substancedesigner.api.export_cache import (
+    ExportCache,
+    get_export_cache_dir
+)
+from ayon_substancedesigner.sbsar_cooking import (
+    DEFAULT_COOKER_COMMAND,
+    SbsarCookJob,
+    get_cooker_args
+)
+from ayon_substancedesigner.graph_rendering import (
+    DEFAULT_RENDERER_COMMAND,
+    OUTPUT_NAME_PATTERN,
+    GraphRenderJob,
+    get_renderer_args,
+    render_graphs
+)
+from ayon_substancedesigner.api.profiling import (
+    get_profiler,
+    profile_plugin
 )
 
 
@@ -17,44 +53,464 @@ class ExtractTextures(publish.Extractor,
 
     # Run before thumbnail extractors
     order = publish.Extractor.order - 0.1
+    settings_category = "substancedesigner"
+
+    # Cached textures are reused by the graph content only, changes of
+    # library packages or color management are not detected
+    export_cache = False
+    # Size limit of the export cache in MB
+    export_cache_size_limit = 2048
+
+    # Compute and save in slices from the Qt event loop with a progress
+    # dialog so Designer stays responsive
+    background_extraction = False
+
+    render_in_processes = False
+    renderer_command = DEFAULT_RENDERER_COMMAND
+    # Number of render processes running at once, number of CPUs with 0
+    max_render_processes = 0
+    # Timeout of a graph render in seconds, no timeout with 0
+    render_timeout = 0
 
+    @profile_plugin
     def process(self, instance):
+        profiler = get_profiler(instance.context)
         staging_dir = self.staging_dir(instance)
         extension = instance.data["creator_attributes"].get("exportFileFormat")
+        # Graphs are computed at the highest resolution, the smaller ones
+        # are downsampled from it
+        resolutions = instance.data.get("exportResolutions", [])
+        output_size = resolutions[0] if resolutions else None
 
-        for graph_name in instance.data["exportedGraphs"]:
-            selected_map_identifiers = instance.data[graph_name].get(
-                "map_identifiers", {})
-            target_sd_graph = get_sd_graph_by_name(graph_name)
-            result = export_outputs_by_sd_graph(
-                instance.name, target_sd_graph,
-                staging_dir, extension,
-                selected_map_identifiers
+        export_cache = None
+        if resolutions:
+            self.log.debug(
+                "Exporting resolutions {} in the session without the export"
+                " cache.".format(", ".join(map(str, resolutions)))
             )
-            if not result:
-                raise KnownPublishError(
-                    "Failed to export texture output in graph: {}".format(
-                        graph_name)
+        elif self.export_cache:
+            export_cache = ExportCache(
+                get_export_cache_dir(),
+                self.export_cache_size_limit * 1024 * 1024
+            )
+        # Exported filepaths to store in the export cache by cache key
+        filepaths_to_cache = {}
+        # Graphs and their map identifiers rendered in separate processes
+        graphs_to_render = []
+        channel_packer = self._get_channel_packer(
+            instance, staging_dir, extension)
+
+        # Graphs are computed one after another while the outputs
+        # of the previous graphs are still being written by the workers
+        export_workers = self._get_export_workers(instance)
+        with TextureExportPipeline(
+            export_workers, channel_packer=channel_packer
+        ) as export_pipeline:
+            sliced_runner = None
+            if self.background_extraction:
+                sliced_runner = SlicedExportRunner(
+                    export_pipeline, parent=qt_ui_manager().getMainWindow())
+            for graph_name in instance.data["exportedGraphs"]:
+                selected_map_identifiers = instance.data[graph_name].get(
+                    "map_identifiers", {})
+                target_sd_graph = get_sd_graph_by_name(graph_name)
+                if export_cache is not None and target_sd_graph is not None:
+                    cache_keys = self._fetch_cached_outputs(
+                        export_cache, instance, target_sd_graph,
+                        staging_dir, extension, selected_map_identifiers
+                    )
+                    for map_identifier, cache_key in cache_keys.items():
+                        filepath = get_output_filepath(
+                            staging_dir, instance.name, graph_name,
+                            map_identifier, extension
+                        )
+                        filepaths_to_cache[cache_key] = filepath
+                    selected_map_identifiers = set(cache_keys)
+                    if not selected_map_identifiers:
+                        self.log.debug(
+                            f"Skipping compute of graph '{graph_name}', all "
+                            "outputs were found in the export cache."
+                        )
+                        continue
+
+                if not resolutions and self._can_render_in_process(
+                    target_sd_graph
+                ):
+                    graphs_to_render.append(
+                        (target_sd_graph, selected_map_identifiers))
+                    self._keep_graph_state(instance, target_sd_graph)
+                    continue
+
+                export_plan = build_export_plan(
+                    instance.name, target_sd_graph,
+                    staging_dir, extension,
+                    selected_map_identifiers,
+                    resolutions=resolutions
+                )
+                if export_plan is None:
+                    raise KnownPublishError(
+                        "Failed to export texture output in graph: {}".format(
+                            graph_name)
+                    )
+                self.log.debug(
+                    f"Export plan of graph '{graph_name}':\n"
+                    f"{format_export_plan(export_plan)}"
+                )
+                self._keep_graph_state(instance, target_sd_graph)
+                if sliced_runner is not None:
+                    sliced_runner.add_graph(
+                        target_sd_graph, export_plan, output_size=output_size)
+                    continue
+
+                graph_start = time.perf_counter()
+                run_export_plan(
+                    target_sd_graph, export_plan,
+                    export_pipeline=export_pipeline,
+                    output_size=output_size
+                )
+                profiler.record_graph(
+                    instance.name, graph_name,
+                    time.perf_counter() - graph_start
                 )
 
-            self.log.debug(f"Extracting to {staging_dir}")
+                self.log.debug(f"Extracting to {staging_dir}")
+
+            if sliced_runner is not None:
+                self._run_sliced_export(instance, sliced_runner)
+
+        profiler.record_maps(instance.name, export_pipeline.timings)
+        for timing in export_pipeline.timings:
+            self.log.debug(
+                "Exported {} ({}): fetch {:.3f}s, write {:.3f}s".format(
+                    os.path.basename(timing["filepath"]), timing["mode"],
+                    timing["fetch"], timing["write"]
+                )
+            )
+        if export_pipeline.errors:
+            failed = "\n".join(
+                f"{filepath}: {error}"
+                for filepath, error in export_pipeline.errors
+            )
+            raise KnownPublishError(f"Failed to save textures:\n{failed}")
+        if export_pipeline.skipped_variants:
+            self._remove_skipped_variants(
+                instance, export_pipeline.skipped_variants)
+
+        if graphs_to_render:
+            self._render_in_processes(
+                instance, graphs_to_render, staging_dir, extension)
+
+        # Pack the textures whose sources were not all exported from memory
+        channel_packer.pack_from_files()
+        profiler.record_maps(instance.name, channel_packer.timings)
+        if channel_packer.errors:
+            failed = "\n".join(
+                f"{filepath}: {error}"
+                for filepath, error in channel_packer.errors
+            )
+            raise KnownPublishError(
+                f"Failed to pack texture channels:\n{failed}")
+
+        if export_cache is not None:
+            for cache_key, filepath in filepaths_to_cache.items():
+                if os.path.exists(filepath):
+                    export_cache.store(cache_key, extension, filepath)
+            evicted_size = export_cache.evict()
+            if evicted_size:
+                self.log.debug(
+                    f"Evicted {evicted_size} bytes from the export cache.")
+
         # We'll insert the color space data for each image instance that we
         # added into this texture set. The collector couldn't do so because
         # some anatomy and other instance data needs to be collected prior
         context = instance.context
         for image_instance in instance:
-            representation = next(iter(image_instance.data["representations"]))
-
             colorspace = image_instance.data.get("colorspace")
             if not colorspace:
                 self.log.debug("No color space data present for instance: "
                                f"{image_instance}")
                 continue
 
-            self.set_representation_colorspace(representation,
-                                               context=context,
-                                               colorspace=colorspace)
+            # Resolution variants share the color space
+            for representation in image_instance.data["representations"]:
+                self.set_representation_colorspace(representation,
+                                                   context=context,
+                                                   colorspace=colorspace)
         # The TextureSet instance should not be integrated. It generates no
         # output data. Instead the separated texture instances are generated
         # from it which themselves integrate into the database.
         instance.data["integrate"] = False
+
+    def _get_channel_packer(self, instance, staging_dir, extension):
+        """Queue the packed textures collected as image instances.
+
+        Returns:
+            ChannelPacker: packer of the textures
+        """
+        channel_packer = ChannelPacker()
+        for image_instance in instance:
+            packed_channels = image_instance.data.get("packedChannels")
+            if not packed_channels:
+                continue
+            graph_name = image_instance.data["textureSetGraph"]
+            source_filepaths = {
+                channel: get_output_filepath(
+                    staging_dir, instance.name, graph_name,
+                    map_identifier, extension
+                )
+                for channel, map_identifier in packed_channels.items()
+            }
+            representations = image_instance.data["representations"]
+            channel_packer.add_texture(
+                os.path.join(staging_dir, representations[0]["files"]),
+                source_filepaths,
+                variant_filepaths={
+                    int(representation["outputName"]): os.path.join(
+                        staging_dir, representation["files"])
+                    for representation in representations[1:]
+                }
+            )
+        return channel_packer
+
+    def _remove_skipped_variants(self, instance, skipped_filepaths):
+        """Remove representations of resolution variants not written.
+
+        Args:
+            instance (pyblish.api.Instance): texture set instance
+            skipped_filepaths (list): filepaths of the skipped variants
+        """
+        skipped_filepaths = {
+            os.path.normpath(filepath) for filepath in skipped_filepaths
+        }
+        for image_instance in instance:
+            representations = image_instance.data["representations"]
+            kept = [
+                representation for representation in representations
+                if os.path.normpath(os.path.join(
+                    representation["stagingDir"], representation["files"]
+                )) not in skipped_filepaths
+            ]
+            if len(kept) == len(representations):
+                continue
+            image_instance.data["representations"] = kept
+            self.log.warning(
+                f"Skipped smaller resolutions of '{image_instance.name}',"
+                " they can be made only from 8-bit textures."
+            )
+
+    def _run_sliced_export(self, instance, sliced_runner):
+        """Run the queued graph exports in slices from the event loop.
+
+        Raises:
+            KnownPublishError: The export was canceled by the user.
+        """
+        profiler = get_profiler(instance.context)
+        finished = sliced_runner.run()
+        for graph_name, duration in sliced_runner.graph_timings.items():
+            profiler.record_graph(instance.name, graph_name, duration)
+        progress = sliced_runner.progress
+        if not finished:
+            raise KnownPublishError(
+                "Texture extraction was canceled after"
+                f" {progress.maps_done}/{progress.maps_total} maps."
+            )
+        self.log.debug(
+            f"Exported {progress.graphs_done} graphs in slices in"
+            f" {time.perf_counter() - progress.start_time:.2f}s."
+        )
+
+    def _can_render_in_process(self, target_sd_graph):
+        """Whether the graph can be rendered from its saved package."""
+        if not self.render_in_processes or target_sd_graph is None:
+            return False
+        package = target_sd_graph.getPackage()
+        if not package.getFilePath() or package.isModified():
+            self.log.debug(
+                f"Package of graph '{target_sd_graph.getIdentifier()}' has"
+                " unsaved changes, exporting it in the session."
+            )
+            return False
+        return True
+
+    def _render_in_processes(self, instance, graphs_to_render,
+                             staging_dir, extension):
+        """Render graphs from cooked packages in separate processes.
+
+        Each package is cooked once, then every graph is rendered by its
+        own renderer process. Cooker and renderer processes running at
+        once are limited by `max_render_processes`, number of CPUs by
+        default. Graphs of which cooking or rendering failed don't stop
+        the other graphs, they are reported together at the end.
+
+        Args:
+            instance (pyblish.api.Instance): texture set instance
+            graphs_to_render (list): pairs of SD graph and its selected
+                map identifiers
+            staging_dir (str): staging directory
+            extension (str): file format of the textures
+        """
+        start = time.perf_counter()
+        work_dir = os.path.join(staging_dir, "render")
+        os.makedirs(work_dir, exist_ok=True)
+
+        graphs_by_package_path = {}
+        for target_sd_graph, map_identifiers in graphs_to_render:
+            package_path = target_sd_graph.getPackage().getFilePath()
+            graphs_by_package_path.setdefault(package_path, []).append(
+                (target_sd_graph, map_identifiers))
+
+        # Cooks and renders share the limit of processes running at once
+        max_processes = min(
+            self.max_render_processes or os.cpu_count() or 1,
+            max(len(graphs_by_package_path), len(graphs_to_render))
+        ) or 1
+        with WorkerPool(max_processes, name="render") as worker_pool:
+            # Cook the packages in parallel
+            cook_futures = {}
+            for index, package_path in enumerate(graphs_by_package_path):
+                output_name = f"{index}_{os.path.basename(package_path)}"
+                output_name = os.path.splitext(output_name)[0]
+                args = get_cooker_args(
+                    self._get_cooker_command(instance),
+                    input=package_path,
+                    output_dir=work_dir,
+                    output_name=output_name,
+                    resources_dir=self._get_packages_dir()
+                )
+                cook_job = SbsarCookJob(
+                    args,
+                    os.path.join(work_dir, f"{output_name}.sbsar"),
+                    os.path.join(work_dir, f"{output_name}_cooker.log")
+                )
+                cook_futures[package_path] = (
+                    worker_pool.submit(
+                        cook_job.run, self.render_timeout or None),
+                    cook_job
+                )
+
+            errors = []
+            render_jobs = []
+            for package_path, graphs in graphs_by_package_path.items():
+                cook_future, cook_job = cook_futures[package_path]
+                try:
+                    cook_future.result()
+                except RuntimeError as exc:
+                    errors.extend(
+                        f"{target_sd_graph.getIdentifier()}: {exc}"
+                        for target_sd_graph, _ in graphs
+                    )
+                    continue
+
+                for target_sd_graph, map_identifiers in graphs:
+                    render_jobs.append(self._get_render_job(
+                        instance, target_sd_graph, map_identifiers,
+                        cook_job.output_filepath, staging_dir, work_dir,
+                        extension
+                    ))
+
+            failed_jobs = render_graphs(
+                render_jobs,
+                timeout=self.render_timeout or None,
+                worker_pool=worker_pool
+            )
+        errors.extend(f"{job.graph_name}: {job.error}" for job in failed_jobs)
+        self.log.debug(
+            f"Rendered {len(render_jobs) - len(failed_jobs)} graphs in"
+            f" separate processes in {time.perf_counter() - start:.2f}s."
+        )
+        if errors:
+            failed = "\n".join(errors)
+            raise KnownPublishError(f"Failed to render graphs:\n{failed}")
+
+    def _get_render_job(self, instance, target_sd_graph, map_identifiers,
+                        sbsar_filepath, staging_dir, work_dir, extension):
+        """Get the job rendering the graph from the cooked `.sbsar`.
+
+        Returns:
+            GraphRenderJob: render job of the graph
+        """
+        graph_name = target_sd_graph.getIdentifier()
+        graph_url = target_sd_graph.getUrl().split("?")[0]
+        args = get_renderer_args(
+            self.renderer_command,
+            input=sbsar_filepath,
+            graph_url=graph_url,
+            graph_outputs=sorted(map_identifiers),
+            output_dir=staging_dir,
+            output_name=f"{instance.name}_{graph_name}_{OUTPUT_NAME_PATTERN}",
+            extension=extension
+        )
+        filepaths = [
+            get_output_filepath(
+                staging_dir, instance.name, graph_name,
+                map_identifier, extension
+            )
+            for map_identifier in map_identifiers
+        ]
+        return GraphRenderJob(
+            graph_name, args, filepaths,
+            os.path.join(work_dir, f"{graph_name}_render.log")
+        )
+
+    def _get_cooker_command(self, instance):
+        project_settings = instance.context.data["project_settings"]
+        publish_settings = project_settings["substancedesigner"].get(
+            "publish", {})
+        return publish_settings.get("ExtractSbsar", {}).get(
+            "cooker_command", DEFAULT_COOKER_COMMAND)
+
+    def _get_packages_dir(self):
+        sd_app = sd.getContext().getSDApplication()
+        resources_dir = sd_app.getPath(SDApplicationPath.DefaultResourcesDir)
+        return os.path.join(resources_dir, "packages")
+
+    def _fetch_cached_outputs(self, export_cache, instance,
+                              target_sd_graph, staging_dir, extension,
+                              map_identifiers):
+        """Put cached graph outputs to the staging dir.
+
+        Returns:
+            dict: cache keys of the outputs not found in the cache
+                by map identifier
+        """
+        instance_name = instance.name
+        graph_name = target_sd_graph.getIdentifier()
+        graph_fingerprint = self._get_graph_fingerprint(
+            instance, target_sd_graph)
+        missing_cache_keys = {}
+        for map_identifier in map_identifiers:
+            cache_key = export_cache.get_key(
+                graph_fingerprint, map_identifier, extension)
+            filepath = get_output_filepath(
+                staging_dir, instance_name, graph_name,
+                map_identifier, extension
+            )
+            if export_cache.fetch(cache_key, extension, filepath):
+                self.log.debug(f"Using cached texture: {filepath}")
+            else:
+                missing_cache_keys[map_identifier] = cache_key
+        return missing_cache_keys
+
+    def _keep_graph_state(self, instance, target_sd_graph):
+        """Keep the graph state of this export for the "only changed
+        graphs" mode.
+
+        Hashing walks all nodes of the graph, so it's skipped unless the
+        mode is enabled on the instance.
+        """
+        creator_attrs = instance.data["creator_attributes"]
+        if creator_attrs.get("onlyChangedGraphs"):
+            self._get_graph_fingerprint(instance, target_sd_graph)
+
+    def _get_graph_fingerprint(self, instance, target_sd_graph):
+        # Reuse the fingerprints computed by the collector
+        fingerprints = instance.data.setdefault("graphFingerprints", {})
+        graph_name = target_sd_graph.getIdentifier()
+        if graph_name not in fingerprints:
+            fingerprints[graph_name] = get_graph_fingerprint(target_sd_graph)
+        return fingerprints[graph_name]
+
+    def _get_export_workers(self, instance):
+        project_settings = instance.context.data["project_settings"]
+        create_settings = project_settings["substancedesigner"]["create"]
+        return create_settings["CreateTextures"].get("exportWorkers", 0)
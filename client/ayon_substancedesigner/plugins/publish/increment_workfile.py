@@ -4,6 +4,7 @@ import pyblish.api
 
 from ayon_core.lib import version_up
 from ayon_core.pipeline import registered_host
+from ayon_substancedesigner.api.profiling import profile_plugin
 
 
 class IncrementWorkfileVersion(pyblish.api.ContextPlugin):
@@ -14,6 +15,7 @@ class IncrementWorkfileVersion(pyblish.api.ContextPlugin):
     optional = True
     hosts = ["substancedesigner"]
 
+    @profile_plugin
     def process(self, context):
 
         assert all(result["success"] for result in context.data["results"]), (
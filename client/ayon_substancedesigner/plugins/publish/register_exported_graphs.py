@@ -0,0 +1,38 @@
+import pyblish.api
+
+from ayon_core.pipeline import registered_host
+
+from ayon_substancedesigner.api.lib import get_sd_graph_by_name, get_graph_key
+from ayon_substancedesigner.api.profiling import profile_plugin
+
+
+class RegisterExportedGraphs(pyblish.api.InstancePlugin):
+    """Remember the state of the graphs exported by this publish.
+
+    Used by the "Only Changed Graphs" option of the texture set to skip
+    graphs which did not change since they were published.
+    """
+
+    label = "Register Exported Graphs"
+    hosts = ["substancedesigner"]
+    families = ["textureSet"]
+    # Run after the exported textures got integrated
+    order = pyblish.api.IntegratorOrder + 0.1
+
+    @profile_plugin
+    def process(self, instance):
+        fingerprints = instance.data.get("graphFingerprints", {})
+        fingerprints_by_key = {}
+        for graph_name in instance.data.get("exportedGraphs", []):
+            if graph_name not in fingerprints:
+                continue
+            sd_graph = get_sd_graph_by_name(graph_name)
+            if sd_graph is None:
+                continue
+            fingerprints_by_key[get_graph_key(sd_graph)] = (
+                fingerprints[graph_name])
+
+        host = registered_host()
+        host.register_exported_graphs(fingerprints_by_key)
+        self.log.debug(
+            f"Registered exported graphs: {sorted(fingerprints_by_key)}")
@@ -0,0 +1,33 @@
+import pyblish.api
+
+from ayon_substancedesigner.api.profiling import (
+    PROFILER_KEY,
+    get_report_dir
+)
+
+
+class ReportPublishProfile(pyblish.api.ContextPlugin):
+    """Log summary of the timings of the publish and write their report.
+
+    The JSON report is written next to the staging directories of the
+    instances when enabled in settings, so slow graphs and plugins can be
+    found afterwards.
+    """
+
+    label = "Report Publish Profile"
+    order = pyblish.api.IntegratorOrder + 2
+    hosts = ["substancedesigner"]
+    settings_category = "substancedesigner"
+
+    write_report = False
+
+    def process(self, context):
+        profiler = context.data.get(PROFILER_KEY)
+        if profiler is None:
+            return
+
+        profiler.finish()
+        self.log.info(profiler.get_summary())
+        if self.write_report:
+            report_path = profiler.write_report(get_report_dir(context))
+            self.log.info(f"Publish profile written to: {report_path}")
@@ -4,6 +4,7 @@ from ayon_core.pipeline import (
     registered_host,
     KnownPublishError
 )
+from ayon_substancedesigner.api.profiling import profile_plugin
 
 
 class SaveCurrentWorkfile(pyblish.api.ContextPlugin):
@@ -13,6 +14,7 @@ class SaveCurrentWorkfile(pyblish.api.ContextPlugin):
     order = pyblish.api.ExtractorOrder - 0.49
     hosts = ["substancedesigner"]
 
+    @profile_plugin
     def process(self, context):
 
         host = registered_host()
@@ -0,0 +1,50 @@
+import pyblish.api
+
+from ayon_core.pipeline import PublishValidationError
+
+from ayon_substancedesigner.api.export import QT_IMAGE_FORMATS
+from ayon_substancedesigner.api.profiling import profile_plugin
+
+
+class ValidateChannelPacking(pyblish.api.InstancePlugin):
+    """Validate the file type of a texture set packing channels.
+
+    Packed textures are made from the exported graph outputs outside of
+    Substance Designer, which can read only some file types.
+    """
+
+    label = "Validate Channel Packing"
+    hosts = ["substancedesigner"]
+    families = ["textureSet"]
+    order = pyblish.api.ValidatorOrder
+
+    @profile_plugin
+    def process(self, instance):
+        packed_names = [
+            image_instance.data["productName"]
+            for image_instance in instance
+            if image_instance.data.get("packedChannels")
+        ]
+        if not packed_names:
+            return
+
+        creator_attrs = instance.data["creator_attributes"]
+        ext = creator_attrs.get("exportFileFormat", "").lstrip(".").lower()
+        if ext in QT_IMAGE_FORMATS:
+            return
+
+        supported = ", ".join(sorted(QT_IMAGE_FORMATS))
+        raise PublishValidationError(
+            f"Channel Packing can't be used with the '{ext}' file type."
+            f" Use one of {supported} or disable the packing of:"
+            f" {', '.join(packed_names)}",
+            title="Unsupported file type for Channel Packing",
+            description=(
+                "## Unsupported file type for Channel Packing\n"
+                "Channels are packed from the exported textures only for"
+                f" {supported} file types.\n\n"
+                "### How to fix?\n"
+                "Change the file type of the texture set or clear its"
+                " Channel Packing."
+            )
+        )
@@ -0,0 +1,45 @@
+import pyblish.api
+
+from ayon_core.pipeline import PublishValidationError
+
+from ayon_substancedesigner.api.export import QT_IMAGE_FORMATS
+from ayon_substancedesigner.api.profiling import profile_plugin
+
+
+class ValidateExportResolutions(pyblish.api.InstancePlugin):
+    """Validate the file type of a texture set exporting resolutions.
+
+    Smaller resolutions are downsampled from the exported textures and
+    encoded outside of Substance Designer, which can write only some file
+    types.
+    """
+
+    label = "Validate Export Resolutions"
+    hosts = ["substancedesigner"]
+    families = ["textureSet"]
+    order = pyblish.api.ValidatorOrder
+
+    @profile_plugin
+    def process(self, instance):
+        creator_attrs = instance.data["creator_attributes"]
+        if len(instance.data.get("exportResolutions", [])) < 2:
+            return
+
+        ext = creator_attrs.get("exportFileFormat", "").lstrip(".").lower()
+        if ext in QT_IMAGE_FORMATS:
+            return
+
+        supported = ", ".join(sorted(QT_IMAGE_FORMATS))
+        raise PublishValidationError(
+            f"Export Resolutions can't be used with the '{ext}' file type."
+            f" Use one of {supported} or export a single resolution.",
+            title="Unsupported file type for Export Resolutions",
+            description=(
+                "## Unsupported file type for Export Resolutions\n"
+                "Smaller resolutions are made from the exported textures"
+                f" only for {supported} file types.\n\n"
+                "### How to fix?\n"
+                "Change the file type of the texture set or clear all but"
+                " one of its Export Resolutions."
+            )
+        )
@@ -0,0 +1,39 @@
+import time
+
+import pyblish.api
+
+from ayon_core.pipeline import KnownPublishError
+from ayon_substancedesigner.api.profiling import profile_plugin
+
+
+class WaitSbsarCooking(pyblish.api.InstancePlugin):
+    """Wait for the SBSAR cooked in a separate process by `ExtractSbsar`.
+
+    The plugin runs right before integration so the cooking runs in
+    parallel with the rest of the extraction.
+    """
+
+    label = "Wait for SBSAR Cooking"
+    order = pyblish.api.IntegratorOrder - 0.1
+    hosts = ["substancedesigner"]
+    families = ["sbsar"]
+    settings_category = "substancedesigner"
+
+    timeout = 3600
+
+    @profile_plugin
+    def process(self, instance):
+        cook_job = instance.data.get("sbsarCookJob")
+        if cook_job is None:
+            return
+
+        start = time.perf_counter()
+        try:
+            cook_job.wait(self.timeout or None)
+        except RuntimeError as exc:
+            raise KnownPublishError(
+                f"Failed to cook {cook_job.output_filepath}: {exc}")
+        self.log.info(
+            f"Waited {time.perf_counter() - start:.2f}s for cooking"
+            f" of {cook_job.output_filepath}."
+        )
@@ -0,0 +1,1030 @@
+# -*- coding: utf-8 -*-
+"""Substance project templates which don't need a running Designer.
+
+Reading graphs from the templates, merging them into a package and the
+local cache of the merged packages only work with the `.sbs` XML files so
+the cache can also be prepared on machines without Substance Designer.
+"""
+import os
+import re
+import copy
+import json
+import uuid
+import hashlib
+import logging
+import tempfile
+import xml.etree.ElementTree as etree
+
+import ayon_api
+
+from ayon_core.pipeline import Anatomy
+from ayon_core.pipeline.template_data import get_template_data
+from ayon_core.lib import StringTemplate, filter_profiles
+
+
+log = logging.getLogger("ayon_substancedesigner")
+
+
+# Graphs and dependencies read from templates by (filepath, mtime)
+_template_cache = {}
+
+
+def _iterparse_template(template_filepath, graph_identifiers):
+    """Read graphs and dependencies from Substance template file.
+
+    The file is read in a single streaming pass. Elements which are not
+    needed (other graphs, resources with embedded bitmaps etc.) are
+    cleared as soon as they are read so the whole document is never held
+    in memory.
+
+    Args:
+        template_filepath (str): Substance template filepath
+        graph_identifiers (set): identifiers of the graphs to read
+
+    Returns:
+        dict, list: graphs by identifier and dependencies
+    """
+    graphs_by_identifier = {}
+    dependencies = None
+    # Depth of the elements whose children must be kept
+    graph_depth = 0
+    dependencies_depth = 0
+    for event, element in etree.iterparse(
+            template_filepath, events=("start", "end")):
+        tag = element.tag
+        if event == "start":
+            if tag == "graph":
+                graph_depth += 1
+            elif tag == "dependencies":
+                dependencies_depth += 1
+            continue
+
+        if tag == "graph":
+            graph_depth -= 1
+            identifier = element.find("identifier")
+            graph_identifier = None
+            if identifier is not None:
+                graph_identifier = identifier.attrib.get("v")
+            if (
+                graph_identifier in graph_identifiers
+                and graph_identifier not in graphs_by_identifier
+            ):
+                graphs_by_identifier[graph_identifier] = element
+            else:
+                element.clear()
+
+        elif tag == "dependencies":
+            dependencies_depth -= 1
+            if dependencies is None and not graph_depth:
+                dependencies = list(element)
+
+        elif not graph_depth and not dependencies_depth:
+            # Kept elements are referenced directly so it is safe to clear
+            # their parents too
+            element.clear()
+
+    return graphs_by_identifier, dependencies or []
+
+
+def read_template(template_filepath, graph_identifiers=None):
+    """Read graphs and dependencies from Substance template file.
+
+    Results are cached by filepath and modification time, the file is
+    read again only when it changed or when graphs which were not read
+    yet are requested.
+
+    Args:
+        template_filepath (str): Substance template filepath
+        graph_identifiers (Iterable[str], optional): identifiers of the
+            graphs to read
+
+    Returns:
+        dict, list: graphs by identifier and dependencies. The elements
+            are shared with the cache and must not be modified.
+    """
+    graph_identifiers = set(graph_identifiers or [])
+    template_filepath = os.path.normpath(template_filepath)
+    mtime = os.path.getmtime(template_filepath)
+    cached = _template_cache.get(template_filepath)
+    if cached is None or cached["mtime"] != mtime or not (
+        graph_identifiers.issubset(cached["graph_identifiers"])
+    ):
+        if cached is not None and cached["mtime"] == mtime:
+            graph_identifiers |= cached["graph_identifiers"]
+        graphs_by_identifier, dependencies = _iterparse_template(
+            template_filepath, graph_identifiers)
+        cached = {
+            "mtime": mtime,
+            "graph_identifiers": graph_identifiers,
+            "graphs": graphs_by_identifier,
+            "dependencies": dependencies
+        }
+        _template_cache[template_filepath] = cached
+
+    return cached["graphs"], cached["dependencies"]
+
+
+def parse_graph_from_template(graph_name, project_template, template_filepath):
+    """Parse graph by project template name from Substance template file
+    Args:
+        graph_name (str): graph_name
+        project_template (str): project template name
+        template_filepath (str): Substance template filepath
+
+    Returns:
+        List[xml.etree.ElementTree.Element]: graph(s) from the select template
+
+    """
+    graphs_by_identifier, _ = read_template(
+        template_filepath, [project_template])
+
+    # Find the <graph> element with the specified identifier
+    graph_element = graphs_by_identifier.get(project_template)
+    if graph_element is not None:
+        # Copy the cached graph so it can be renamed
+        graph_element = copy.deepcopy(graph_element)
+        identifier_element = graph_element.find('identifier')
+        identifier_element.attrib['v'] = graph_name
+    else:
+        log.warning(
+            f"Graph with identifier '{project_template}' "
+            f"not found in {template_filepath}."
+        )
+
+    return graph_element
+
+
+def parse_dependencies_from_template(template_filepath):
+    """Parse dependencies from Substance template file
+
+    Args:
+        template_filepath (str): Substance template filepath
+
+    Returns:
+        List[xml.etree.ElementTree.Element]: dependencies from
+            the select template
+    """
+    _, dependencies = read_template(template_filepath)
+    return [copy.deepcopy(element) for element in dependencies]
+
+
+def add_graphs_to_package(
+        parsed_graph_names, parsed_dependencies, temp_package_filepath):
+    """Add graphs to the temp package
+
+    Args:
+        parsed_graph_names (list): parsed graph names
+        parsed_dependencies (list): parsed dependencies
+        temp_package_filepath (str): temp package filepath
+
+    """
+    # Parse the temp package file
+    unsaved_tree = etree.parse(temp_package_filepath)
+    unsaved_root = unsaved_tree.getroot()
+
+    # Find the <content> element in Unsaved_Package.xml
+    content_element = unsaved_root.find('content')
+
+    # Remove the existing <content/> element if it exists
+    if content_element is not None:
+        unsaved_root.remove(content_element)
+    # Create a new <content> element and append the copied <graph> element
+    new_content = etree.Element('content')
+    new_content.extend(parsed_graph_names)  # Append the copied <graph> element
+    unsaved_root.append(new_content)   # Add the new <content> to the root
+
+    if parsed_dependencies:
+        # Remove the existing <dependencies/> element if it exists
+        dependencies_element = unsaved_root.find('dependencies')
+        if dependencies_element is not None:
+            # Find the <dependencies> element in Unsaved_Package.xml
+            unsaved_root.remove(dependencies_element)
+
+        new_dependencies_content = etree.Element('dependencies')
+        # Append the copied <dependency> element
+        new_dependencies_content.extend(parsed_dependencies)
+        # Add the new <dependencies> to the root
+        unsaved_root.append(new_dependencies_content)
+
+    # Save the modified content for Substance file
+    unsaved_tree.write(
+        temp_package_filepath,
+        encoding='utf-8',
+        xml_declaration=True
+    )
+
+    log.info("All graphs are copied and pasted successfully!")
+
+
+# Empty Substance package the template graphs are merged into when the
+# one saved by Designer is not known yet
+EMPTY_PACKAGE_CONTENT = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    "<package>"
+    '<identifier v="Unsaved Package"/>'
+    '<formatVersion v="1.1.0.202302"/>'
+    '<updaterVersion v="1.1.0.202302"/>'
+    '<fileUID v="{{{file_uid}}}"/>'
+    '<versionUID v="0"/>'
+    "<dependencies/>"
+    "<content/>"
+    "</package>"
+)
+
+
+# Resources dir and empty package of the last Designer session
+DESIGNER_INFO_FILENAME = "designer.json"
+
+
+def get_template_cache_dir():
+    """Get directory of the prepared template packages.
+
+    The directory is in the local temp dir unless the
+    `AYON_SD_TEMPLATE_CACHE_DIR` environment variable points to another,
+    e.g. shared, directory.
+
+    Returns:
+        str: template cache directory
+    """
+    cache_dir = os.getenv("AYON_SD_TEMPLATE_CACHE_DIR")
+    if cache_dir:
+        return cache_dir
+    return os.path.join(
+        tempfile.gettempdir(), "ayon_substancedesigner", "template_cache"
+    )
+
+
+def _read_json(filepath, default=None):
+    try:
+        with open(filepath, "r") as stream:
+            return json.load(stream)
+    except (OSError, ValueError):
+        return default
+
+
+def _write_json(filepath, data):
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    tmp_filepath = f"{filepath}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_filepath, "w") as stream:
+        json.dump(data, stream)
+    os.replace(tmp_filepath, filepath)
+
+
+def make_empty_package_template(package_content):
+    """Make template of an empty package saved by Substance Designer.
+
+    Args:
+        package_content (str): content of the saved empty package
+
+    Returns:
+        str: package content with `file_uid` placeholder to be filled by
+            `str.format`, like `EMPTY_PACKAGE_CONTENT`
+    """
+    package_content = package_content.replace("{", "{{").replace("}", "}}")
+    return re.sub(
+        r'<fileUID v="[^"]*"/>',
+        '<fileUID v="{{{file_uid}}}"/>',
+        package_content
+    )
+
+
+def store_designer_info(resources_dir, empty_package_content,
+                        designer_version=None):
+    """Remember resources dir and empty package of Designer.
+
+    Used by `prewarm_template_cache` to prepare the same packages as
+    Designer sessions without a running Designer, and by the sessions to
+    reuse the empty package of the same Designer.
+
+    Args:
+        resources_dir (str): Substance Designer default resources dir
+        empty_package_content (str): template of the empty package, see
+            `make_empty_package_template`
+        designer_version (str, optional): version of Substance Designer
+    """
+    _write_json(
+        os.path.join(get_template_cache_dir(), DESIGNER_INFO_FILENAME),
+        {
+            "resources_dir": resources_dir,
+            "designer_version": designer_version,
+            "empty_package_content": empty_package_content,
+        }
+    )
+
+
+def get_designer_info():
+    """Get resources dir and empty package of the last Designer session.
+
+    Returns:
+        dict: `resources_dir`, `designer_version` and
+            `empty_package_content`, empty when no Designer session
+            prepared a package with the cache dir yet.
+    """
+    return _read_json(
+        os.path.join(get_template_cache_dir(), DESIGNER_INFO_FILENAME), {})
+
+
+def _get_file_hashes(filepaths):
+    """Get content hashes of files.
+
+    Hashes are stored in the template cache by filepath, modification time
+    and size so each file is hashed only once after it changed.
+
+    Args:
+        filepaths (Iterable[str]): filepaths
+
+    Returns:
+        dict: sha1 hex digest by filepath
+    """
+    index_filepath = os.path.join(get_template_cache_dir(), "file_hashes.json")
+    file_hashes = _read_json(index_filepath, {})
+    changed = False
+    output = {}
+    for filepath in filepaths:
+        stat = os.stat(filepath)
+        cached = file_hashes.get(filepath)
+        if (
+            cached is None
+            or cached["mtime"] != stat.st_mtime
+            or cached["size"] != stat.st_size
+        ):
+            hasher = hashlib.sha1()
+            with open(filepath, "rb") as stream:
+                for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+                    hasher.update(chunk)
+            cached = {
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "sha1": hasher.hexdigest()
+            }
+            file_hashes[filepath] = cached
+            changed = True
+        output[filepath] = cached["sha1"]
+
+    if changed:
+        _write_json(index_filepath, file_hashes)
+    return output
+
+
+def get_template_package_key(template_entries, output_res_by_graphs,
+                             empty_package_content=None):
+    """Get content address of the package merged from templates.
+
+    Args:
+        template_entries (list): graph name, template graph identifier and
+            template filepath of each graph
+        output_res_by_graphs (dict): resolution by graph name
+        empty_package_content (str, optional): template of the package
+            the graphs are merged into
+
+    Returns:
+        str: package key
+    """
+    file_hashes = _get_file_hashes({
+        template_filepath for _, _, template_filepath in template_entries
+    })
+    data = [
+        (
+            template_filepath,
+            file_hashes[template_filepath],
+            project_template,
+            graph_name,
+            output_res_by_graphs.get(graph_name)
+        )
+        for graph_name, project_template, template_filepath
+        in template_entries
+    ]
+    data.append(empty_package_content or EMPTY_PACKAGE_CONTENT)
+    return hashlib.sha1(json.dumps(data).encode()).hexdigest()
+
+
+def get_template_package_filepath(package_key):
+    """Get filepath of a cached template package.
+
+    Args:
+        package_key (str): package key
+
+    Returns:
+        str: package filepath
+    """
+    return os.path.join(
+        get_template_cache_dir(), "packages", f"{package_key}.sbs")
+
+
+def build_template_package(template_entries, package_key,
+                           empty_package_content=None):
+    """Merge the template graphs into a cached package.
+
+    The package is only built when it is not cached yet.
+
+    Args:
+        template_entries (list): graph name, template graph identifier and
+            template filepath of each graph
+        package_key (str): package key
+        empty_package_content (str, optional): template of the package
+            the graphs are merged into, see `make_empty_package_template`
+
+    Returns:
+        str: package filepath, None when no graph was found in templates
+    """
+    package_filepath = get_template_package_filepath(package_key)
+    if os.path.exists(package_filepath):
+        return package_filepath
+
+    os.makedirs(os.path.dirname(package_filepath), exist_ok=True)
+    tmp_filepath = f"{package_filepath}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_filepath, "w", encoding="utf-8") as stream:
+        stream.write((empty_package_content or EMPTY_PACKAGE_CONTENT).format(
+            file_uid=uuid.UUID(package_key[:32])))
+    try:
+        if not merge_template_entries(template_entries, tmp_filepath):
+            return None
+        os.replace(tmp_filepath, package_filepath)
+    finally:
+        if os.path.exists(tmp_filepath):
+            os.remove(tmp_filepath)
+    return package_filepath
+
+
+def get_template_settings_key(project_creation_settings, context,
+                              resources_dir, roots=None,
+                              empty_package_content=None):
+    """Key of the prepared template package for settings and context.
+
+    Args:
+        project_creation_settings (dict): project creation settings
+        context (dict): project name, folder path and task name
+        resources_dir (str): Substance Designer default resources dir
+        roots (dict, optional): anatomy roots the template paths are
+            resolved with
+        empty_package_content (str, optional): template of the package
+            the graphs are merged into
+
+    Returns:
+        str: settings key
+    """
+    if resources_dir:
+        resources_dir = os.path.normpath(resources_dir)
+    data = {
+        "settings": project_creation_settings,
+        "project_name": context["project_name"],
+        "folder_path": context["folder_path"],
+        "task_name": context["task_name"],
+        "resources_dir": resources_dir,
+        "roots": roots,
+        "empty_package": empty_package_content or EMPTY_PACKAGE_CONTENT,
+    }
+    return hashlib.sha1(
+        json.dumps(data, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def get_prepared_template_package(settings_key):
+    """Get prepared template package for settings key.
+
+    Args:
+        settings_key (str): key of the settings and context
+
+    Returns:
+        dict: cached package filepath and resolution by graphs, None when
+            not cached or any of the template paths was created, changed
+            or removed.
+    """
+    record = _read_json(
+        os.path.join(get_template_cache_dir(), "prepared",
+                     f"{settings_key}.json")
+    )
+    if not record:
+        return None
+    try:
+        for template_filepath, mtime in record["template_mtimes"].items():
+            if _get_mtime(template_filepath) != mtime:
+                return None
+        package_filepath = get_template_package_filepath(
+            record["package_key"])
+    except KeyError:
+        return None
+
+    if not os.path.exists(package_filepath):
+        return None
+    return {
+        "package_filepath": package_filepath,
+        "output_res_by_graphs": record["output_res_by_graphs"]
+    }
+
+
+def store_prepared_template_package(settings_key, package_key,
+                                    template_entries, output_res_by_graphs,
+                                    checked_filepaths=None):
+    """Remember which cached package is prepared for settings key.
+
+    Args:
+        settings_key (str): key of the settings and context
+        package_key (str): key of the cached package
+        template_entries (list): graph name, template graph identifier and
+            template filepath of the graphs in the package
+        output_res_by_graphs (dict): resolution by graph name
+        checked_filepaths (Iterable[str], optional): other template
+            filepaths resolved from the settings, e.g. the ones which
+            don't exist yet
+    """
+    template_filepaths = {
+        template_filepath for _, _, template_filepath in template_entries
+    }
+    template_filepaths.update(checked_filepaths or [])
+    # Missing templates are stored too, so the package is prepared again
+    # once they are created
+    template_mtimes = {
+        template_filepath: _get_mtime(template_filepath)
+        for template_filepath in template_filepaths
+    }
+    _write_json(
+        os.path.join(get_template_cache_dir(), "prepared",
+                     f"{settings_key}.json"),
+        {
+            "package_key": package_key,
+            "template_mtimes": template_mtimes,
+            "output_res_by_graphs": output_res_by_graphs,
+        }
+    )
+
+
+def _get_mtime(filepath):
+    try:
+        return os.path.getmtime(filepath)
+    except OSError:
+        return None
+
+
+def prepare_template_package(project_creation_settings, context,
+                             resources_dir, template_context=None,
+                             empty_package_content=None):
+    """Get merged template package for settings and context.
+
+    Args:
+        project_creation_settings (dict): project creation settings
+        context (dict): project name, folder path and task name
+        resources_dir (str): Substance Designer default resources dir
+        template_context (TemplateResolveContext, optional): context to
+            resolve template paths
+        empty_package_content (str, optional): template of the package
+            the graphs are merged into, see `make_empty_package_template`.
+            Defaults to `EMPTY_PACKAGE_CONTENT`.
+
+    Returns:
+        dict: cached package filepath and resolution by graphs, None when
+            there are no graphs to create.
+    """
+    if template_context is None:
+        template_context = TemplateResolveContext(context)
+    project_template_settings = project_creation_settings.get(
+        "project_templates", [])
+    # Template paths resolved with anatomy roots depend on them too
+    roots = None
+    if any(
+        project_template_setting["template_type"] != (
+            "default_substance_template")
+        for project_template_setting in project_template_settings
+    ):
+        roots = template_context.get_roots()
+    settings_key = get_template_settings_key(
+        project_creation_settings, context, resources_dir, roots,
+        empty_package_content
+    )
+    prepared_package = get_prepared_template_package(settings_key)
+    if prepared_package is not None:
+        return prepared_package
+
+    template_entries, output_res_by_graphs = collect_template_entries(
+        project_template_settings, resources_dir, template_context)
+    if not template_entries:
+        return None
+
+    package_key = get_template_package_key(
+        template_entries, output_res_by_graphs, empty_package_content)
+    package_filepath = build_template_package(
+        template_entries, package_key, empty_package_content)
+    if package_filepath is None:
+        return None
+
+    store_prepared_template_package(
+        settings_key, package_key, template_entries, output_res_by_graphs,
+        checked_filepaths=template_context.resolved_paths
+    )
+    return {
+        "package_filepath": package_filepath,
+        "output_res_by_graphs": output_res_by_graphs
+    }
+
+
+def prewarm_template_cache(project_name, resources_dir=None):
+    """Prepare template packages for all tasks of a project.
+
+    The packages are prepared with the same templates and the same empty
+    package as in Designer sessions, so the sessions find them. The
+    resources dir and the empty package saved by the last Designer
+    session using the cache dir are used unless the resources dir is
+    passed.
+
+    Args:
+        project_name (str): project name
+        resources_dir (str, optional): Substance Designer default resources
+            dir. Defaults to the one of the last Designer session.
+
+    Raises:
+        ValueError: Default Substance templates are configured and the
+            resources dir is not known.
+
+    Returns:
+        int: number of prepared task contexts
+    """
+    from ayon_core.settings import get_project_settings
+
+    project_settings = get_project_settings(project_name)
+    project_creation_settings = project_settings["substancedesigner"].get(
+        "project_creation", {})
+    if not project_creation_settings.get("project_templates"):
+        return 0
+
+    designer_info = get_designer_info()
+    if resources_dir is None:
+        resources_dir = designer_info.get("resources_dir")
+    if not resources_dir and any(
+        project_template_setting["template_type"] == (
+            "default_substance_template")
+        for project_template_setting
+        in project_creation_settings["project_templates"]
+    ):
+        raise ValueError(
+            "Default Substance templates are configured but the resources"
+            " dir of Substance Designer is not known. Pass it or launch"
+            " Designer with the same template cache dir once."
+        )
+    empty_package_content = designer_info.get("empty_package_content")
+    if not empty_package_content:
+        log.warning(
+            "Empty package of Substance Designer is not known yet, the"
+            " packages may not match the ones of Designer sessions."
+            " Launch Designer with the same template cache dir once."
+        )
+
+    project_entity = ayon_api.get_project(project_name)
+    anatomy = Anatomy(project_name, project_entity=project_entity)
+    folders_by_id = {
+        folder_entity["id"]: folder_entity
+        for folder_entity in ayon_api.get_folders(project_name)
+    }
+    prepared_count = 0
+    for task_entity in ayon_api.get_tasks(project_name):
+        folder_entity = folders_by_id.get(task_entity["folderId"])
+        if folder_entity is None:
+            continue
+        context = {
+            "project_name": project_name,
+            "folder_path": folder_entity["path"],
+            "task_name": task_entity["name"],
+        }
+        template_context = TemplateResolveContext(
+            context,
+            project_entity=project_entity,
+            folder_entity=folder_entity,
+            task_entity=task_entity,
+            anatomy=anatomy
+        )
+        prepared_package = prepare_template_package(
+            project_creation_settings, context, resources_dir,
+            template_context, empty_package_content
+        )
+        if prepared_package is not None:
+            prepared_count += 1
+    return prepared_count
+
+
+class TemplateResolveContext:
+    """Data needed to resolve template paths of the current context.
+
+    Entities and anatomy are queried at most once and only when a template
+    path needs to be resolved.
+
+    Args:
+        context (dict): current context with project name, folder path
+            and task name
+        project_entity (dict, optional): already queried project entity
+        folder_entity (dict, optional): already queried folder entity
+        task_entity (dict, optional): already queried task entity
+        anatomy (Anatomy, optional): already created project anatomy
+    """
+
+    def __init__(self, context, project_entity=None, folder_entity=None,
+                 task_entity=None, anatomy=None):
+        self.project_name = context["project_name"]
+        self.folder_path = context["folder_path"]
+        self.task_name = context["task_name"]
+        self._entities = None
+        if project_entity and folder_entity and task_entity:
+            self._entities = (project_entity, folder_entity, task_entity)
+        self._anatomy = anatomy
+        self._fill_data = None
+        # All paths resolved so far, including the ones which don't exist
+        self.resolved_paths = []
+
+    def get_entities(self):
+        """Get project, folder and task entity of the context.
+
+        Returns:
+            dict, dict, dict: project entity, folder entity, task entity
+        """
+        if self._entities is None:
+            project_entity = ayon_api.get_project(self.project_name)
+            folder_entity, task_entity = _get_current_context_entities({
+                "project_name": self.project_name,
+                "folder_path": self.folder_path,
+                "task_name": self.task_name,
+            })
+            self._entities = (project_entity, folder_entity, task_entity)
+        return self._entities
+
+    def get_task_entity(self):
+        """Get task entity of the context.
+
+        Returns:
+            dict: task entity
+        """
+        return self.get_entities()[2]
+
+    def get_anatomy(self):
+        """Get anatomy of the project.
+
+        Returns:
+            Anatomy: project anatomy
+        """
+        if self._anatomy is None:
+            project_entity = self.get_entities()[0]
+            self._anatomy = Anatomy(
+                self.project_name, project_entity=project_entity)
+        return self._anatomy
+
+    def get_roots(self):
+        """Get anatomy roots of the current platform.
+
+        Returns:
+            dict: root path by root name
+        """
+        return {
+            root_name: str(root)
+            for root_name, root in self.get_anatomy().roots.items()
+        }
+
+    def resolve(self, path):
+        """Resolve template path.
+
+        Args:
+            path (str): template path to resolve
+
+        Returns:
+            str: resolved path for Substance template file
+        """
+        if self._fill_data is None:
+            project_entity, folder_entity, task_entity = self.get_entities()
+            self._fill_data = get_template_data(
+                project_entity, folder_entity, task_entity)
+            self._fill_data["root"] = self.get_anatomy().roots
+
+        result = StringTemplate.format_template(path, self._fill_data)
+        if result.solved:
+            path = result.normalized()
+        self.resolved_paths.append(os.path.normpath(path))
+        return path
+
+
+def collect_template_entries(project_template_settings, resources_dir,
+                             template_context):
+    """Resolve templates of the project template settings.
+
+    Args:
+        project_template_settings (list): project templates settings
+        resources_dir (str): Substance Designer default resources dir
+        template_context (TemplateResolveContext): context to resolve
+            template paths
+
+    Returns:
+        list, dict: graph name, template graph identifier and template
+            filepath of each graph and resolution by graph name
+    """
+    template_entries = []
+    output_res_by_graphs = {}
+    for project_template_setting in project_template_settings:
+        graph_name = project_template_setting["grpah_name"]
+        if project_template_setting["template_type"] == (
+            "default_substance_template"
+            ):
+                project_template = project_template_setting.get(
+                    "default_substance_template")
+                template_filepath = get_template_filename_from_project(
+                    resources_dir, project_template
+                )
+        elif project_template_setting["template_type"] == (
+            "custom_template"
+            ):
+                custom_template = project_template_setting["custom_template"]
+                project_template = custom_template["custom_template_graph"]
+                if not project_template:
+                    log.warning("Project template not set. "
+                                "Skipping project creation.")
+                    continue
+
+                path = custom_template["custom_template_path"]
+                if not path:
+                    log.warning("Template path not filled. "
+                                "Skipping project creation.")
+                    continue
+                template_filepath = template_context.resolve(path)
+                if not os.path.exists(template_filepath):
+                    log.warning(
+                        f"Template path '{template_filepath}' "
+                        "does not exist yet.")
+                    continue
+        else:
+            task_type_template = project_template_setting["task_type_template"]
+            filter_data = {
+                "task_types": task_type_template["task_types"]
+            }
+            matched_task_type = filter_profiles(
+                project_template_settings, filter_data, logger=log)
+            if not matched_task_type:
+                log.warning("No matching task_type found. "
+                            "Skipping project creation.")
+                continue
+
+            path = task_type_template["path"]
+            template_filepath = template_context.resolve(path)
+            if not os.path.exists(template_filepath):
+                log.warning(f"Template filepath '{template_filepath}'"
+                            " not found.")
+                continue
+
+            project_template = template_context.get_task_entity()["name"]
+
+        template_filepath = os.path.normpath(template_filepath)
+        template_entries.append(
+            (graph_name, project_template, template_filepath))
+
+        output_res_by_graphs[graph_name] = (
+            project_template_setting["default_texture_resolution"]
+        )
+
+    return template_entries, output_res_by_graphs
+
+
+def merge_template_entries(template_entries, package_filepath):
+    """Add the graphs of the templates to the package file.
+
+    Args:
+        template_entries (list): graph name, template graph identifier and
+            template filepath of each graph
+        package_filepath (str): package filepath
+
+    Returns:
+        bool: Whether any graph was added.
+    """
+    graph_identifiers_by_template = {}
+    for _, project_template, template_filepath in template_entries:
+        graph_identifiers_by_template.setdefault(
+            template_filepath, set()).add(project_template)
+
+    # Read each template only once for all the graphs used from it
+    parsed_dependencies = []
+    for template_filepath, graph_identifiers in (
+        graph_identifiers_by_template.items()
+    ):
+        read_template(template_filepath, graph_identifiers)
+        parsed_dependencies.extend(
+            parse_dependencies_from_template(template_filepath))
+
+    parsed_graph_names = []
+    for graph_name, project_template, template_filepath in template_entries:
+        parsed_graph = parse_graph_from_template(
+            graph_name, project_template, template_filepath)
+        if parsed_graph is not None:
+            parsed_graph_names.append(parsed_graph)
+
+    if not parsed_graph_names:
+        return False
+
+    add_graphs_to_package(
+        parsed_graph_names, parsed_dependencies, package_filepath
+    )
+    return True
+
+
+def get_template_filename_from_project(resources_dir,
+                                       project_template):
+    """Get template filename from ayon project settings
+
+    Args:
+        resources_dir (sd.api.sdapplication.SDApplicationPath): resources dir
+        project_template (str): project template name
+
+    Returns:
+        str: absolute filepath of the sbs template file.
+    """
+    templates_dir = os.path.join(resources_dir, "templates")
+    if project_template == "empty":
+        return os.path.join(templates_dir, "01_empty.sbs")
+    if project_template in [
+        "metallic_roughness",
+        "metallic_roughness_anisotropy",
+        "metallic_roughness_coated",
+        "metallic_roughness_sheen",
+        "adobe_standard_material"
+    ]:
+        return os.path.join(
+            templates_dir, "02_pbr_metallic_roughness.sbs")
+    elif project_template == "specular_glossiness":
+        return os.path.join(
+            templates_dir, "03_pbr_specular_glossiness.sbs")
+    elif project_template == "blinn":
+        return os.path.join(
+            templates_dir, "04_blinn.sbs")
+    elif project_template == "scan_metallic_roughness":
+        return os.path.join(
+            templates_dir, "05_scan_pbr_metallic_roughness.sbs")
+    elif project_template == "scan_specular_glossiness":
+        return os.path.join(
+            templates_dir, "06_scan_pbr_specular_glossiness.sbs")
+    elif project_template == "axf_to_metallic_roughness":
+        return os.path.join(
+            templates_dir, "07_axf_to_pbr_metallic_roughness.sbs")
+    elif project_template == "axf_to_specular_glossiness":
+        return os.path.join(
+            templates_dir, "08_axf_to_pbr_specular_glossiness.sbs")
+    elif project_template == "axf_to_axf":
+        return os.path.join(
+            templates_dir, "09_axf_to_axf.sbs")
+    elif project_template == "studio_panorama":
+        return os.path.join(
+            templates_dir, "10_studio_panorama.sbs")
+    elif project_template in [
+        "sp_filter_generic",
+        "sp_filter_specific",
+        "sp_filter_channel_mesh_maps",
+        "sp_generator_mesh_maps"
+    ]:
+        return os.path.join(
+            templates_dir, "11_substance_painter.sbs")
+    elif project_template == "sample_filter":
+        return os.path.join(
+            templates_dir, "12_substance_sampler.sbs")
+    elif project_template == "clo_metallic_roughness":
+        return os.path.join(
+            templates_dir, "13_clo_metallic_roughness.sbs")
+
+    return None
+
+
+def resolve_template_path(path, project_name, folder_entity, task_entity,
+                          anatomy=None, project_entity=None):
+    """resolve template path for Substance files
+
+    Args:
+        path (_type_): template path to resolve
+        project_name (str): project name
+        folder_entity (dict): folder entity data
+        task_name (str): task name
+        anatomy (Anatomy, optional): project anatomy
+        project_entity (dict, optional): project entity data
+
+    Returns:
+        str: resolved path for Substance template file
+    """
+    if project_entity is None:
+        project_entity = ayon_api.get_project(project_name)
+    if anatomy is None:
+        anatomy = Anatomy(project_name, project_entity=project_entity)
+    fill_data = get_template_data(
+        project_entity, folder_entity, task_entity)
+    fill_data["root"] = anatomy.roots
+    result = StringTemplate.format_template(path, fill_data)
+    if result.solved:
+        path = result.normalized()
+    return path
+
+
+def _get_current_context_entities(context):
+    """Get entity data from DB
+
+    Args:
+        project_name (str): project name
+
+    Returns:
+        dict, dict: folder entity, task entity
+    """
+    project_name = context["project_name"]
+    folder_path = context["folder_path"]
+    task_name = context["task_name"]
+    folder_entity = ayon_api.get_folder_by_path(
+        project_name, folder_path)
+    task_entity = ayon_api.get_task_by_name(
+            project_name, folder_entity["id"], task_name
+        )
+    return folder_entity, task_entity
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""Read Substance packages (`.sbs`) without a running Designer.
+
+The `.sbs` files are XML documents. The reader collects the graphs with
+their outputs, the dependencies, the resources and the AYON metadata of
+a package in a single streaming pass and drops every element as soon as
+it was read, so even large packages with many graphs are read with a
+small memory footprint. This allows validators, asset browsers or farm
+jobs to inspect workfiles headlessly.
+"""
+import os
+import logging
+import dataclasses
+import xml.etree.ElementTree as etree
+
+from ayon_substancedesigner.metadata_encoding import decode_metadata
+
+
+log = logging.getLogger("ayon_substancedesigner")
+
+# Keys of AYON metadata stored in the package metadata, see `api.pipeline`
+AYON_METADATA_KEYS = ("ayon_containers", "ayon_context", "ayon_instances")
+
+
+@dataclasses.dataclass
+class SbsGraphOutput:
+    """Output of a graph.
+
+    Attributes:
+        identifier (str): output identifier, e.g. "basecolor"
+        uid (str): uid of the output
+        node_uid (str): uid of the output node writing to the output or
+            None when the output has no output node
+    """
+    identifier: str
+    uid: str
+    node_uid: str = None
+
+
+@dataclasses.dataclass
+class SbsGraph:
+    """Graph of a package.
+
+    Attributes:
+        identifier (str): graph identifier
+        path (str): path of the graph in the package, e.g. "folder/graph"
+        outputs (list): graph outputs
+    """
+    identifier: str
+    path: str
+    outputs: list = dataclasses.field(default_factory=list)
+
+    @property
+    def output_identifiers(self):
+        return [output.identifier for output in self.outputs]
+
+    @property
+    def output_nodes(self):
+        """Uids of output nodes by the output identifiers."""
+        return {
+            output.identifier: output.node_uid
+            for output in self.outputs
+            if output.node_uid is not None
+        }
+
+
+@dataclasses.dataclass
+class SbsDependency:
+    """Package dependency.
+
+    Attributes:
+        filename (str): path of the dependency, e.g. "sbs://blend.sbs"
+        uid (str): uid of the dependency
+    """
+    filename: str
+    uid: str = None
+
+
+@dataclasses.dataclass
+class SbsResource:
+    """Resource of a package, e.g. a bitmap.
+
+    Attributes:
+        identifier (str): resource identifier
+        path (str): path of the resource in the package
+        type (str): type of the resource, e.g. "bitmap"
+        format (str): file format of the resource
+        filepath (str): path to the resource file, relative paths are
+            relative to the package
+    """
+    identifier: str
+    path: str
+    type: str = None
+    format: str = None
+    filepath: str = None
+
+
+@dataclasses.dataclass
+class SbsPackage:
+    """Content of a Substance package.
+
+    Attributes:
+        filepath (str): package filepath
+        graphs (list): compositing graphs
+        dependencies (list): package dependencies
+        resources (list): resources of the package
+        metadata (dict): package metadata values by name
+    """
+    filepath: str
+    graphs: list = dataclasses.field(default_factory=list)
+    dependencies: list = dataclasses.field(default_factory=list)
+    resources: list = dataclasses.field(default_factory=list)
+    metadata: dict = dataclasses.field(default_factory=dict)
+
+    def get_graph(self, identifier):
+        for graph in self.graphs:
+            if graph.identifier == identifier:
+                return graph
+        return None
+
+    def get_ayon_metadata(self, metadata_type, default=None):
+        """Get decoded AYON metadata.
+
+        Args:
+            metadata_type (str): AYON metadata key, e.g. "ayon_containers"
+            default (Any): value returned when the metadata are missing or
+                can't be decoded
+
+        Returns:
+            Any: decoded metadata
+        """
+        value = self.metadata.get(metadata_type)
+        if not value:
+            return default
+        try:
+            return decode_metadata(value)
+        except ValueError:
+            log.warning(
+                f"Failed to decode '{metadata_type}' metadata"
+                f" of {self.filepath}"
+            )
+            return default
+
+    @property
+    def instances(self):
+        return self.get_ayon_metadata("ayon_instances", {})
+
+    @property
+    def containers(self):
+        return self.get_ayon_metadata("ayon_containers", [])
+
+    @property
+    def context(self):
+        return self.get_ayon_metadata("ayon_context", {})
+
+
+def _get_child_value(element, tag):
+    child = element.find(tag)
+    if child is None:
+        return None
+    return child.attrib.get("v")
+
+
+class SbsPackageReader:
+    """Streaming reader of `.sbs` packages.
+
+    Unknown elements are skipped, so packages of other format versions are
+    read as long as the elements the reader looks for keep their names.
+
+    Args:
+        filepath (str): package filepath
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._package = None
+
+    @property
+    def package(self):
+        """Read package content.
+
+        Returns:
+            SbsPackage: package content
+        """
+        if self._package is None:
+            self._package = self.read()
+        return self._package
+
+    def read(self):
+        """Read the package file.
+
+        Returns:
+            SbsPackage: package content
+
+        Raises:
+            xml.etree.ElementTree.ParseError: When the file is not valid
+                XML.
+        """
+        package = SbsPackage(self.filepath)
+        # Tags of the open elements
+        tags = []
+        # Identifiers of the open folders
+        folder_names = []
+        graph = None
+        output_uids_by_node_uid = {}
+        for event, element in etree.iterparse(
+                self.filepath, events=("start", "end")):
+            tag = element.tag
+            if event == "start":
+                tags.append(tag)
+                if tag == "graph" and tags[-2:-1] == ["content"]:
+                    graph = SbsGraph(None, None)
+                    output_uids_by_node_uid = {}
+                elif tag == "folder":
+                    folder_names.append(None)
+                continue
+
+            tags.pop()
+            parent_tag = tags[-1] if tags else None
+            if tag == "identifier":
+                if parent_tag == "graph" and graph is not None:
+                    graph.identifier = element.attrib.get("v")
+                elif parent_tag == "folder" and folder_names:
+                    folder_names[-1] = element.attrib.get("v")
+                continue
+
+            if graph is not None:
+                if tag == "graphoutput":
+                    graph.outputs.append(SbsGraphOutput(
+                        _get_child_value(element, "identifier"),
+                        _get_child_value(element, "uid")
+                    ))
+                    element.clear()
+                elif tag == "compNode":
+                    output_uid = _get_child_value(
+                        element, "compImplementation/compOutputBridge/output")
+                    if output_uid is not None:
+                        node_uid = _get_child_value(element, "uid")
+                        output_uids_by_node_uid[node_uid] = output_uid
+                    element.clear()
+                elif tag == "graph" and parent_tag == "content":
+                    graph.path = self._get_path(
+                        folder_names, graph.identifier)
+                    node_uids_by_output_uid = {
+                        output_uid: node_uid
+                        for node_uid, output_uid
+                        in output_uids_by_node_uid.items()
+                    }
+                    for output in graph.outputs:
+                        output.node_uid = node_uids_by_output_uid.get(
+                            output.uid)
+                    package.graphs.append(graph)
+                    graph = None
+                    element.clear()
+                continue
+
+            if tag == "resource" and parent_tag == "content":
+                identifier = _get_child_value(element, "identifier")
+                package.resources.append(SbsResource(
+                    identifier,
+                    self._get_path(folder_names, identifier),
+                    _get_child_value(element, "type"),
+                    _get_child_value(element, "format"),
+                    _get_child_value(element, "filepath")
+                ))
+                element.clear()
+
+            elif tag == "dependency" and parent_tag == "dependencies":
+                package.dependencies.append(SbsDependency(
+                    _get_child_value(element, "filename"),
+                    _get_child_value(element, "uid")
+                ))
+                element.clear()
+
+            elif tag == "folder":
+                folder_names.pop()
+                element.clear()
+
+            elif "content" not in tags:
+                # Package metadata are stored as name and value pairs
+                name = _get_child_value(element, "name")
+                if name is not None and element.find("value") is not None:
+                    package.metadata.setdefault(
+                        name, _get_child_value(element, "value"))
+                if len(tags) <= 1:
+                    element.clear()
+
+        return package
+
+    @staticmethod
+    def _get_path(folder_names, identifier):
+        return "/".join(
+            [name for name in folder_names if name] + [identifier or ""]
+        )
+
+
+def read_sbs_package(filepath):
+    """Read content of a `.sbs` package.
+
+    Args:
+        filepath (str): package filepath
+
+    Returns:
+        SbsPackage: package content
+    """
+    return SbsPackageReader(filepath).read()
+
+
+def iter_sbs_packages(filepaths):
+    """Read many `.sbs` packages skipping the ones which can't be read.
+
+    Args:
+        filepaths (Iterable[str]): package filepaths
+
+    Yields:
+        SbsPackage: package content
+    """
+    for filepath in filepaths:
+        if not os.path.isfile(filepath):
+            log.warning(f"Package does not exist: {filepath}")
+            continue
+        try:
+            yield read_sbs_package(filepath)
+        except etree.ParseError as exc:
+            log.warning(f"Failed to read package {filepath}: {exc}")
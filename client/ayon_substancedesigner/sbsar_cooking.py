@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""Cook `.sbsar` archives from saved `.sbs` packages in a separate process.
+
+The cooker is an external command, `sbscooker` of the Substance
+Automation Toolkit by default. The command can be replaced in settings or
+with the `AYON_SD_SBSAR_COOKER` environment variable, e.g. by a stub
+cooker for local testing. This module does not need a running Designer.
+"""
+import os
+import shlex
+import string
+import logging
+import subprocess
+
+
+log = logging.getLogger("ayon_substancedesigner")
+
+COOKER_COMMAND_ENV = "AYON_SD_SBSAR_COOKER"
+DEFAULT_COOKER_COMMAND = (
+    "sbscooker --inputs {input} --includes {resources_dir}"
+    " --output-path {output_dir} --output-name {output_name}"
+)
+
+
+def get_cooker_args(command_template, **data):
+    """Get arguments of the cooker command.
+
+    Args:
+        command_template (str): command with `{input}`, `{output_dir}`,
+            `{output_name}` and `{resources_dir}` placeholders. The
+            `AYON_SD_SBSAR_COOKER` environment variable overrides it.
+        **data: values of the placeholders
+
+    Returns:
+        list: command arguments
+    """
+    command_template = (
+        os.environ.get(COOKER_COMMAND_ENV) or command_template
+        or DEFAULT_COOKER_COMMAND
+    )
+    return format_command_args(command_template, **data)
+
+
+def format_command_args(command_template, **data):
+    """Split command template to arguments and fill the placeholders.
+
+    The template is split before formatting so paths with spaces stay
+    single arguments.
+
+    An argument with a placeholder of a list value is repeated for each
+    item of the list, together with the option right before it. E.g.
+    `--output {outputs}` with `outputs=["a", "b"]` gives
+    `--output a --output b`, both arguments are dropped for an empty list.
+
+    Args:
+        command_template (str): command with placeholders
+        **data: values of the placeholders
+
+    Returns:
+        list: command arguments
+    """
+    if os.name == "nt":
+        tokens = [
+            token.strip('"')
+            for token in shlex.split(command_template, posix=False)
+        ]
+    else:
+        tokens = shlex.split(command_template)
+
+    formatter = string.Formatter()
+    args = []
+    for token in tokens:
+        list_keys = [
+            field_name
+            for _, field_name, _, _ in formatter.parse(token)
+            if isinstance(data.get(field_name), (list, tuple))
+        ]
+        if not list_keys:
+            args.append(token.format(**data))
+            continue
+
+        option = []
+        if args and args[-1].startswith("-"):
+            option = [args.pop()]
+        key = list_keys[0]
+        for item in data[key]:
+            args.extend(option)
+            args.append(token.format(**dict(data, **{key: item})))
+    return args
+
+
+class SbsarCookJob:
+    """Cooking of a `.sbsar` running in a separate process.
+
+    Args:
+        args (list): cooker command arguments, see `get_cooker_args`
+        output_filepath (str): expected path of the cooked `.sbsar`
+        log_filepath (str): file the cooker output is written to
+    """
+
+    def __init__(self, args, output_filepath, log_filepath):
+        self.args = args
+        self.output_filepath = output_filepath
+        self.log_filepath = log_filepath
+        self._process = None
+
+    def start(self):
+        """Start the cooker process without waiting for it."""
+        log.debug(f"Cooking SBSAR: {subprocess.list2cmdline(self.args)}")
+        with open(self.log_filepath, "wb") as log_stream:
+            self._process = subprocess.Popen(
+                self.args,
+                stdout=log_stream,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL
+            )
+
+    def run(self, timeout=None):
+        """Start the cooker process and wait for it to finish.
+
+        Args:
+            timeout (float, optional): seconds to wait for the cooker
+
+        Raises:
+            RuntimeError: When the cooking failed or timed out.
+        """
+        try:
+            self.start()
+        except OSError as exc:
+            raise RuntimeError(f"Failed to start the cooker: {exc}")
+        self.wait(timeout)
+
+    def is_running(self):
+        return self._process is not None and self._process.poll() is None
+
+    def wait(self, timeout=None):
+        """Wait for the cooker process to finish.
+
+        Args:
+            timeout (float, optional): seconds to wait, the process is
+                killed when it does not finish in time
+
+        Raises:
+            RuntimeError: When the cooking failed or timed out.
+        """
+        if self._process is None:
+            raise RuntimeError("Cooking was not started.")
+        try:
+            returncode = self._process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+            raise RuntimeError(
+                f"Cooking did not finish in {timeout} seconds."
+                f" See the log: {self.log_filepath}"
+            )
+        if returncode != 0:
+            raise RuntimeError(
+                f"Cooker failed with exit code {returncode}:"
+                f" {self.read_log()}"
+            )
+        if not os.path.isfile(self.output_filepath):
+            raise RuntimeError(
+                f"Cooker did not produce {self.output_filepath}:"
+                f" {self.read_log()}"
+            )
+
+    def read_log(self):
+        try:
+            with open(self.log_filepath, "r", errors="replace") as stream:
+                return stream.read()
+        except OSError:
+            return ""
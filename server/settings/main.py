@@ -93,6 +93,14 @@ def image_format_enum():
     ]
 
 
+def export_resolution_enum():
+    """Return enumerator for resolutions of exported textures."""
+    return [
+        {"label": str(2 ** power), "value": str(2 ** power)}
+        for power in range(5, 14)
+    ]
+
+
 class TaskTypeTemplateModel(BaseSettingsModel):
     _layout = "expanded"
     task_types: list[str] = SettingsField(
@@ -163,11 +171,90 @@ class ProjectTemplateSettingModel(BaseSettingsModel):
     )
 
 
+class ChannelPackingProfileModel(BaseSettingsModel):
+    _layout = "expanded"
+    name: str = SettingsField(
+        "",
+        title="Name",
+        description=(
+            "Name of the packed texture, used in its product name, "
+            "e.g. ORM"
+        )
+    )
+    red: str = SettingsField(
+        "",
+        title="Red",
+        description="Identifier of the graph output packed to red"
+    )
+    green: str = SettingsField(
+        "",
+        title="Green",
+        description="Identifier of the graph output packed to green"
+    )
+    blue: str = SettingsField(
+        "",
+        title="Blue",
+        description="Identifier of the graph output packed to blue"
+    )
+    alpha: str = SettingsField(
+        "",
+        title="Alpha",
+        description=(
+            "Identifier of the graph output packed to alpha, the alpha "
+            "is opaque when empty"
+        )
+    )
+
+
 class CreateTextureSettings(BaseSettingsModel):
     review : bool = SettingsField(False, title="Review")
     exportFileFormat: str = SettingsField(
         enum_resolver=image_format_enum,
         title="Image Output File Type")
+    exportWorkers: int = SettingsField(
+        0, ge=0, le=64,
+        title="Export Workers",
+        description=(
+            "Number of workers encoding and writing the exported bmp, jpg "
+            "and png textures in parallel with Qt. Files written by Qt "
+            "can differ from the ones saved by Substance Designer, e.g. "
+            "in jpg compression. Set to 0 to let Substance Designer save "
+            "all textures one by one."
+        )
+    )
+    onlyChangedGraphs: bool = SettingsField(
+        False,
+        title="Only Changed Graphs",
+        description=(
+            "Default for exporting only the graphs which changed since "
+            "they were last published with this option in the session. "
+            "The published state is kept only in memory, all graphs are "
+            "exported on the first publish after Designer starts."
+        )
+    )
+    exportResolutions: list[str] = SettingsField(
+        default_factory=list,
+        enum_resolver=export_resolution_enum,
+        title="Export Resolutions",
+        description=(
+            "Default resolutions to export. Graphs are computed once at "
+            "the highest one and the others are downsampled from it, each "
+            "becoming its own representation. Leave empty to export at "
+            "the output size of the graphs."
+        )
+    )
+    channelPackingProfiles: list[ChannelPackingProfileModel] = (
+        SettingsField(
+            default_factory=list,
+            title="Channel Packing Profiles",
+            description=(
+                "Grayscale outputs of a graph packed to the channels of "
+                "a single texture published as its own product, e.g. "
+                "ambient occlusion, roughness and metallic to ORM. Empty "
+                "channels are black. Profiles are enabled per instance."
+            )
+        )
+    )
 
 
 class CreatePluginsModel(BaseSettingsModel):
@@ -177,6 +264,146 @@ class CreatePluginsModel(BaseSettingsModel):
     )
 
 
+class ExtractTexturesModel(BaseSettingsModel):
+    export_cache: bool = SettingsField(
+        False,
+        title="Use Export Cache",
+        description=(
+            "Reuse textures exported by earlier publishes from a local "
+            "cache when their graph did not change. Changes of library "
+            "packages, color management or the Designer version are not "
+            "detected, clear the cache after such changes."
+        )
+    )
+    export_cache_size_limit: int = SettingsField(
+        2048, ge=0,
+        title="Export Cache Size Limit (MB)",
+        description=(
+            "Least recently used textures are removed from the export "
+            "cache when it grows over this size."
+        )
+    )
+    background_extraction: bool = SettingsField(
+        False,
+        title="Background Extraction",
+        description=(
+            "Compute graphs and write textures in small steps with a "
+            "progress dialog, so Designer stays responsive. The export can "
+            "be canceled between maps."
+        )
+    )
+    render_in_processes: bool = SettingsField(
+        False,
+        title="Render Graphs in Separate Processes",
+        description=(
+            "Cook the saved packages and render each graph by the "
+            "renderer command in its own process. Graphs of packages with "
+            "unsaved changes are exported in the session."
+        )
+    )
+    renderer_command: str = SettingsField(
+        (
+            "sbsrender render --input {input} --input-graph {graph_url}"
+            " --input-graph-output {graph_outputs}"
+            " --output-path {output_dir} --output-name {output_name}"
+            " --output-format {extension}"
+        ),
+        title="Renderer Command",
+        description=(
+            "Command rendering outputs of a graph. Available keys are "
+            "{input}, {graph_url}, {graph_outputs}, {output_dir}, "
+            "{output_name} and {extension}. The argument with "
+            "{graph_outputs} is repeated with the option before it for "
+            "each selected output. The AYON_SD_TEXTURE_RENDERER "
+            "environment variable overrides it."
+        )
+    )
+    max_render_processes: int = SettingsField(
+        0, ge=0,
+        title="Max Render Processes",
+        description=(
+            "Cooker and renderer processes running at once."
+            " Set to 0 to use the number of CPUs."
+        )
+    )
+    render_timeout: int = SettingsField(
+        0, ge=0,
+        title="Render Timeout (seconds)",
+        description="Set to 0 to wait without a limit."
+    )
+
+
+class ExtractSbsarModel(BaseSettingsModel):
+    cook_in_process: bool = SettingsField(
+        False,
+        title="Cook in Separate Process",
+        description=(
+            "Cook the SBSAR from the saved workfile with the cooker "
+            "command in a separate process instead of exporting it in "
+            "the session."
+        )
+    )
+    cooker_command: str = SettingsField(
+        (
+            "sbscooker --inputs {input} --includes {resources_dir}"
+            " --output-path {output_dir} --output-name {output_name}"
+        ),
+        title="Cooker Command",
+        description=(
+            "Command cooking the SBSAR. Available keys are {input}, "
+            "{output_dir}, {output_name} and {resources_dir}. The "
+            "AYON_SD_SBSAR_COOKER environment variable overrides it."
+        )
+    )
+
+
+class WaitSbsarCookingModel(BaseSettingsModel):
+    timeout: int = SettingsField(
+        3600, ge=0,
+        title="Timeout (seconds)",
+        description="Set to 0 to wait without a limit."
+    )
+
+
+class ReportPublishProfileModel(BaseSettingsModel):
+    write_report: bool = SettingsField(
+        False,
+        title="Write Report",
+        description=(
+            "Write the timings of each publish as a JSON file next to the "
+            "staging directories. The summary is logged either way."
+        )
+    )
+    count_sd_api_calls: bool = SettingsField(
+        False,
+        title="Count Substance Designer API Calls",
+        description=(
+            "Count calls of the Substance Designer API during the publish "
+            "and list them in the report. Adds overhead to every counted "
+            "call."
+        )
+    )
+
+
+class PublishPluginsModel(BaseSettingsModel):
+    ExtractTextures: ExtractTexturesModel = SettingsField(
+        default_factory=ExtractTexturesModel,
+        title="Extract Textures"
+    )
+    ExtractSbsar: ExtractSbsarModel = SettingsField(
+        default_factory=ExtractSbsarModel,
+        title="Extract SBSAR"
+    )
+    WaitSbsarCooking: WaitSbsarCookingModel = SettingsField(
+        default_factory=WaitSbsarCookingModel,
+        title="Wait for SBSAR Cooking"
+    )
+    ReportPublishProfile: ReportPublishProfileModel = SettingsField(
+        default_factory=ReportPublishProfileModel,
+        title="Report Publish Profile"
+    )
+
+
 class SubstanceDesignerSettings(BaseSettingsModel):
     imageio: ImageIOSettings = SettingsField(
         default_factory=ImageIOSettings,
@@ -190,6 +417,10 @@ class SubstanceDesignerSettings(BaseSettingsModel):
         default_factory=CreatePluginsModel,
         title="Creator Plugins"
     )
+    publish: PublishPluginsModel = SettingsField(
+        default_factory=PublishPluginsModel,
+        title="Publish Plugins"
+    )
 
 DEFAULT_SD_SETTINGS = {
     "imageio": DEFAULT_IMAGEIO_SETTINGS,
@@ -199,7 +430,49 @@ DEFAULT_SD_SETTINGS = {
     "create": {
         "CreateTextures": {
             "review": False,
-            "exportFileFormat": "png"
+            "exportFileFormat": "png",
+            "exportWorkers": 0,
+            "onlyChangedGraphs": False,
+            "exportResolutions": [],
+            "channelPackingProfiles": [
+                {
+                    "name": "ORM",
+                    "red": "ambientocclusion",
+                    "green": "roughness",
+                    "blue": "metallic",
+                    "alpha": ""
+                }
+            ]
+        },
+    },
+    "publish": {
+        "ExtractTextures": {
+            "export_cache": False,
+            "export_cache_size_limit": 2048,
+            "background_extraction": False,
+            "render_in_processes": False,
+            "renderer_command": (
+                "sbsrender render --input {input} --input-graph {graph_url}"
+                " --input-graph-output {graph_outputs}"
+                " --output-path {output_dir} --output-name {output_name}"
+                " --output-format {extension}"
+            ),
+            "max_render_processes": 0,
+            "render_timeout": 0
+        },
+        "ExtractSbsar": {
+            "cook_in_process": False,
+            "cooker_command": (
+                "sbscooker --inputs {input} --includes {resources_dir}"
+                " --output-path {output_dir} --output-name {output_name}"
+            )
+        },
+        "WaitSbsarCooking": {
+            "timeout": 3600
         },
+        "ReportPublishProfile": {
+            "write_report": False,
+            "count_sd_api_calls": False
+        }
     }
 }